@@ -0,0 +1,273 @@
+"""
+Async (ASGI) implementations of the read endpoints.
+
+Enabled with ``API_ASYNC_VIEWS = True``. Each view wraps the DRF view of
+the same name: GET is served here with Django's async support, everything
+else (writes, sparse fieldsets, the serializer fallback) is delegated to
+the DRF view, so both produce the same responses.
+"""
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import classonlymethod
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from . import views
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "ASYNC_QUERY_THREADS", 8),
+            thread_name_prefix="api-query",
+        )
+    return _executor
+
+
+def _concurrent() -> bool:
+    return getattr(settings, "ASYNC_CONCURRENT_QUERIES", True)
+
+
+def _call(func: Callable, args: tuple, using: str) -> Any:
+    """Call ``func(*args)`` on this pool thread's own connection.
+
+    Pool threads live as long as the process and, with a ``CONN_MAX_AGE``,
+    keep their connection open between queries, like a pool of
+    ``ASYNC_QUERY_THREADS`` connections; a connection that failed is closed
+    and reopened on the next query. No request cycle closes these
+    connections, so with ``CONN_MAX_AGE = 0`` (and with a database
+    connection pool, which takes it back) it is closed after every call.
+    """
+    connection = connections[using]
+    try:
+        return func(*args)
+    except Exception:
+        connection.close()
+        raise
+    finally:
+        if (
+            getattr(connection, "pool", None) is not None
+            or connection.settings_dict["CONN_MAX_AGE"] == 0
+        ):
+            connection.close()
+        else:
+            connection.close_if_unusable_or_obsolete()
+
+
+async def run_query(
+    func: Callable, *args: Any, using: str = DEFAULT_DB_ALIAS
+) -> Any:
+    """Run ``func(*args)``, which queries the ``using`` database.
+
+    With ``ASYNC_CONCURRENT_QUERIES`` calls run concurrently on the query
+    thread pool, in a copy of the request's context, so that they are
+    counted for the request (``api.middleware.observing``). Otherwise they
+    run one at a time on the request's connection in Django's sync thread,
+    which is what tests inside a transaction need.
+    """
+    if not _concurrent():
+        return await sync_to_async(func)(*args)
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        _get_executor(), context.run, _call, func, args, using
+    )
+
+
+def _evaluate_all(querysets: Tuple[Any, ...]) -> List[list]:
+    return [list(queryset) for queryset in querysets]
+
+
+async def fetch(*querysets: Any) -> List[list]:
+    """Evaluate ``querysets`` concurrently and return their rows, in order."""
+    if not _concurrent():
+        return await sync_to_async(_evaluate_all)(querysets)
+    return list(
+        await asyncio.gather(
+            *(run_query(list, _pinned(qs), using=qs.db) for qs in querysets)
+        )
+    )
+
+
+def _pinned(queryset: Any) -> Any:
+    # Resolve the read replica once, so the rows are read on the
+    # connection run_query was given
+    return queryset.using(queryset.db)
+
+
+class AsyncReadView(View):
+    """Serve GET from ``drf_view``'s configuration with the async ORM.
+
+    The DRF view supplies the queryset, pagination, representation, cache
+    and ETag settings. Rows are read as ``.values()`` dicts and the
+    related tables of the representation are fetched concurrently.
+    """
+
+    drf_view: Any = None
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # DRF enforces CSRF itself on the requests delegated to it
+        view.csrf_exempt = True
+        return view
+
+    async def get(self, request, *args, **kwargs):
+        view = self.get_drf_view(request, kwargs)
+        # Sparse fieldsets and the serializer path stay with DRF
+        params = request.GET
+        if not view._fast() or "fields" in params or "expand" in params:
+            return await self.delegate(request, *args, **kwargs)
+        try:
+            return await self.read(request, view)
+        except APIException as exc:
+            return self.render(view, {"detail": exc.detail}, exc.status_code)
+
+    async def delegate(self, request, *args, **kwargs):
+        """Handle the request with the sync DRF view."""
+        handler = self.drf_view.as_view()
+        return await sync_to_async(handler)(request, *args, **kwargs)
+
+    post = put = patch = delete = options = delegate
+
+    async def read(self, request, view) -> HttpResponse:
+        raise NotImplementedError
+
+    def get_drf_view(self, request, kwargs: Dict[str, Any]) -> Any:
+        view = self.drf_view()
+        view.setup(request, **kwargs)
+        view.request = Request(request)
+        view.format_kwarg = None
+        view.headers = {}
+        return view
+
+    def render(
+        self, view, data: Any, status_code: int = status.HTTP_200_OK
+    ) -> HttpResponse:
+        renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+        response = HttpResponse(
+            renderer.render(data, renderer.media_type, {}),
+            status=status_code,
+            content_type=renderer.media_type,
+        )
+        # Headers DRF's APIView.finalize_response adds
+        response["Allow"] = ", ".join(view.allowed_methods)
+        patch_vary_headers(response, ["Accept"])
+        return response
+
+
+class AsyncListView(AsyncReadView):
+    async def read(self, request, view) -> HttpResponse:
+        representation = view.get_representation()
+        masked = view._db_masking()
+        queryset = representation.values(
+            view.filter_queryset(view.get_queryset()),
+            masked,
+            extra=view.cursor_columns(),
+        )
+        paginator = view.paginator
+        if paginator is None:
+            (rows,) = await fetch(queryset)
+        else:
+            queryset = _pinned(queryset)
+            rows = await run_query(
+                partial(paginator.paginate_queryset, view=view),
+                queryset,
+                view.request,
+                using=queryset.db,
+            )
+
+        if representation.nested and rows:
+            model = queryset.model
+            results = await fetch(
+                *representation.nested_querysets(
+                    model, [row["id"] for row in rows], masked
+                )
+            )
+            representation.attach_nested(model, rows, results)
+
+        data = representation.render_values(rows, masked)
+        if paginator is not None:
+            data = paginator.get_paginated_response(data).data
+        return self.render(view, data)
+
+
+class AsyncDetailView(AsyncReadView):
+    async def read(self, request, view) -> HttpResponse:
+        lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+        pk = view.kwargs[lookup_url_kwarg]
+        model = view.get_queryset().model
+        representation = view.get_representation()
+        querysets = [
+            view.get_queryset()
+            .prefetch_related(None)
+            .filter(**{view.lookup_field: pk})
+            .values(),
+            *representation.nested_querysets(model, [pk]),
+        ]
+
+        cache = view.get_representation_cache()
+        if cache is not None and not cache.enabled:
+            cache = None
+
+        # Read the version before the body, as the sync view does: read in
+        # parallel, on other connections, it could be newer than the body
+        # and mark stale data with a current ETag
+        (version_rows,) = await fetch(view.get_version_queryset())
+        if not version_rows:
+            raise NotFound()
+        version = view.version_from_row(version_rows[0])
+        if view._not_modified(request, *version):
+            return view._with_validators(
+                HttpResponse(status=status.HTTP_304_NOT_MODIFIED), version
+            )
+        data = None
+        if cache is not None:
+            data = await cache.aget(pk, version[0])
+        if data is None:
+            rows, *nested = await fetch(*querysets)
+            if not rows:
+                raise NotFound()
+            representation.attach_nested(model, rows, nested)
+            data = representation.render_values(rows)[0]
+            if cache is not None:
+                await cache.aset(pk, version[0], data)
+        return view._with_validators(self.render(view, data), version)
+
+
+class PersonListCreateView(AsyncListView):
+    drf_view = views.PersonListCreateView
+
+
+class PersonDetailView(AsyncDetailView):
+    drf_view = views.PersonDetailView
+
+
+class AddressListCreateView(AsyncListView):
+    drf_view = views.AddressListCreateView
+
+
+class AddressDetailView(AsyncDetailView):
+    drf_view = views.AddressDetailView
+
+
+class CreditCardListCreateView(AsyncListView):
+    drf_view = views.CreditCardListCreateView
+
+
+class CreditCardDetailView(AsyncDetailView):
+    drf_view = views.CreditCardDetailView
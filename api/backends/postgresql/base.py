@@ -0,0 +1,115 @@
+"""
+PostgreSQL backend with connection statistics and optional pooling.
+
+``OPTIONS["pool"]`` (``True`` or keyword arguments for psycopg_pool's
+``ConnectionPool``, e.g. ``{"min_size": 2, "max_size": 10}``) takes
+connections from a per-process psycopg 3 pool instead of opening a new one
+for every request. It mirrors the ``pool`` option of Django 5.1+, so this
+backend can be swapped for ``django.db.backends.postgresql`` on upgrade.
+"""
+import threading
+import time
+from typing import Any, Dict
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+
+from api.dbstats import connection_stats
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # Pools are shared by every thread of a process, one per alias
+    _connection_pools: Dict[str, Any] = {}
+    _pools_lock = threading.Lock()
+
+    @property
+    def existing_pool(self) -> Any:
+        """The alias's pool if it has been created, without creating it."""
+        return self._connection_pools.get(self.alias)
+
+    @property
+    def pool(self) -> Any:
+        pool_options = self.settings_dict["OPTIONS"].get("pool")
+        if not pool_options or self.alias == NO_DB_ALIAS:
+            return None
+        pool = self._connection_pools.get(self.alias)
+        if pool is None:
+            with self._pools_lock:
+                pool = self._connection_pools.get(self.alias)
+                if pool is None:
+                    pool = self._connection_pools[
+                        self.alias
+                    ] = self._create_pool(pool_options)
+        return pool
+
+    def close_pool(self) -> None:
+        with self._pools_lock:
+            pool = self._connection_pools.pop(self.alias, None)
+        if pool is not None:
+            pool.close()
+
+    def get_connection_params(self) -> Dict[str, Any]:
+        params = super().get_connection_params()
+        params.pop("pool", None)
+        return params
+
+    def get_new_connection(self, conn_params: Dict[str, Any]) -> Any:
+        start = time.perf_counter()
+        pool = self.pool
+        if pool is None:
+            connection = super().get_new_connection(conn_params)
+        else:
+            # Any time spent waiting for a free connection counts as
+            # connect time
+            connection = pool.getconn()
+            self.isolation_level = base.IsolationLevel.READ_COMMITTED
+            isolation_level = self.settings_dict["OPTIONS"].get(
+                "isolation_level"
+            )
+            if isolation_level is not None:
+                self.isolation_level = base.IsolationLevel(isolation_level)
+                connection.isolation_level = self.isolation_level
+        connection_stats.connect_time(self.alias, time.perf_counter() - start)
+        return connection
+
+    def _close(self) -> None:
+        connection_stats.closed(self.alias)
+        pool = self.existing_pool
+        if self.connection is not None and pool is not None:
+            # Hand the connection back instead of closing it
+            with self.wrap_database_errors:
+                pool.putconn(self.connection)
+            return
+        super()._close()
+
+    def _create_pool(self, pool_options: Any) -> Any:
+        if self.settings_dict["CONN_MAX_AGE"] != 0:
+            raise ImproperlyConfigured(
+                "Pooled connections go back to the pool after every "
+                "request; set CONN_MAX_AGE to 0 when using OPTIONS['pool']."
+            )
+        try:
+            if not base.is_psycopg3:
+                raise ImportError
+            from psycopg_pool import ConnectionPool
+        except ImportError:
+            raise ImproperlyConfigured(
+                "OPTIONS['pool'] requires psycopg 3 and psycopg_pool: "
+                'pip install "psycopg[binary,pool]".'
+            )
+
+        options = {} if pool_options is True else dict(pool_options)
+        pool = ConnectionPool(
+            kwargs=self.get_connection_params(),
+            check=(
+                ConnectionPool.check_connection
+                if self.settings_dict["CONN_HEALTH_CHECKS"]
+                else None
+            ),
+            name=self.alias,
+            open=False,
+            **options,
+        )
+        pool.open()
+        return pool
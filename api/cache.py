@@ -0,0 +1,163 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class RepresentationCache:
+    """Two-tier read-through cache of rendered (masked) representations.
+
+    Entries live in Django's default cache with a bounded in-process LRU
+    in front of it. The default cache is only shared between workers when
+    ``CACHE_BACKEND`` configures a shared one; otherwise each worker fills
+    its own. Either way, each entry is stored together with the version
+    (ETag) it was rendered from and is only served while that version is
+    current, and this check is what keeps a write made by another worker
+    from being served stale. Writes additionally drop the entry from the
+    default cache and this process's LRU through model signals (see
+    ``api.signals``).
+
+    Hit, miss and eviction counters are kept per process.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        timeout: Optional[int] = None,
+        local_size: Optional[int] = None,
+    ) -> None:
+        self.prefix = prefix
+        self._timeout = timeout
+        self._local_size = local_size
+        self._local: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            (
+                "local_hits",
+                "shared_hits",
+                "misses",
+                "evictions",
+                "invalidations",
+            ),
+            0,
+        )
+
+    @property
+    def timeout(self) -> int:
+        if self._timeout is not None:
+            return self._timeout
+        return getattr(settings, "PERSON_CACHE_TIMEOUT", 300)
+
+    @property
+    def local_size(self) -> int:
+        if self._local_size is not None:
+            return self._local_size
+        return getattr(settings, "PERSON_CACHE_LOCAL_SIZE", 1024)
+
+    @property
+    def enabled(self) -> bool:
+        return self.timeout > 0
+
+    def key(self, pk: Any) -> str:
+        return f"{self.prefix}:{pk}"
+
+    def get(self, pk: Any, version: str) -> Optional[Any]:
+        """Return the cached data for ``pk`` at ``version``, or None."""
+        key = self.key(pk)
+        data = self._get_local(key, version)
+        if data is None:
+            data = self._from_shared(key, version, cache.get(key))
+        return data
+
+    async def aget(self, pk: Any, version: str) -> Optional[Any]:
+        """Async ``get()``, for use from async views."""
+        key = self.key(pk)
+        data = self._get_local(key, version)
+        if data is None:
+            data = self._from_shared(key, version, await cache.aget(key))
+        return data
+
+    def set(self, pk: Any, version: str, data: Any) -> None:
+        key = self.key(pk)
+        entry = (version, data)
+        cache.set(key, entry, timeout=self.timeout)
+        self._store_local(key, entry)
+
+    async def aset(self, pk: Any, version: str, data: Any) -> None:
+        key = self.key(pk)
+        entry = (version, data)
+        await cache.aset(key, entry, timeout=self.timeout)
+        self._store_local(key, entry)
+
+    def get_or_render(
+        self, pk: Any, version: str, render: Callable[[], Any]
+    ) -> Any:
+        """Return the cached data, calling ``render()`` on a miss.
+
+        The returned object is shared with the cache and must not be
+        mutated.
+        """
+        data = self.get(pk, version)
+        if data is None:
+            data = render()
+            self.set(pk, version, data)
+        return data
+
+    def invalidate(self, pk: Any) -> None:
+        """Drop ``pk`` from the shared cache and this process's LRU."""
+        key = self.key(pk)
+        cache.delete(key)
+        with self._lock:
+            self._local.pop(key, None)
+            self._counters["invalidations"] += 1
+
+    def clear(self) -> None:
+        """Empty this process's LRU and reset the counters."""
+        with self._lock:
+            self._local.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["local_entries"] = len(self._local)
+        stats["hits"] = stats["local_hits"] + stats["shared_hits"]
+        return stats
+
+    def _get_local(self, key: str, version: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None and entry[0] == version:
+                self._local.move_to_end(key)
+                self._counters["local_hits"] += 1
+                return entry[1]
+        return None
+
+    def _from_shared(
+        self, key: str, version: str, entry: Optional[Tuple[str, Any]]
+    ) -> Optional[Any]:
+        if entry is not None and entry[0] == version:
+            self._store_local(key, entry)
+            with self._lock:
+                self._counters["shared_hits"] += 1
+            return entry[1]
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def _store_local(self, key: str, entry: Tuple[str, Any]) -> None:
+        size = self.local_size
+        if size <= 0:
+            return
+        with self._lock:
+            self._local[key] = entry
+            self._local.move_to_end(key)
+            while len(self._local) > size:
+                self._local.popitem(last=False)
+                self._counters["evictions"] += 1
+
+
+person_cache = RepresentationCache("person:repr")
@@ -0,0 +1,291 @@
+"""
+Incremental change feed behind ``GET /api/changes/``.
+
+Saved persons, addresses and credit cards are found through their
+``(updated_at, id)`` indexes and deleted ones through the ``Tombstone``
+rows written on delete. All four are merged into one ``(timestamp, id)``
+order and read from a cursor, so a consumer that stores the returned
+cursor only ever fetches what changed since its last call.
+"""
+import base64
+import datetime
+import heapq
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import Address, CreditCard, Person, Tombstone
+from .representations import (
+    address_representation,
+    credit_card_representation,
+    person_representation,
+)
+from .routers import read_from
+
+# Start of the oldest transaction that has written and not yet finished;
+# NULL when there is none
+OPEN_WRITES_SQL = """
+    SELECT MIN(xact_start) FROM pg_stat_activity
+    WHERE backend_xid IS NOT NULL AND pid <> pg_backend_pid()
+"""
+
+# Change types, in the order ?types= lists them
+SOURCES = {
+    "person": (Person, "id", Tombstone.PERSON),
+    "address": (Address, "person_id", Tombstone.ADDRESS),
+    "creditcard": (CreditCard, "person_id", Tombstone.CREDIT_CARD),
+}
+TOMBSTONE_TYPES = {code: name for name, (_, _, code) in SOURCES.items()}
+
+# Sorts before every id, for positions at a timestamp rather than a change
+_FIRST_ID = UUID(int=0)
+
+
+class Cursor(NamedTuple):
+    """Where a reader is: after the change at ``(at, id)``, reading since
+    ``start``, the horizon of its first call. Rows deleted before
+    ``start`` were never sent to it, so their tombstones are skipped."""
+
+    at: datetime.datetime
+    id: UUID
+    start: datetime.datetime
+
+
+class Change(NamedTuple):
+    at: datetime.datetime
+    id: UUID
+    type: str
+    op: str
+    person_id: UUID
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = (
+        "The cursor is older than the change feed retention; resync the "
+        "full data set and continue from the cursor that returns."
+    )
+    default_code = "cursor_expired"
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    payload = {
+        "t": cursor.at.isoformat(),
+        "i": str(cursor.id),
+        "s": cursor.start.isoformat(),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(encoded: str) -> Cursor:
+    try:
+        padded = encoded + "=" * (-len(encoded) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded).decode())
+        cursor = Cursor(
+            datetime.datetime.fromisoformat(payload["t"]),
+            UUID(payload["i"]),
+            datetime.datetime.fromisoformat(payload["s"]),
+        )
+    except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+        raise ValidationError({"since": ["Invalid cursor."]})
+    if timezone.is_naive(cursor.at) or timezone.is_naive(cursor.start):
+        raise ValidationError({"since": ["Invalid cursor."]})
+    return cursor
+
+
+def horizon() -> datetime.datetime:
+    """Return the time before which every change is committed.
+
+    Changes are stamped when they are saved, not when they commit, so a
+    transaction still open on Postgres may yet commit rows older than
+    newer, visible ones. The feed stops before the oldest such
+    transaction started, less ``CHANGES_SETTLE_SECONDS`` for clock skew
+    between the app servers and the database.
+    """
+    settle = datetime.timedelta(
+        seconds=getattr(settings, "CHANGES_SETTLE_SECONDS", 1.0)
+    )
+    now = timezone.now()
+    connection = connections[DEFAULT_DB_ALIAS]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(OPEN_WRITES_SQL)
+            oldest = cursor.fetchone()[0]
+        if oldest is not None:
+            now = min(now, oldest)
+    return now - settle
+
+
+def _after(field: str, key: str, cursor: Optional[Cursor]) -> Q:
+    if cursor is None:
+        return Q()
+    at, pk, _ = cursor
+    return Q(**{f"{field}__gt": at}) | Q(**{field: at, f"{key}__gt": pk})
+
+
+class ChangeFeed:
+    """Read the changes to the ``types`` after a position, ``limit`` at a
+    time, optionally with their masked representations."""
+
+    def __init__(
+        self, types: Iterable[str], limit: int, payload: bool = False
+    ) -> None:
+        self.types = list(types)
+        self.limit = limit
+        self.payload = payload
+
+    def read(
+        self, since: Optional[Cursor]
+    ) -> Tuple[List[Dict[str, Any]], Cursor, bool]:
+        """Return the changes after ``since``, the cursor to continue
+        from and whether more follow.
+
+        A caught-up reader continues from the horizon, so its cursor keeps
+        moving while nothing changes.
+        """
+        # Tombstones and the horizon are on the primary, so read there too
+        with read_from(None):
+            until = horizon()
+            if since is None:
+                start = until
+            else:
+                start = since.start
+                self._check_retention(max(since.at, start))
+            streams = [self._saved(name, since, until) for name in self.types]
+            streams.append(self._deleted(since, start, until))
+            changes = list(
+                islice(
+                    heapq.merge(*streams, key=lambda c: (c.at, c.id)),
+                    self.limit + 1,
+                )
+            )
+            has_more = len(changes) > self.limit
+            changes = changes[: self.limit]
+            payloads = self._payloads(changes) if self.payload else {}
+
+        rows = []
+        for change in changes:
+            row = {
+                "type": change.type,
+                "op": change.op,
+                "id": str(change.id),
+                "person_id": str(change.person_id),
+                "at": change.at,
+            }
+            if self.payload and change.op != "deleted":
+                row["data"] = payloads.get((change.type, str(change.id)))
+            rows.append(row)
+        if has_more:
+            cursor = Cursor(changes[-1].at, changes[-1].id, start)
+        else:
+            cursor = Cursor(until, _FIRST_ID, start)
+            if since is not None:
+                # The horizon moves back while a transaction is open
+                cursor = max(cursor, since)
+        return rows, cursor, has_more
+
+    def _check_retention(self, needed_from: datetime.datetime) -> None:
+        """Refuse readers that need tombstones which may be pruned."""
+        retention = getattr(settings, "CHANGES_RETENTION_DAYS", 30)
+        if needed_from < timezone.now() - datetime.timedelta(days=retention):
+            raise CursorExpired()
+
+    def _saved(
+        self,
+        name: str,
+        since: Optional[Cursor],
+        until: datetime.datetime,
+    ) -> List[Change]:
+        model, person_field, _ = SOURCES[name]
+        rows = (
+            model.objects.filter(
+                _after("updated_at", "id", since), updated_at__lt=until
+            )
+            .order_by("updated_at", "id")
+            .values_list("id", person_field, "created_at", "updated_at")[
+                : self.limit + 1
+            ]
+        )
+        # Created as far as the consumer knows: after its last position
+        return [
+            Change(
+                updated_at,
+                pk,
+                name,
+                "created"
+                if since is None or created_at > since.at
+                else "updated",
+                person_id,
+            )
+            for pk, person_id, created_at, updated_at in rows
+        ]
+
+    def _deleted(
+        self,
+        since: Optional[Cursor],
+        start: datetime.datetime,
+        until: datetime.datetime,
+    ) -> List[Change]:
+        codes = [SOURCES[name][2] for name in self.types]
+        rows = (
+            Tombstone.objects.filter(
+                _after("deleted_at", "object_id", since),
+                object_type__in=codes,
+                deleted_at__gte=start,
+                deleted_at__lt=until,
+            )
+            .order_by("deleted_at", "object_id")
+            .values_list(
+                "object_id", "object_type", "person_id", "deleted_at"
+            )[: self.limit + 1]
+        )
+        return [
+            Change(deleted_at, pk, TOMBSTONE_TYPES[code], "deleted", person_id)
+            for pk, code, person_id, deleted_at in rows
+        ]
+
+    def _payloads(
+        self, changes: List[Change]
+    ) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        representations = {
+            # Address and card changes are listed on their own
+            "person": person_representation.select(
+                name
+                for name in person_representation.order
+                if name not in person_representation.nested
+            ),
+            "address": address_representation,
+            "creditcard": credit_card_representation,
+        }
+        payloads = {}
+        for name, representation in representations.items():
+            ids = [
+                c.id for c in changes if c.type == name and c.op != "deleted"
+            ]
+            if not ids:
+                continue
+            model = SOURCES[name][0]
+            records = representation.records(
+                model.objects.filter(id__in=ids).order_by()
+            )
+            for row in representation.render(records):
+                payloads[(name, row["id"])] = row
+        return payloads
+
+
+def prune_tombstones(days: Optional[int] = None) -> int:
+    """Delete tombstones older than the retention; return how many."""
+    if days is None:
+        days = getattr(settings, "CHANGES_RETENTION_DAYS", 30)
+    cutoff = timezone.now() - datetime.timedelta(days=days)
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+
+from .routers import replica_aliases
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Warn when several workers would each keep their own cache."""
+    workers = getattr(settings, "GUNICORN_WORKERS", 1)
+    if workers <= 1 or not isinstance(caches["default"], LocMemCache):
+        return []
+    effects = "each enforces its own rate limits"
+    if replica_aliases():
+        effects += " and clients may not read their own writes"
+    return [
+        Warning(
+            f"The default cache is local to each of the {workers} "
+            f"gunicorn workers, so {effects}.",
+            hint=(
+                "Set CACHE_BACKEND to 'redis' or 'database' so the "
+                "workers share one cache."
+            ),
+            id="api.W001",
+        )
+    ]
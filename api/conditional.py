@@ -0,0 +1,143 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class ConditionalRequestMixin:
+    """Strong ETag and Last-Modified support for detail views.
+
+    The object's version is read with a single indexed query on its primary
+    key (``updated_at`` plus any ``version_annotations``), so a matching
+    ``If-None-Match``/``If-Modified-Since`` returns 304 without loading or
+    serializing the object. ``If-Match`` on PUT, PATCH and DELETE rejects
+    stale writes with 412.
+    """
+
+    # Extra aggregates folded into the ETag, e.g. child updated_at values
+    version_annotations: Dict[str, Any] = {}
+    # Annotations holding datetimes that may move Last-Modified forward
+    last_modified_annotations: Tuple[str, ...] = ()
+    # ``(etag, last_modified)`` of the object being retrieved, for caching
+    current_version: Optional[Tuple[str, datetime]] = None
+
+    def get_version(self) -> Optional[Tuple[str, datetime]]:
+        """Return ``(etag, last_modified)`` or None if the object is gone."""
+        rows = list(self.get_version_queryset())
+        return self.version_from_row(rows[0]) if rows else None
+
+    def get_version_queryset(self):
+        """Return the query yielding at most one version row."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        model = self.get_queryset().model
+        queryset = model.objects.filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        if self.version_annotations:
+            queryset = queryset.annotate(**self.version_annotations)
+        # At most one row, so skip the ORDER BY that first() would add
+        return queryset.order_by().values_list(
+            "updated_at", *self.version_annotations
+        )[:1]
+
+    def version_from_row(self, row: tuple) -> Tuple[str, datetime]:
+        parts = "|".join("" if v is None else str(v) for v in row)
+        etag = '"%s"' % hashlib.sha1(parts.encode()).hexdigest()
+        values = dict(zip(["updated_at", *self.version_annotations], row))
+        last_modified = max(
+            values[name]
+            for name in ("updated_at", *self.last_modified_annotations)
+            if values[name] is not None
+        )
+        return etag, last_modified
+
+    def retrieve(self, request, *args, **kwargs):
+        version = self.get_version()
+        if version is None:
+            return super().retrieve(request, *args, **kwargs)
+        if self._not_modified(request, *version):
+            return self._with_validators(
+                Response(status=status.HTTP_304_NOT_MODIFIED), version
+            )
+        self.current_version = version
+        response = super().retrieve(request, *args, **kwargs)
+        return self._with_validators(response, version)
+
+    def update(self, request, *args, **kwargs):
+        failed = self._precondition_failed(request)
+        if failed is not None:
+            return failed
+        response = super().update(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            version = self.get_version()
+            if version is not None:
+                self._with_validators(response, version)
+        return response
+
+    def destroy(self, request, *args, **kwargs):
+        failed = self._precondition_failed(request)
+        if failed is not None:
+            return failed
+        return super().destroy(request, *args, **kwargs)
+
+    def _not_modified(
+        self, request, etag: str, last_modified: datetime
+    ) -> bool:
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+        if if_none_match:
+            # Weak comparison, per RFC 9110 section 13.1.2
+            candidates = [
+                tag[2:] if tag.startswith("W/") else tag
+                for tag in parse_etags(if_none_match)
+            ]
+            return "*" in candidates or etag in candidates
+
+        if_modified_since = parse_http_date_safe(
+            request.META.get("HTTP_IF_MODIFIED_SINCE", "")
+        )
+        return (
+            if_modified_since is not None
+            and int(last_modified.timestamp()) <= if_modified_since
+        )
+
+    def _precondition_failed(self, request) -> Optional[Response]:
+        if_match = request.META.get("HTTP_IF_MATCH")
+        if not if_match:
+            return None
+        version = self.get_version()
+        if version is None:
+            # Let the view raise its usual 404
+            return None
+        etags = parse_etags(if_match)
+        if "*" in etags or version[0] in etags:
+            return None
+        return self._with_validators(
+            Response(
+                {
+                    "error": "Precondition failed",
+                    "message": "The resource has been modified.",
+                },
+                status=status.HTTP_412_PRECONDITION_FAILED,
+            ),
+            version,
+        )
+
+    def _with_validators(
+        self, response: Response, version: Tuple[str, datetime]
+    ) -> Response:
+        etag, last_modified = version
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+        return response
+
+
+PERSON_VERSION_ANNOTATIONS = {
+    "addresses_updated_at": Max("addresses__updated_at"),
+    "addresses_count": Count("addresses", distinct=True),
+    "credit_cards_updated_at": Max("credit_cards__updated_at"),
+    "credit_cards_count": Count("credit_cards", distinct=True),
+}
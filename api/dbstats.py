@@ -0,0 +1,140 @@
+import threading
+from typing import Any, Dict
+
+from django.db import connections
+
+from api.routers import replica_aliases, replica_health
+
+POOL_STATS = (
+    "pool_min",
+    "pool_max",
+    "pool_size",
+    "pool_available",
+    "requests_waiting",
+    "requests_num",
+    "requests_queued",
+    "requests_wait_ms",
+    "requests_errors",
+    "connections_num",
+    "connections_ms",
+    "connections_errors",
+    "connections_lost",
+)
+
+
+class ConnectionStats:
+    """Per-process database connection churn, by connection alias.
+
+    ``opened`` counts Django connections (pool checkouts when pooled),
+    recorded from the ``connection_created`` signal for every backend;
+    ``api.backends.postgresql`` also records how long each took to
+    connect or to get from the pool.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._aliases: Dict[str, Dict[str, float]] = {}
+
+    def request_started(self) -> None:
+        with self._lock:
+            self._requests += 1
+
+    def opened(self, alias: str) -> None:
+        with self._lock:
+            self._alias(alias)["opened"] += 1
+
+    def connect_time(self, alias: str, seconds: float) -> None:
+        ms = seconds * 1000
+        with self._lock:
+            stats = self._alias(alias)
+            stats["connects_timed"] += 1
+            stats["connect_ms_total"] += ms
+            stats["connect_ms_max"] = max(stats["connect_ms_max"], ms)
+
+    def closed(self, alias: str) -> None:
+        with self._lock:
+            self._alias(alias)["closed"] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._requests = 0
+            self._aliases.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "aliases": {
+                    alias: dict(stats)
+                    for alias, stats in self._aliases.items()
+                },
+            }
+
+    def _alias(self, alias: str) -> Dict[str, float]:
+        stats = self._aliases.get(alias)
+        if stats is None:
+            stats = self._aliases[alias] = dict.fromkeys(
+                (
+                    "opened",
+                    "closed",
+                    "connects_timed",
+                    "connect_ms_total",
+                    "connect_ms_max",
+                ),
+                0,
+            )
+        return stats
+
+
+connection_stats = ConnectionStats()
+
+
+def database_stats() -> Dict[str, Any]:
+    """Return connection settings, churn, pool and replica health per alias."""
+    snapshot = connection_stats.snapshot()
+    requests = snapshot["requests"]
+    replicas = replica_aliases()
+    result = {}
+    for alias in connections:
+        connection = connections[alias]
+        stats = snapshot["aliases"].get(alias, {})
+        opened = stats.get("opened", 0)
+        timed = stats.get("connects_timed", 0)
+        entry = {
+            "vendor": connection.vendor,
+            "conn_max_age": connection.settings_dict["CONN_MAX_AGE"],
+            "health_checks": connection.settings_dict["CONN_HEALTH_CHECKS"],
+            "requests": requests,
+            "opened": opened,
+            "closed": stats.get("closed", 0),
+            # 1.0 means a new connection for every request
+            "opened_per_request": round(opened / requests, 3)
+            if requests
+            else 0.0,
+            "connect_ms_avg": round(stats["connect_ms_total"] / timed, 3)
+            if timed
+            else None,
+            "connect_ms_max": round(stats["connect_ms_max"], 3)
+            if timed
+            else None,
+            "pool": None,
+            # Last health check result; None until a request checked it
+            "replica_healthy": replica_health.cached(alias)
+            if alias in replicas
+            else None,
+        }
+        pool = getattr(connection, "existing_pool", None)
+        if pool is not None:
+            pool_stats = pool.get_stats()
+            entry["pool"] = {
+                name: pool_stats.get(name, 0) for name in POOL_STATS
+            }
+            served = entry["pool"]["requests_num"]
+            entry["pool"]["requests_wait_ms_avg"] = (
+                round(entry["pool"]["requests_wait_ms"] / served, 3)
+                if served
+                else 0.0
+            )
+        result[alias] = entry
+    return result
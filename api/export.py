@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+from itertools import islice
+from typing import Any, Dict, Iterator, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Person
+from .representations import person_representation
+from .services import DataMaskingService
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+CSV_COLUMNS = [
+    "id",
+    "first_name",
+    "last_name",
+    "birth_date",
+    "ssn",
+    "created_at",
+    "updated_at",
+    "addresses",
+    "credit_cards",
+]
+
+
+class PersonExporter:
+    """Stream every person with masked nested records in constant memory.
+
+    Persons are read with a server-side cursor (``iterator(chunk_size=...)``)
+    and each chunk prefetches its addresses and credit cards in two
+    queries. Rows are built by ``person_representation`` and each chunk is
+    masked with the ``DataMaskingService`` batch methods.
+    """
+
+    def __init__(self, chunk_size: Optional[int] = None) -> None:
+        self.chunk_size = chunk_size or getattr(
+            settings, "EXPORT_CHUNK_SIZE", 2000
+        )
+        self.masking_service = DataMaskingService()
+        self.rows = 0
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        persons = (
+            Person.objects.order_by("created_at", "id")
+            .prefetch_related("addresses", "credit_cards")
+            .iterator(chunk_size=self.chunk_size)
+        )
+        tz = timezone.get_current_timezone()
+        while True:
+            chunk = [
+                person_representation.from_instance(person, tz)
+                for person in islice(persons, self.chunk_size)
+            ]
+            if not chunk:
+                return
+            person_representation.mask(chunk, self.masking_service)
+            self.rows += len(chunk)
+            yield from chunk
+
+    def iter_ndjson(self) -> Iterator[str]:
+        for record in self.iter_records():
+            yield json.dumps(record, separators=(",", ":")) + "\n"
+
+    def iter_csv(self) -> Iterator[str]:
+        # Nested addresses and cards are written as JSON-encoded columns.
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_COLUMNS)
+        for record in self.iter_records():
+            record["addresses"] = json.dumps(
+                record["addresses"], separators=(",", ":")
+            )
+            record["credit_cards"] = json.dumps(
+                record["credit_cards"], separators=(",", ":")
+            )
+            writer.writerow([record[column] for column in CSV_COLUMNS])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+        # Header only, when there are no rows
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def stream(self, export_format: str) -> Iterator[str]:
+        if export_format == "csv":
+            return self.iter_csv()
+        return self.iter_ndjson()
@@ -0,0 +1,110 @@
+from typing import Any, List, Optional, Tuple
+
+from rest_framework.exceptions import ValidationError
+
+
+_UNSET: Any = object()
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+class SparseFieldsetMixin:
+    """``?fields=`` and ``?expand=`` support for GET endpoints.
+
+    ``fields`` lists the fields to output and ``expand`` the nested
+    relations to embed. Without either parameter the full representation
+    is returned. With one of them, nested relations are only embedded when
+    named, and the queryset is narrowed to match: ``only()`` loads the
+    selected columns and only the expanded relations are prefetched, so a
+    names-only listing is a single query.
+    """
+
+    # Serializer whose ``Meta.fields`` define the selectable fields
+    fieldset_serializer_class: Any = None
+    # Nested relations embedded by the serializer, prefetched on demand
+    expandable_fields: Tuple[str, ...] = ()
+    # Columns always loaded, e.g. those read by pagination cursors
+    required_columns: Tuple[str, ...] = ("id", "created_at")
+
+    _field_selection: Any = _UNSET
+
+    def get_field_selection(self) -> Optional[Tuple[str, ...]]:
+        """Return the selected fields in output order, or None for all."""
+        if self._field_selection is not _UNSET:
+            return self._field_selection
+
+        selection = None
+        params = self.request.query_params
+        if self.request.method == "GET" and (
+            "fields" in params or "expand" in params
+        ):
+            selection = self._parse_selection(
+                params.get("fields"), params.get("expand")
+            )
+        self._field_selection = selection
+        return selection
+
+    def _parse_selection(
+        self, fields: Optional[str], expand: Optional[str]
+    ) -> Tuple[str, ...]:
+        all_fields = self.fieldset_serializer_class.Meta.fields
+        errors = {}
+
+        expanded = _split(expand)
+        unknown = [n for n in expanded if n not in self.expandable_fields]
+        if unknown:
+            errors["expand"] = [
+                f"Unknown relation(s): {', '.join(unknown)}. Expected "
+                f"{', '.join(self.expandable_fields)}."
+            ]
+
+        if fields is None:
+            requested = [
+                n for n in all_fields if n not in self.expandable_fields
+            ]
+        else:
+            requested = _split(fields)
+            unknown = [n for n in requested if n not in all_fields]
+            if unknown:
+                errors["fields"] = [f"Unknown field(s): {', '.join(unknown)}."]
+        if errors:
+            raise ValidationError(errors)
+
+        selected = {*requested, *expanded}
+        return tuple(n for n in all_fields if n in selected)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        selection = self.get_field_selection()
+        if selection is None:
+            return queryset
+
+        columns = [n for n in selection if n not in self.expandable_fields]
+        queryset = queryset.only(
+            *dict.fromkeys([*self.required_columns, *columns])
+        ).prefetch_related(None)
+        expanded = [n for n in self.expandable_fields if n in selection]
+        if expanded:
+            queryset = queryset.prefetch_related(*expanded)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        selection = self.get_field_selection()
+        if selection is not None:
+            kwargs.setdefault("fields", selection)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_representation(self):
+        representation = super().get_representation()
+        selection = self.get_field_selection()
+        if selection is None or representation is None:
+            return representation
+        return representation.select(selection)
+
+    def get_representation_cache(self):
+        # The cache holds full representations only
+        if self.get_field_selection() is not None:
+            return None
+        return super().get_representation_cache()
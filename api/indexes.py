@@ -0,0 +1,33 @@
+from django.db import models
+from django.db.models.functions import Lower
+
+
+class NameSearchIndex(models.Index):
+    """Index on ``LOWER(<field>)`` for the person search.
+
+    On PostgreSQL it is a trigram GIN index (``pg_trgm``), which serves
+    both the ``LIKE 'prefix%'`` and the fuzzy ``%`` matches. Elsewhere it
+    is a B-tree, which serves prefix matches as range scans; fuzzy matches
+    scan the table there.
+    """
+
+    def __init__(self, field_name: str, *, name: str) -> None:
+        self.field_name = field_name
+        super().__init__(Lower(field_name), name=name)
+
+    def deconstruct(self):
+        path, _, kwargs = super().deconstruct()
+        return path, (self.field_name,), {"name": kwargs["name"]}
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().create_sql(model, schema_editor, using, **kwargs)
+        from django.contrib.postgres.indexes import OpClass
+
+        index = models.Index(
+            OpClass(Lower(self.field_name), name="gin_trgm_ops"),
+            name=self.name,
+        )
+        return index.create_sql(
+            model, schema_editor, using=" USING gin", **kwargs
+        )
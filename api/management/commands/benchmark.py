@@ -0,0 +1,27 @@
+"""
+Management command to benchmark every API route
+Usage: python manage.py benchmark --scale 100k [--driver http --url URL]
+"""
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import endpoints
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure throughput, latency percentiles and queries per request "
+        "of every route and compare them with a baseline"
+    )
+
+    def add_arguments(self, parser: Any) -> None:
+        endpoints.add_arguments(parser)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        try:
+            regressions = endpoints.main(options, log=self.stdout.write)
+        except RuntimeError as ex:
+            raise CommandError(str(ex))
+        if regressions:
+            raise CommandError(f"{regressions} regression(s) found")
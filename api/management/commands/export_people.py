@@ -0,0 +1,50 @@
+"""
+Management command to export all persons with masking applied
+Usage: python manage.py export_people --format csv --output persons.csv
+"""
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from api.export import EXPORT_FORMATS, PersonExporter
+
+
+class Command(BaseCommand):
+    help = "Stream all persons as masked NDJSON or CSV"
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument(
+            "--format",
+            choices=EXPORT_FORMATS,
+            default="ndjson",
+            help="Output format",
+        )
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="File to write to (default: stdout)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Rows fetched per database round trip",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        exporter = PersonExporter(chunk_size=options["chunk_size"])
+        stream = exporter.stream(options["format"])
+
+        if options["output"] == "-":
+            for chunk in stream:
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(options["output"], "w", newline="") as handle:
+            for chunk in stream:
+                handle.write(chunk)
+        self.stderr.write(
+            self.style.SUCCESS(
+                f"Exported {exporter.rows} person(s) to {options['output']}"
+            )
+        )
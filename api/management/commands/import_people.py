@@ -0,0 +1,236 @@
+"""
+Management command to bulk import persons with nested addresses and cards
+Usage: python manage.py import_people people.ndjson [--format csv]
+"""
+import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Iterator, List, Optional, Tuple
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections
+
+from api.bulk import (
+    PersonBulkCreator,
+    PersonCopyWriter,
+    build_person,
+    validate_persons,
+)
+from api.workers import init_worker
+
+
+def read_records(path: str, input_format: str) -> Iterator[Any]:
+    """Yield raw records (NDJSON lines or CSV row dicts) from ``path``."""
+    with open(path, newline="") as handle:
+        if input_format == "csv":
+            yield from csv.DictReader(handle)
+        else:
+            for line in handle:
+                if line.strip():
+                    yield line
+
+
+def parse_record(raw: Any) -> Any:
+    """Turn a raw record into a ``CreatePersonSerializer`` payload."""
+    if isinstance(raw, str):
+        return json.loads(raw)
+    record = {key: value for key, value in raw.items() if value != ""}
+    # Nested records travel as JSON-encoded CSV columns
+    for key in ("addresses", "credit_cards"):
+        if key in record:
+            record[key] = json.loads(record[key])
+    return record
+
+
+def validate_batch(batch: List[Any]) -> List[Tuple[Any, Any]]:
+    """Parse and validate a batch; runs inside worker processes."""
+    parsed: List[Any] = []
+    parse_errors = {}
+    for number, raw in enumerate(batch):
+        try:
+            parsed.append(parse_record(raw))
+        except (ValueError, TypeError) as ex:
+            parsed.append(None)
+            parse_errors[number] = {"non_field_errors": [str(ex)]}
+
+    results = validate_persons(parsed)
+    for number, (validated_data, errors) in enumerate(results):
+        if number in parse_errors:
+            results[number] = (None, parse_errors[number])
+        elif errors is not None:
+            # Plain data only, so results pickle cheaply back to the parent
+            results[number] = (None, json.loads(json.dumps(errors)))
+    return results
+
+
+def batched(records: Iterator[Any], size: int) -> Iterator[List[Any]]:
+    """Group ``records`` into lists of at most ``size``."""
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def ordered_map(
+    pool: ProcessPoolExecutor, batches: Iterator[List[Any]], depth: int
+) -> Iterator[List[Tuple[Any, Any]]]:
+    """Like ``pool.map`` but with at most ``depth`` batches in flight.
+
+    ``Executor.map`` submits the whole iterable up front, which would read
+    the entire file into memory.
+    """
+    pending: deque = deque()
+    for batch in batches:
+        pending.append(pool.submit(validate_batch, batch))
+        if len(pending) >= depth:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class Command(BaseCommand):
+    help = "Bulk import persons with addresses and credit cards from a file"
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument("path", help="NDJSON or CSV file to import")
+        parser.add_argument(
+            "--format",
+            choices=["ndjson", "csv"],
+            default=None,
+            help="Input format (default: from the file extension)",
+        )
+        parser.add_argument(
+            "--method",
+            choices=["bulk_create", "copy"],
+            default="bulk_create",
+            help="Load with batched bulk_create or PostgreSQL COPY",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Persons per transaction",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Processes used for parsing and validation",
+        )
+        parser.add_argument(
+            "--offset",
+            type=int,
+            default=None,
+            help="Skip this many records before importing",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default=None,
+            help=(
+                "File recording the number of records committed; an "
+                "interrupted import resumes from it"
+            ),
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"File not found: {path}")
+        input_format = options["format"] or (
+            "csv" if path.lower().endswith(".csv") else "ndjson"
+        )
+
+        batch_size = options["batch_size"]
+        writer_class = (
+            PersonCopyWriter
+            if options["method"] == "copy"
+            else PersonBulkCreator
+        )
+        writer = writer_class(batch_size=batch_size)
+
+        checkpoint = options["checkpoint"]
+        offset = options["offset"]
+        if offset is None:
+            offset = self._read_checkpoint(checkpoint)
+
+        records = read_records(path, input_format)
+        if offset:
+            self.stdout.write(f"Resuming from record {offset}")
+            records = islice(records, offset, None)
+
+        created = failed = rows = 0
+        position = offset
+        start = time.perf_counter()
+
+        workers = max(1, options["workers"])
+        pool: Optional[ProcessPoolExecutor] = None
+        batches = batched(records, batch_size)
+        if workers > 1:
+            # Forked workers must not share the parent's DB connections
+            connections.close_all()
+            # Spawned workers (macOS, Windows) must set Django up first
+            pool = ProcessPoolExecutor(
+                max_workers=workers, initializer=init_worker
+            )
+            validated_batches = ordered_map(pool, batches, workers * 2)
+        else:
+            validated_batches = map(validate_batch, batches)
+
+        try:
+            for results in validated_batches:
+                built = []
+                for number, (validated_data, errors) in enumerate(
+                    results, start=position
+                ):
+                    if errors is not None:
+                        failed += 1
+                        self.stderr.write(f"record {number}: {errors}")
+                    else:
+                        built.append(build_person(validated_data))
+
+                if built:
+                    try:
+                        rows += writer.write_chunk(built)
+                        created += len(built)
+                    except DatabaseError as ex:
+                        raise CommandError(
+                            f"Import stopped at record {position}: {ex}. "
+                            f"Re-run with --offset {position} to resume."
+                        )
+
+                position += len(results)
+                self._write_checkpoint(checkpoint, position)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        elapsed = time.perf_counter() - start
+        rate = rows / elapsed if elapsed else 0.0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {created} person(s), {failed} failed, "
+                f"{rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec). "
+                f"Next offset: {position}"
+            )
+        )
+
+    def _read_checkpoint(self, checkpoint: Optional[str]) -> int:
+        if not checkpoint or not os.path.exists(checkpoint):
+            return 0
+        with open(checkpoint) as handle:
+            return int(handle.read().strip() or 0)
+
+    def _write_checkpoint(
+        self, checkpoint: Optional[str], position: int
+    ) -> None:
+        if not checkpoint:
+            return
+        tmp_path = f"{checkpoint}.tmp"
+        with open(tmp_path, "w") as handle:
+            handle.write(str(position))
+        os.replace(tmp_path, checkpoint)
@@ -0,0 +1,27 @@
+"""
+Management command to delete change feed tombstones past their retention
+Usage: python manage.py prune_tombstones [--days 30]
+"""
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from api.changes import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete change feed tombstones older than the retention"
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Days to keep (default: CHANGES_RETENTION_DAYS)",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        deleted = prune_tombstones(options["days"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} tombstone(s)")
+        )
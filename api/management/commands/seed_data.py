@@ -0,0 +1,101 @@
+"""
+Management command to generate synthetic persons, addresses and cards
+Usage: python manage.py seed_data --persons 1000000 --workers 8
+"""
+import os
+import time
+from typing import Any, Dict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.models import Address, CreditCard, Person
+from api.seeding import seed_data, usable_workers
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic data set, topping up the "
+        "persons table to --persons rows"
+    )
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument(
+            "--persons",
+            type=int,
+            default=1000,
+            help="Persons the table should hold afterwards",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Random seed; the same seed always gives the same rows",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes (always 1 on SQLite)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Persons inserted per transaction",
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete all persons, addresses and cards first",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        workers = usable_workers(options["workers"])
+        if workers < options["workers"]:
+            self.stderr.write(
+                f"Using {workers} worker(s) on {connection.vendor}"
+            )
+
+        if options["clear"]:
+            with connection.cursor() as cursor:
+                for model in (CreditCard, Address, Person):
+                    cursor.execute(f"DELETE FROM {model._meta.db_table}")
+
+        start = Person.objects.count()
+        if start >= options["persons"]:
+            self.stdout.write(f"Already {start} person(s); nothing to do")
+            return
+
+        started = time.perf_counter()
+        target = options["persons"] - start
+        reported = [0]
+
+        def progress(totals: Dict[str, int]) -> None:
+            # Every 10%
+            if totals["persons"] * 10 // target > reported[0]:
+                reported[0] = totals["persons"] * 10 // target
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{totals['persons']}/{target} persons "
+                    f"({totals['persons'] / elapsed:.0f}/s)"
+                )
+
+        totals = seed_data(
+            options["persons"],
+            seed=options["seed"],
+            start=start,
+            workers=workers,
+            batch_size=options["batch_size"],
+            progress=progress,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {totals['persons']} persons, "
+                f"{totals['addresses']} addresses and "
+                f"{totals['credit_cards']} credit cards in "
+                f"{time.perf_counter() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,315 @@
+import atexit
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+Labels = Tuple[str, ...]
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+class Counter:
+    """Monotonic counter, optionally split by label values."""
+
+    type = "counter"
+
+    def __init__(
+        self, registry: "MetricsRegistry", name: str, help: str, labels=()
+    ) -> None:
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames: Labels = tuple(labels)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self.registry.lock:
+            self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def samples(self) -> Dict[Labels, Any]:
+        return dict(self.values)
+
+
+class Histogram:
+    """Histogram with fixed buckets, optionally split by label values.
+
+    Each label set stores one count per bucket (plus ``+Inf``) followed by
+    the sum of the observed values; buckets are made cumulative on output.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        registry: "MetricsRegistry",
+        name: str,
+        help: str,
+        labels=(),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames: Labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.values: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self.registry.lock:
+            row = self.values.get(labels)
+            if row is None:
+                row = self.values[labels] = [0.0] * (len(self.buckets) + 2)
+            row[index] += 1
+            row[-1] += value
+
+    def samples(self) -> Dict[Labels, Any]:
+        return {labels: list(row) for labels, row in self.values.items()}
+
+
+class MetricsRegistry:
+    """In-process metrics with Prometheus text exposition.
+
+    With ``METRICS_MULTIPROC_DIR`` set, every process (e.g. each gunicorn
+    worker) writes a snapshot of its metrics to its own JSON file in that
+    directory, at most every ``METRICS_FLUSH_SECONDS`` from the request
+    path and at exit, and ``render()`` sums the files of all processes.
+    Files of exited workers are kept so their counts are not lost;
+    ``start.sh`` clears the directory when the server starts.
+    """
+
+    def __init__(self, multiproc_dir: Optional[str] = None) -> None:
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, Any] = {}
+        self.collectors: List[Callable[[], Dict[str, Dict[Labels, Any]]]] = []
+        self._multiproc_dir = multiproc_dir
+        self._last_flush = 0.0
+        self._new_process()
+
+    @property
+    def multiproc_dir(self) -> Optional[str]:
+        if self._multiproc_dir is not None:
+            return self._multiproc_dir or None
+        return getattr(settings, "METRICS_MULTIPROC_DIR", "") or None
+
+    def counter(self, name: str, help: str, labels=()) -> Counter:
+        return self._register(Counter(self, name, help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels=(),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(self, name, help, labels, buckets))
+
+    def register_collector(
+        self, collector: Callable[[], Dict[str, Dict[Labels, Any]]]
+    ) -> None:
+        """Add a callable returning ``{metric name: {labels: value}}``.
+
+        Collected values replace the metric's own samples, which suits
+        counters maintained elsewhere, such as cache statistics.
+        """
+        self.collectors.append(collector)
+
+    def collect(self) -> Dict[str, Dict[Labels, Any]]:
+        """Return this process's samples, keyed by metric name."""
+        with self.lock:
+            samples = {
+                name: metric.samples() for name, metric in self.metrics.items()
+            }
+        for collector in self.collectors:
+            samples.update(collector())
+        return samples
+
+    def maybe_flush(self) -> None:
+        """Flush the snapshot file if it is older than the flush interval."""
+        if self.multiproc_dir is None:
+            return
+        interval = getattr(settings, "METRICS_FLUSH_SECONDS", 1.0)
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def flush(self) -> None:
+        directory = self.multiproc_dir
+        if directory is None:
+            return
+        self._last_flush = time.monotonic()
+        data = {
+            name: [[list(labels), value] for labels, value in values.items()]
+            for name, values in self.collect().items()
+        }
+        path = os.path.join(directory, f"metrics_{self._process_id}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as handle:
+            json.dump(data, handle)
+        os.replace(tmp_path, path)
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        if self.multiproc_dir is None:
+            samples = self.collect()
+        else:
+            self.flush()
+            samples = self._merge_files()
+
+        lines: List[str] = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for labels, value in sorted(samples.get(name, {}).items()):
+                pairs = list(zip(metric.labelnames, labels))
+                if metric.type == "counter":
+                    lines.append(_sample(name, pairs, value))
+                    continue
+                cumulative = 0.0
+                bounds = [*map(_number, metric.buckets), "+Inf"]
+                for bound, count in zip(bounds, value):
+                    cumulative += count
+                    lines.append(
+                        _sample(
+                            f"{name}_bucket",
+                            pairs + [("le", bound)],
+                            cumulative,
+                        )
+                    )
+                lines.append(_sample(f"{name}_sum", pairs, value[-1]))
+                lines.append(_sample(f"{name}_count", pairs, cumulative))
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: Any) -> Any:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def _merge_files(self) -> Dict[str, Dict[Labels, Any]]:
+        merged: Dict[str, Dict[Labels, Any]] = {}
+        pattern = os.path.join(self.multiproc_dir or "", "metrics_*.json")
+        for path in glob.glob(pattern):
+            try:
+                with open(path) as handle:
+                    data = json.load(handle)
+            except (OSError, ValueError):
+                continue
+            for name, rows in data.items():
+                values = merged.setdefault(name, {})
+                for labels, value in rows:
+                    key = tuple(labels)
+                    if key not in values:
+                        values[key] = value
+                    elif isinstance(value, list):
+                        values[key] = [
+                            a + b for a, b in zip(values[key], value)
+                        ]
+                    else:
+                        values[key] += value
+        return merged
+
+    def _new_process(self) -> None:
+        # Unique per process, even when the OS reuses a pid
+        self._process_id = f"{os.getpid()}_{time.time_ns()}"
+        for metric in self.metrics.values():
+            metric.values.clear()
+
+
+def _number(value: float) -> str:
+    return repr(float(value))
+
+
+def _escape(value: Any) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+def _sample(name: str, pairs: List[Tuple[str, Any]], value: float) -> str:
+    if pairs:
+        labels = ",".join(f'{key}="{_escape(val)}"' for key, val in pairs)
+        name = f"{name}{{{labels}}}"
+    return f"{name} {_number(value)}"
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    "api_request_duration_seconds",
+    "Request latency by URL name.",
+    ("view", "method"),
+)
+REQUESTS = registry.counter(
+    "api_requests_total",
+    "Requests by URL name and status code.",
+    ("view", "method", "status"),
+)
+RESPONSE_SIZE = registry.histogram(
+    "api_response_size_bytes",
+    "Response body size by URL name (streamed responses excluded).",
+    ("view",),
+    SIZE_BUCKETS,
+)
+DB_QUERIES = registry.histogram(
+    "api_db_queries_per_request",
+    "SQL queries per request by URL name.",
+    ("view",),
+    QUERY_BUCKETS,
+)
+RATE_LIMIT_REJECTIONS = registry.counter(
+    "api_rate_limit_rejections_total",
+    "Write requests rejected by RateLimitMiddleware.",
+)
+CACHE_REQUESTS = registry.counter(
+    "api_cache_requests_total",
+    "Representation cache lookups by cache and result.",
+    ("cache", "result"),
+)
+CACHE_EVICTIONS = registry.counter(
+    "api_cache_evictions_total",
+    "Entries evicted from the in-process LRU tier by cache.",
+    ("cache",),
+)
+
+
+def _cache_stats() -> Dict[str, Dict[Labels, Any]]:
+    from .cache import person_cache
+
+    stats = person_cache.stats()
+    return {
+        CACHE_REQUESTS.name: {
+            ("person", "hit_local"): stats["local_hits"],
+            ("person", "hit_shared"): stats["shared_hits"],
+            ("person", "miss"): stats["misses"],
+        },
+        CACHE_EVICTIONS.name: {("person",): stats["evictions"]},
+    }
+
+
+registry.register_collector(_cache_stats)
+
+if hasattr(os, "register_at_fork"):
+    # Workers forked from a preloaded app start from empty metrics
+    os.register_at_fork(after_in_child=registry._new_process)
+atexit.register(registry.flush)
@@ -1,9 +1,24 @@
-from datetime import datetime, timedelta
-from typing import Optional, cast
-from django.http import JsonResponse, HttpRequest
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, cast
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse, HttpRequest, HttpResponse
 from django.utils.deprecation import MiddlewareMixin
 from django.conf import settings
-from django.core.cache import cache
+from whitenoise.middleware import WhiteNoiseMiddleware
+from . import metrics
+from .ratelimit import get_rate_limiter
+from .routers import pin_key, read_from, replica_aliases, replica_health
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,23 +27,31 @@ logger = logging.getLogger(__name__)
 class RateLimitMiddleware(MiddlewareMixin):
     """Rate limiting middleware for write operations."""
 
+    # POST endpoints that only read, e.g. /api/person/batch-get/
+    read_only_path_suffixes = ("/batch-get/",)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        # Reads skip the thread hop MiddlewareMixin makes for process_request
+        if not self._is_limited(request):
+            return await self.get_response(request)
+        return await super().__acall__(request)
+
     def process_request(self, request: HttpRequest) -> Optional[JsonResponse]:
-        # Only apply rate limiting to write operations
-        if not self._is_write_operation(request.method or ""):
+        if not self._is_limited(request):
             return None
 
         client_id = self._get_client_id(request)
         max_requests = getattr(settings, "RATE_LIMIT_MAX_REQUESTS", 1000)
         window_hours = getattr(settings, "RATE_LIMIT_WINDOW_HOURS", 24)
 
-        if not self._is_allowed(client_id, max_requests, window_hours):
-            remaining = self._get_remaining_requests(
-                client_id, max_requests, window_hours
-            )
-
+        result = get_rate_limiter().hit(
+            client_id, max_requests, window_hours * 3600
+        )
+        if not result.allowed:
+            metrics.RATE_LIMIT_REJECTIONS.inc()
             logger.warning(
                 f"Rate limit exceeded for client {client_id}. "
-                f"Remaining requests: {remaining}"
+                f"Remaining requests: {result.remaining}"
             )
 
             response_data = {
@@ -38,16 +61,22 @@ class RateLimitMiddleware(MiddlewareMixin):
                     f" of write operations "
                     f"({max_requests} per day). Please try again tomorrow."
                 ),
-                "remainingRequests": remaining,
-                "resetTime": (datetime.utcnow() + timedelta(days=1)).strftime(
-                    "%Y-%m-%dT%H:%M:%SZ"
-                ),
+                "remainingRequests": result.remaining,
+                "resetTime": datetime.fromtimestamp(
+                    result.reset_at, tz=timezone.utc
+                ).strftime("%Y-%m-%dT%H:%M:%SZ"),
             }
 
             return JsonResponse(response_data, status=429)
 
         return None
 
+    def _is_limited(self, request: HttpRequest) -> bool:
+        # Only apply rate limiting to write operations
+        return self._is_write_operation(
+            request.method or ""
+        ) and not request.path.endswith(self.read_only_path_suffixes)
+
     def _is_write_operation(self, method: str) -> bool:
         """Check if the HTTP method is a write operation."""
         return method.upper() in ["POST", "PUT", "PATCH", "DELETE"]
@@ -60,60 +89,388 @@ class RateLimitMiddleware(MiddlewareMixin):
 
     def _get_client_ip(self, request: HttpRequest) -> Optional[str]:
         """Extract client IP address from request."""
-        # Check for forwarded IP headers
-        x_forwarded_for = cast(
-            Optional[str], request.META.get("HTTP_X_FORWARDED_FOR")
+        return get_client_ip(request)
+
+
+def get_client_ip(request: HttpRequest) -> Optional[str]:
+    """Extract client IP address from request."""
+    # Check for forwarded IP headers
+    x_forwarded_for = cast(
+        Optional[str], request.META.get("HTTP_X_FORWARDED_FOR")
+    )
+    if x_forwarded_for:
+        return x_forwarded_for.split(",")[0].strip()
+
+    x_real_ip = cast(Optional[str], request.META.get("HTTP_X_REAL_IP"))
+    if x_real_ip:
+        return x_real_ip
+
+    # Fall back to remote address
+    return cast(Optional[str], request.META.get("REMOTE_ADDR"))
+
+
+class ReplicaRoutingMiddleware:
+    """Serve the reads of GET/HEAD requests from a read replica.
+
+    Picks a healthy replica per request for ``api.routers.ReplicaRouter``.
+    After a write, the client (by IP) reads from the primary for
+    ``DB_REPLICA_PIN_SECONDS``. The pin lives in the default cache, so it
+    only holds across gunicorn workers when that cache is shared
+    (``CACHE_BACKEND``); with the per-process default a read served by
+    another worker may miss the client's own write, which ``api.checks``
+    warns about. Removed from the chain when ``DATABASE_REPLICAS`` is
+    empty.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.async_mode:
+            return self.__acall__(request)
+        alias = None
+        if self._is_read(request) and not cache.get(self._pin_key(request)):
+            alias = replica_health.choose()
+        with read_from(alias):
+            response = self.get_response(request)
+        if self._is_write(request):
+            cache.set(self._pin_key(request), True, self._pin_seconds())
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        alias = None
+        if self._is_read(request) and not await cache.aget(
+            self._pin_key(request)
+        ):
+            alias = await self._achoose()
+        with read_from(alias):
+            response = await self.get_response(request)
+        if self._is_write(request):
+            await cache.aset(self._pin_key(request), True, self._pin_seconds())
+        return response
+
+    async def _achoose(self) -> Optional[str]:
+        # Only hop to a thread when a replica is due for a health check
+        candidates = replica_aliases()
+        random.shuffle(candidates)
+        for alias in candidates:
+            healthy = replica_health.cached(alias)
+            if healthy is None:
+                healthy = await sync_to_async(replica_health.check)(alias)
+            if healthy:
+                return alias
+        return None
+
+    def _is_read(self, request: HttpRequest) -> bool:
+        return request.method in ("GET", "HEAD")
+
+    def _is_write(self, request: HttpRequest) -> bool:
+        return request.method not in (
+            "GET",
+            "HEAD",
+            "OPTIONS",
+        ) and not request.path.endswith(
+            RateLimitMiddleware.read_only_path_suffixes
+        )
+
+    def _pin_key(self, request: HttpRequest) -> str:
+        return pin_key(get_client_ip(request) or "unknown")
+
+    def _pin_seconds(self) -> int:
+        return getattr(settings, "DB_REPLICA_PIN_SECONDS", 5)
+
+
+# Query observers of the current request. A context variable rather than
+# per-connection execute wrappers: under ASGI the requests on an event loop
+# share its thread's connections, and their queries also run in threads.
+_query_observers: ContextVar[Tuple[Any, ...]] = ContextVar(
+    "api_query_observers", default=()
+)
+
+
+def observe_queries(
+    execute: Callable, sql: str, params: Any, many: bool, context
+) -> Any:
+    """Report each query to the observers of the current context.
+
+    The one execute wrapper, added to every connection by ``api.signals``
+    when it opens.
+    """
+    observers = _query_observers.get()
+    if not observers:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        for observer in observers:
+            observer.record(elapsed)
+
+
+@contextmanager
+def observing(observer: Any) -> Iterator[Any]:
+    """Report the queries run in this context to ``observer.record()``."""
+    token = _query_observers.set((*_query_observers.get(), observer))
+    try:
+        yield observer
+    finally:
+        _query_observers.reset(token)
+
+
+class RequestTiming:
+    """SQL query count and phase timings for one request."""
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.start = time.perf_counter()
+        self.view_start: Optional[float] = None
+        self.render_start: Optional[float] = None
+        self.end: Optional[float] = None
+        # Concurrent queries report from the query pool threads
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.db_seconds += seconds
+            self.queries += 1
+
+    def finish(self) -> Dict[str, float]:
+        """Stop the clock and return the phase durations in milliseconds."""
+        self.end = time.perf_counter()
+        view_start = self.view_start or self.start
+        render_start = self.render_start or self.end
+        db_ms = self.db_seconds * 1000
+        return {
+            "db_ms": db_ms,
+            # View time outside SQL: queryset building and serialization
+            "serialize_ms": max(
+                0.0, (render_start - view_start) * 1000 - db_ms
+            ),
+            "render_ms": (self.end - render_start) * 1000,
+            "total_ms": (self.end - self.start) * 1000,
+        }
+
+
+class QueryTimingMiddleware:
+    """Per-request SQL query count and DB, serialization and render time.
+
+    A ``REQUEST_TIMING_SAMPLE_RATE`` share of requests (0 to 1) is timed
+    and gets a ``Server-Timing`` header and a ``request_timing`` log line.
+    With the default rate of 0 the middleware removes itself at startup,
+    and unsampled requests only cost a call to ``random()``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        self.sample_rate = float(
+            getattr(settings, "REQUEST_TIMING_SAMPLE_RATE", 0.0)
+        )
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Async hooks, so Django does not run them in a thread
+            self.process_view = self._aprocess_view
+            self.process_template_response = self._aprocess_template_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+
+        timing = RequestTiming()
+        with self._timed(request, timing):
+            response = self.get_response(request)
+        return self._finish(request, response, timing)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if not self._sampled():
+            return await self.get_response(request)
+
+        timing = RequestTiming()
+        with self._timed(request, timing):
+            response = await self.get_response(request)
+        return self._finish(request, response, timing)
+
+    def process_view(
+        self, request: HttpRequest, view_func: Callable, view_args, view_kwargs
+    ) -> None:
+        timing = getattr(request, "timing", None)
+        if timing is not None:
+            timing.view_start = time.perf_counter()
+
+    def process_template_response(
+        self, request: HttpRequest, response: HttpResponse
+    ) -> HttpResponse:
+        # Called just before DRF renders the response
+        timing = getattr(request, "timing", None)
+        if timing is not None:
+            timing.render_start = time.perf_counter()
+        return response
+
+    async def _aprocess_view(self, *args) -> None:
+        return QueryTimingMiddleware.process_view(self, *args)
+
+    async def _aprocess_template_response(self, *args) -> HttpResponse:
+        return QueryTimingMiddleware.process_template_response(self, *args)
+
+    def _sampled(self) -> bool:
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def _timed(self, request: HttpRequest, timing: RequestTiming) -> Any:
+        request.timing = timing  # type: ignore[attr-defined]
+        return observing(timing)
+
+    def _finish(
+        self,
+        request: HttpRequest,
+        response: HttpResponse,
+        timing: RequestTiming,
+    ) -> HttpResponse:
+        durations = timing.finish()
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={durations["db_ms"]:.2f};'
+                f'desc="{timing.queries} queries"',
+                f'serialize;dur={durations["serialize_ms"]:.2f}',
+                f'render;dur={durations["render_ms"]:.2f}',
+                f'total;dur={durations["total_ms"]:.2f}',
+            ]
+        )
+        self._log(request, response, timing, durations)
+        return response
+
+    def _log(
+        self,
+        request: HttpRequest,
+        response: HttpResponse,
+        timing: RequestTiming,
+        durations: Dict[str, float],
+    ) -> None:
+        match = request.resolver_match
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "db_queries": timing.queries,
+            **{name: round(value, 2) for name, value in durations.items()},
+        }
+        logger.info(
+            "request_timing "
+            + " ".join(f"{name}={value}" for name, value in fields.items()),
+            extra=fields,
         )
-        if x_forwarded_for:
-            return x_forwarded_for.split(",")[0].strip()
-
-        x_real_ip = cast(Optional[str], request.META.get("HTTP_X_REAL_IP"))
-        if x_real_ip:
-            return x_real_ip
-
-        # Fall back to remote address
-        return cast(Optional[str], request.META.get("REMOTE_ADDR"))
-
-    def _is_allowed(
-        self, client_id: str, max_requests: int, window_hours: int
-    ) -> bool:
-        """Check if client is allowed to make a request."""
-        cache_key = f"rate_limit:{client_id}"
-        now = datetime.utcnow()
-        window_start = now - timedelta(hours=window_hours)
-
-        # Get existing requests
-        requests = cache.get(cache_key, [])
-
-        # Filter requests within the time window
-        recent_requests = [
-            req_time for req_time in requests if req_time > window_start
-        ]
-
-        # Check if under limit
-        if len(recent_requests) >= max_requests:
-            return False
-
-        # Add current request
-        recent_requests.append(now)
-        cache.set(cache_key, recent_requests, timeout=window_hours * 3600)
-
-        return True
-
-    def _get_remaining_requests(
-        self, client_id: str, max_requests: int, window_hours: int
-    ) -> int:
-        """Get remaining requests for client."""
-        cache_key = f"rate_limit:{client_id}"
-        now = datetime.utcnow()
-        window_start = now - timedelta(hours=window_hours)
-
-        # Get existing requests
-        requests = cache.get(cache_key, [])
-
-        # Filter requests within the time window
-        recent_requests = [
-            req_time for req_time in requests if req_time > window_start
-        ]
-
-        return max(0, max_requests - len(recent_requests))
+
+
+class QueryCounter:
+    """Query observer (see ``observing``) that only counts queries."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """Record latency, size and query count of every request.
+
+    Observations go to the registry in ``api.metrics``, served by
+    ``/api/metrics``. Disabled (and removed from the chain) by
+    ``METRICS_ENABLED = False``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        if not getattr(settings, "METRICS_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.async_mode:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with observing(QueryCounter()) as counter:
+            response = self.get_response(request)
+        self._record(request, response, counter, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        start = time.perf_counter()
+        with observing(QueryCounter()) as counter:
+            response = await self.get_response(request)
+        self._record(request, response, counter, time.perf_counter() - start)
+        return response
+
+    def _record(
+        self,
+        request: HttpRequest,
+        response: HttpResponse,
+        counter: QueryCounter,
+        elapsed: float,
+    ) -> None:
+        match = request.resolver_match
+        view = match.view_name if match else "unmatched"
+        method = request.method or ""
+        metrics.REQUEST_LATENCY.observe(elapsed, view, method)
+        metrics.REQUESTS.inc(view, method, str(response.status_code))
+        metrics.DB_QUERIES.observe(counter.count, view)
+        if not response.streaming:
+            metrics.RESPONSE_SIZE.observe(len(response.content), view)
+        metrics.registry.maybe_flush()
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise, also running natively under ASGI.
+
+    WhiteNoise 6.6 is sync-only, which would make Django run every request
+    behind it, async views included, through a thread under ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable = None, **kwargs) -> None:
+        super().__init__(get_response, **kwargs)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(
+                request.path_info
+            )
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
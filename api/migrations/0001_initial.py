@@ -0,0 +1,182 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:45
+
+import django.core.validators
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Address",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "address_type",
+                    models.CharField(
+                        choices=[
+                            ("Home", "Home"),
+                            ("Work", "Work"),
+                            ("Mailing", "Mailing"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("street_address", models.CharField(max_length=200)),
+                ("city", models.CharField(max_length=100)),
+                ("state", models.CharField(max_length=2)),
+                (
+                    "zip_code",
+                    models.CharField(
+                        max_length=10,
+                        validators=[
+                            django.core.validators.RegexValidator(
+                                message="Zip Code must be in format 12345 or 12345-6789",
+                                regex="^\\d{5}(-\\d{4})?$",
+                            )
+                        ],
+                    ),
+                ),
+                ("country", models.CharField(default="US", max_length=2)),
+                ("is_primary", models.BooleanField(default=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "api_address",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="CreditCard",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "card_type",
+                    models.CharField(
+                        choices=[
+                            ("Visa", "Visa"),
+                            ("MasterCard", "MasterCard"),
+                            ("American Express", "American Express"),
+                            ("Discover", "Discover"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("last_four_digits", models.CharField(max_length=4)),
+                (
+                    "expiration_month",
+                    models.IntegerField(
+                        validators=[
+                            django.core.validators.MinValueValidator(1),
+                            django.core.validators.MaxValueValidator(12),
+                        ]
+                    ),
+                ),
+                (
+                    "expiration_year",
+                    models.IntegerField(
+                        validators=[
+                            django.core.validators.MinValueValidator(2024),
+                            django.core.validators.MaxValueValidator(2030),
+                        ]
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "api_creditcard",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="Person",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("first_name", models.CharField(max_length=100)),
+                ("last_name", models.CharField(max_length=100)),
+                ("birth_date", models.DateField()),
+                (
+                    "ssn",
+                    models.CharField(
+                        blank=True,
+                        max_length=11,
+                        null=True,
+                        validators=[
+                            django.core.validators.RegexValidator(
+                                message="SSN must be 9 digits or in format XXX-XX-XXXX",
+                                regex="^(\\d{9}|\\d{3}-\\d{2}-\\d{4})$",
+                            )
+                        ],
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "api_person",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="person",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    ("ssn__isnull", True),
+                    ("ssn__regex", "^\\d{9}$"),
+                    ("ssn__regex", "^\\d{3}-\\d{2}-\\d{4}$"),
+                    _connector="OR",
+                ),
+                name="chk_ssn_format",
+            ),
+        ),
+        migrations.AddField(
+            model_name="creditcard",
+            name="person",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="credit_cards",
+                to="api.person",
+            ),
+        ),
+        migrations.AddField(
+            model_name="address",
+            name="person",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="addresses",
+                to="api.person",
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:45
+
+import api.operations
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ("api", "0001_initial"),
+    ]
+
+    operations = [
+        api.operations.AddIndexConcurrently(
+            model_name="address",
+            index=models.Index(
+                fields=["person", "created_at", "id"],
+                name="address_person_created_idx",
+            ),
+        ),
+        api.operations.AddIndexConcurrently(
+            model_name="creditcard",
+            index=models.Index(
+                fields=["person", "created_at", "id"],
+                name="creditcard_person_created_idx",
+            ),
+        ),
+        api.operations.AddIndexConcurrently(
+            model_name="person",
+            index=models.Index(
+                fields=["created_at", "id"], name="person_created_id_idx"
+            ),
+        ),
+    ]
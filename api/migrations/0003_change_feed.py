@@ -0,0 +1,71 @@
+# Generated by Django 5.0.1 on 2026-10-17 01:34
+
+import api.operations
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ("api", "0002_listing_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "object_type",
+                    models.PositiveSmallIntegerField(
+                        choices=[
+                            (1, "person"),
+                            (2, "address"),
+                            (3, "creditcard"),
+                        ]
+                    ),
+                ),
+                ("object_id", models.UUIDField()),
+                ("person_id", models.UUIDField()),
+                ("deleted_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "api_tombstone",
+            },
+        ),
+        api.operations.AddIndexConcurrently(
+            model_name="address",
+            index=models.Index(
+                fields=["updated_at", "id"], name="address_updated_id_idx"
+            ),
+        ),
+        api.operations.AddIndexConcurrently(
+            model_name="creditcard",
+            index=models.Index(
+                fields=["updated_at", "id"], name="creditcard_updated_id_idx"
+            ),
+        ),
+        api.operations.AddIndexConcurrently(
+            model_name="person",
+            index=models.Index(
+                fields=["updated_at", "id"], name="person_updated_id_idx"
+            ),
+        ),
+        api.operations.AddIndexConcurrently(
+            model_name="tombstone",
+            index=models.Index(
+                fields=["deleted_at", "object_id"],
+                name="tombstone_deleted_idx",
+            ),
+        ),
+    ]
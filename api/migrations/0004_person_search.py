@@ -0,0 +1,43 @@
+# Generated by Django 5.0.1 on 2026-10-17 01:41
+
+import api.indexes
+import api.operations
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ("api", "0003_change_feed"),
+    ]
+
+    operations = [
+        # Needed by the GIN indexes on PostgreSQL, a no-op elsewhere
+        api.operations.TrigramExtension(),
+        api.operations.AddIndexConcurrently(
+            model_name="address",
+            index=models.Index(
+                fields=["zip_code", "person"], name="address_zip_person_idx"
+            ),
+        ),
+        api.operations.AddIndexConcurrently(
+            model_name="address",
+            index=models.Index(
+                fields=["state", "person"], name="address_state_person_idx"
+            ),
+        ),
+        api.operations.AddIndexConcurrently(
+            model_name="person",
+            index=api.indexes.NameSearchIndex(
+                "first_name", name="person_first_name_search_idx"
+            ),
+        ),
+        api.operations.AddIndexConcurrently(
+            model_name="person",
+            index=api.indexes.NameSearchIndex(
+                "last_name", name="person_last_name_search_idx"
+            ),
+        ),
+    ]
@@ -6,6 +6,8 @@ from django.core.validators import (
     MaxValueValidator,
 )
 
+from .indexes import NameSearchIndex
+
 
 class Person(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -31,6 +33,19 @@ class Person(models.Model):
         ordering = [
             "-created_at"
         ]  # Add default ordering to fix pagination warnings
+        indexes = [
+            # Page-number and keyset pagination order
+            models.Index(
+                fields=["created_at", "id"], name="person_created_id_idx"
+            ),
+            # Change feed order
+            models.Index(
+                fields=["updated_at", "id"], name="person_updated_id_idx"
+            ),
+            # Person search (api/search.py)
+            NameSearchIndex("first_name", name="person_first_name_search_idx"),
+            NameSearchIndex("last_name", name="person_last_name_search_idx"),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=models.Q(ssn__isnull=True)
@@ -80,6 +95,24 @@ class Address(models.Model):
         ordering = [
             "-created_at"
         ]  # Add default ordering to fix pagination warnings
+        indexes = [
+            # Per-person listings, newest first (keyset adds the id)
+            models.Index(
+                fields=["person", "created_at", "id"],
+                name="address_person_created_idx",
+            ),
+            # Change feed order
+            models.Index(
+                fields=["updated_at", "id"], name="address_updated_id_idx"
+            ),
+            # Person search filters
+            models.Index(
+                fields=["zip_code", "person"], name="address_zip_person_idx"
+            ),
+            models.Index(
+                fields=["state", "person"], name="address_state_person_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         return (
@@ -116,6 +149,46 @@ class CreditCard(models.Model):
         ordering = [
             "-created_at"
         ]  # Add default ordering to fix pagination warnings
+        indexes = [
+            # Per-person listings, newest first (keyset adds the id)
+            models.Index(
+                fields=["person", "created_at", "id"],
+                name="creditcard_person_created_idx",
+            ),
+            # Change feed order
+            models.Index(
+                fields=["updated_at", "id"], name="creditcard_updated_id_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.card_type} ****{self.last_four_digits}"
+
+
+class Tombstone(models.Model):
+    """A deleted person, address or credit card, for the change feed."""
+
+    PERSON, ADDRESS, CREDIT_CARD = 1, 2, 3
+    OBJECT_TYPE_CHOICES = [
+        (PERSON, "person"),
+        (ADDRESS, "address"),
+        (CREDIT_CARD, "creditcard"),
+    ]
+
+    object_type = models.PositiveSmallIntegerField(choices=OBJECT_TYPE_CHOICES)
+    object_id = models.UUIDField()
+    person_id = models.UUIDField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "api_tombstone"
+        indexes = [
+            # Change feed order
+            models.Index(
+                fields=["deleted_at", "object_id"],
+                name="tombstone_deleted_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_object_type_display()} {self.object_id}"
@@ -0,0 +1,52 @@
+from django.contrib.postgres import operations as postgres_operations
+from django.db.migrations.operations import AddIndex
+
+
+class AddIndexConcurrently(postgres_operations.AddIndexConcurrently):
+    """``AddIndexConcurrently`` that falls back to ``AddIndex`` off Postgres.
+
+    On PostgreSQL the index is built with ``CREATE INDEX CONCURRENTLY``,
+    which doesn't block writes to a large table while it runs; the
+    migration needs ``atomic = False``. Other backends (SQLite in local
+    development) get a plain ``CREATE INDEX``.
+    """
+
+    def database_forwards(
+        self, app_label, schema_editor, from_state, to_state
+    ):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        else:
+            AddIndex.database_forwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+
+    def database_backwards(
+        self, app_label, schema_editor, from_state, to_state
+    ):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        else:
+            AddIndex.database_backwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+
+
+class TrigramExtension(postgres_operations.TrigramExtension):
+    """``TrigramExtension`` that is a no-op off Postgres in both directions.
+
+    Django's only checks the backend going forwards, so unapplying it on
+    SQLite failed on a query of ``pg_extension``.
+    """
+
+    def database_backwards(
+        self, app_label, schema_editor, from_state, to_state
+    ):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
@@ -0,0 +1,199 @@
+import base64
+import json
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, List, Optional
+from urllib import parse
+from uuid import UUID
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _position(row: Any) -> tuple:
+    """Return ``(created_at, pk)`` of a model instance or ``.values()`` row."""
+    if isinstance(row, dict):
+        return row["created_at"], row["id"]
+    return row.created_at, row.pk
+
+
+class KeysetPagination(BasePagination):
+    """Count-free keyset pagination on ``(created_at, id)``.
+
+    Rows are ordered newest first, matching the models' ``-created_at``
+    default ordering, with ``id`` as a tie-breaker so that the position
+    encoded in a cursor is unique. Each page is a single indexed range
+    query, so page 10,000 costs the same as page 1.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self) -> None:
+        self.page_size: int = settings.REST_FRAMEWORK.get("PAGE_SIZE") or 100
+        self.base_url: str = ""
+        self.next_position: Optional[tuple] = None
+        self.previous_position: Optional[tuple] = None
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Any, view: Any = None
+    ) -> List[Any]:
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        cursor = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        reverse = False
+        if cursor is not None:
+            created_at, pk, reverse = cursor
+            # The redundant bound on created_at alone lets the planner seek
+            # into the (created_at, id) index instead of filtering a scan.
+            if reverse:
+                queryset = queryset.order_by("created_at", "id").filter(
+                    Q(created_at__gte=created_at),
+                    Q(created_at__gt=created_at) | Q(id__gt=pk),
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__lte=created_at),
+                    Q(created_at__lt=created_at) | Q(id__lt=pk),
+                )
+
+        # Fetch one extra row to learn whether another page exists
+        # without issuing a COUNT(*).
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.next_position = None
+        self.previous_position = None
+        if results:
+            first, last = results[0], results[-1]
+            if reverse:
+                has_next, has_previous = True, has_more
+            else:
+                has_next, has_previous = has_more, cursor is not None
+            if has_next:
+                self.next_position = (*_position(last), False)
+            if has_previous:
+                self.previous_position = (*_position(first), True)
+
+        return results
+
+    def get_page_size(self, request: Any) -> int:
+        value = request.query_params.get(self.page_size_query_param)
+        if value:
+            try:
+                size = int(value)
+            except ValueError:
+                size = 0
+            if size > 0:
+                return min(size, self.max_page_size)
+        return self.page_size
+
+    def decode_cursor(self, request: Any) -> Optional[tuple]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded).decode())
+            created_at = datetime.fromisoformat(payload["c"])
+            pk = UUID(payload["i"])
+            reverse = bool(payload.get("r", False))
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk, reverse
+
+    def encode_cursor(self, position: tuple) -> str:
+        created_at, pk, reverse = position
+        payload = {"c": created_at.isoformat(), "i": str(pk)}
+        if reverse:
+            payload["r"] = 1
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        encoded = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_next_link(self) -> Optional[str]:
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position)
+
+    def get_previous_link(self) -> Optional[str]:
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position)
+
+    def get_paginated_response(self, data: Any) -> Response:
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema: Any) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "previous": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+
+class ListPagination(BasePagination):
+    """Pagination used by the person, address and credit card lists.
+
+    Delegates to ``KeysetPagination`` when ``API_PAGINATION_MODE`` is
+    ``"keyset"`` or the request carries a ``cursor`` parameter, and to
+    DRF's ``PageNumberPagination`` otherwise so existing clients keep the
+    ``count``/``page`` response shape.
+    """
+
+    def __init__(self) -> None:
+        self.paginator: Optional[BasePagination] = None
+
+    def _select(self, request: Any) -> BasePagination:
+        mode = getattr(settings, "API_PAGINATION_MODE", "page")
+        if (
+            mode == "keyset"
+            or KeysetPagination.cursor_query_param in request.query_params
+            or request.query_params.get("pagination") == "keyset"
+        ):
+            return KeysetPagination()
+        return PageNumberPagination()
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Any, view: Any = None
+    ) -> Optional[List[Any]]:
+        self.paginator = self._select(request)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data: Any) -> Response:
+        assert self.paginator is not None
+        return self.paginator.get_paginated_response(data)
+
+
+def cursor_from_link(link: Optional[str]) -> Optional[str]:
+    """Extract the opaque cursor token from a next/previous link."""
+    if not link:
+        return None
+    query = parse.parse_qs(parse.urlsplit(link).query)
+    values = query.get(KeysetPagination.cursor_query_param)
+    return values[0] if values else None
@@ -0,0 +1,123 @@
+import math
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import BaseCache, cache as default_cache
+from django.utils.module_loading import import_string
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of a single rate limit check."""
+
+    allowed: bool
+    remaining: int
+    reset_at: float  # Unix timestamp
+
+
+class RateLimiter:
+    """Base class for pluggable rate limiter engines."""
+
+    key_prefix = "rate_limit"
+
+    def __init__(self, cache: Optional[BaseCache] = None) -> None:
+        self.cache = cache or default_cache
+
+    def hit(
+        self, client_id: str, max_requests: int, window_seconds: int
+    ) -> RateLimitResult:
+        """Record a request for ``client_id`` if it is within the limit."""
+        raise NotImplementedError
+
+    def peek(
+        self, client_id: str, max_requests: int, window_seconds: int
+    ) -> RateLimitResult:
+        """Report the current state for ``client_id`` without recording."""
+        raise NotImplementedError
+
+
+class SlidingWindowCounterLimiter(RateLimiter):
+    """Sliding-window counter limiter.
+
+    Keeps one integer per client per fixed window. The number of requests
+    in the trailing window is estimated from the current window's count
+    plus the previous window's count weighted by how much of it still
+    overlaps the trailing window. Counters are updated with atomic
+    ``cache.add``/``cache.incr`` so the estimate stays consistent across
+    gunicorn workers sharing a cache (``CACHE_BACKEND``); with the default
+    per-process cache each worker enforces its own limit, which
+    ``api.checks`` warns about.
+    """
+
+    def _keys(self, client_id: str, bucket: int) -> tuple:
+        return (
+            f"{self.key_prefix}:{client_id}:{bucket}",
+            f"{self.key_prefix}:{client_id}:{bucket - 1}",
+        )
+
+    def _state(self, window_seconds: int) -> tuple:
+        now = time.time()
+        bucket = int(now // window_seconds)
+        elapsed = (now - bucket * window_seconds) / window_seconds
+        reset_at = (bucket + 1) * window_seconds
+        return bucket, 1.0 - elapsed, reset_at
+
+    def hit(
+        self, client_id: str, max_requests: int, window_seconds: int
+    ) -> RateLimitResult:
+        bucket, previous_weight, reset_at = self._state(window_seconds)
+        current_key, previous_key = self._keys(client_id, bucket)
+
+        # Counters live for two windows so the next window can weight them.
+        self.cache.add(current_key, 0, timeout=window_seconds * 2)
+        try:
+            current = self.cache.incr(current_key)
+        except ValueError:
+            # Evicted between add and incr; start the window again.
+            self.cache.set(current_key, 1, timeout=window_seconds * 2)
+            current = 1
+        previous = self.cache.get(previous_key, 0)
+
+        estimate = previous * previous_weight + current
+        if estimate > max_requests:
+            # Rejected requests must not consume quota.
+            try:
+                self.cache.decr(current_key)
+            except ValueError:
+                pass
+            return RateLimitResult(False, 0, reset_at)
+
+        remaining = max(0, max_requests - math.ceil(estimate))
+        return RateLimitResult(True, remaining, reset_at)
+
+    def peek(
+        self, client_id: str, max_requests: int, window_seconds: int
+    ) -> RateLimitResult:
+        bucket, previous_weight, reset_at = self._state(window_seconds)
+        current_key, previous_key = self._keys(client_id, bucket)
+        counts = self.cache.get_many([current_key, previous_key])
+        estimate = counts.get(previous_key, 0) * previous_weight + counts.get(
+            current_key, 0
+        )
+        remaining = max(0, max_requests - math.ceil(estimate))
+        return RateLimitResult(remaining > 0, remaining, reset_at)
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_path: Optional[str] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the limiter configured by ``RATE_LIMIT_ENGINE``."""
+    global _limiter, _limiter_path
+    path = getattr(
+        settings,
+        "RATE_LIMIT_ENGINE",
+        "api.ratelimit.SlidingWindowCounterLimiter",
+    )
+    if _limiter is None or path != _limiter_path:
+        _limiter = import_string(path)()
+        _limiter_path = path
+    return _limiter
@@ -0,0 +1,136 @@
+"""
+Lightweight read models: rows loaded as slotted records instead of model
+instances.
+
+A ``ReadModel`` reads the columns it needs with ``values_list()`` and
+builds one ``__slots__`` dataclass record per row, with no ``_state``,
+field descriptors or signals. Child relations are loaded with one query
+each and grouped onto their parents by foreign key, like
+``prefetch_related`` but into plain lists. Records answer ``pk`` and
+``serializable_value()``, so both the compiled representations and the
+DRF serializers read them like model instances.
+"""
+import dataclasses
+from itertools import starmap
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from django.db import models
+from django.db.models.query import ValuesListIterable
+
+
+class Record:
+    """Base class of the generated record classes."""
+
+    __slots__ = ()
+
+    # Model field name -> attribute name, e.g. "person" -> "person_id"
+    _attnames: Dict[str, str] = {}
+
+    @property
+    def pk(self) -> Any:
+        return self.id
+
+    def serializable_value(self, field_name: str) -> Any:
+        """Same as ``Model.serializable_value``: the foreign key's id."""
+        return getattr(self, self._attnames.get(field_name, field_name))
+
+
+class RecordIterable(ValuesListIterable):
+    """Yield records instead of tuples from a ``values_list()`` query."""
+
+    record: Any = None
+
+    def __iter__(self) -> Iterator[Any]:
+        return starmap(self.record, super().__iter__())
+
+
+class ReadModel:
+    """Load ``model`` rows, and ``children`` relations, as records.
+
+    ``columns`` are the attribute names to read (default: every concrete
+    field); ``id`` and the foreign keys ``children`` group by are added.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        columns: Optional[Sequence[str]] = None,
+        children: Optional[Dict[str, "ReadModel"]] = None,
+    ) -> None:
+        self.model = model
+        self.children = children or {}
+        fields = model._meta.concrete_fields
+        if columns is None:
+            columns = [field.attname for field in fields]
+        self.columns = list(dict.fromkeys(["id", *columns]))
+        self.relations = {}
+        for name, child in self.children.items():
+            relation = model._meta.get_field(name)
+            attname = relation.field.attname
+            if attname not in child.columns:
+                raise ValueError(f"{child!r} does not load {attname}")
+            self.relations[name] = attname
+
+        self.record = dataclasses.make_dataclass(
+            f"{model.__name__}Record",
+            [
+                *self.columns,
+                *(
+                    (name, list, dataclasses.field(default_factory=list))
+                    for name in self.children
+                ),
+            ],
+            bases=(Record,),
+            namespace={
+                "_attnames": {
+                    field.name: field.attname
+                    for field in fields
+                    if field.attname in self.columns
+                }
+            },
+            eq=False,
+            slots=True,
+        )
+        self.iterable = type(
+            f"{model.__name__}RecordIterable",
+            (RecordIterable,),
+            {"record": self.record},
+        )
+
+    def __repr__(self) -> str:
+        return f"<ReadModel {self.model.__name__}: {', '.join(self.columns)}>"
+
+    def queryset(self, queryset: Optional[models.QuerySet] = None) -> Any:
+        """Return ``queryset`` as a query that yields records.
+
+        It can still be filtered, ordered, sliced and counted, e.g. by a
+        paginator; children are loaded separately by ``load_children``.
+        """
+        if queryset is None:
+            queryset = self.model._default_manager.all()
+        queryset = queryset.prefetch_related(None).values_list(*self.columns)
+        # values_list() has no public hook for the row type
+        queryset._iterable_class = self.iterable
+        return queryset
+
+    def load_children(self, records: Iterable[Any]) -> List[Any]:
+        """Fill the child lists of ``records``, one query per relation."""
+        records = list(records)
+        if not self.children or not records:
+            return records
+        by_id = {record.id: record for record in records}
+        for name, child in self.children.items():
+            relation = self.model._meta.get_field(name)
+            attname = self.relations[name]
+            children = child.fetch(
+                relation.related_model._default_manager.filter(
+                    **{f"{attname}__in": list(by_id)}
+                )
+            )
+            for record in children:
+                getattr(by_id[getattr(record, attname)], name).append(record)
+        return records
+
+    def fetch(self, queryset: Optional[models.QuerySet] = None) -> List[Any]:
+        """Return the records of ``queryset`` with their children."""
+        return self.load_children(self.queryset(queryset))
@@ -0,0 +1,54 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSON renderer backed by orjson when it is installed.
+
+    orjson serializes UUID, date and datetime values natively and produces
+    the same bytes as ``JSONRenderer`` for the compact, UTF-8 output DRF
+    uses by default. Anything orjson cannot handle goes through DRF's
+    encoder, and the renderer falls back to ``JSONRenderer`` entirely when
+    orjson is missing, pretty printing is requested or ``COMPACT_JSON``/
+    ``UNICODE_JSON`` are disabled.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=_default,
+                option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Match JSONRenderer, which escapes U+2028/U+2029 so the output is
+        # a strict JavaScript subset.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
+
+
+_encoder = encoders.JSONEncoder()
+
+
+def _default(obj):
+    return _encoder.default(obj)
@@ -0,0 +1,155 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Replica serving the current request's reads, set by
+# api.middleware.ReplicaRoutingMiddleware; None reads from the primary
+_read_alias: ContextVar[Optional[str]] = ContextVar(
+    "api_read_alias", default=None
+)
+
+# Seconds a Postgres replica is behind the primary; 0 when it has replayed
+# everything it received, NULL on a primary
+REPLICATION_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+def replica_aliases() -> List[str]:
+    return list(getattr(settings, "DATABASE_REPLICAS", ()))
+
+
+def get_read_alias() -> Optional[str]:
+    return _read_alias.get()
+
+
+@contextmanager
+def read_from(alias: Optional[str]) -> Iterator[None]:
+    """Route ORM reads in this context to ``alias`` (None: the primary)."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """Send reads to the replica chosen for the current request.
+
+    Writes, migrations and reads outside a routed request (management
+    commands, shells, unsafe requests) use the primary.
+    """
+
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        if model._meta.app_label == "django_cache":
+            # CACHE_BACKEND=database: pins and counters written moments
+            # ago may not have reached a replica yet
+            return DEFAULT_DB_ALIAS
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints) -> str:
+        # Without this, saving an instance read from a replica would write
+        # to the replica it came from
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> Optional[bool]:
+        aliases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints) -> Optional[bool]:
+        # Replicas get their schema through replication
+        if db in replica_aliases():
+            return False
+        return None
+
+
+class ReplicaHealth:
+    """Per-process, cached health of the replica aliases.
+
+    A replica is healthy when it answers and, on Postgres, lags the primary
+    by at most ``DB_REPLICA_MAX_LAG_SECONDS``. Results are reused for
+    ``DB_REPLICA_CHECK_SECONDS``, so a replica that fails is skipped, and
+    reads fall back to the primary, until it passes a later check.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # alias -> (expires at, healthy)
+        self._results: Dict[str, Tuple[float, bool]] = {}
+
+    def cached(self, alias: str) -> Optional[bool]:
+        """Return the unexpired result for ``alias``, or None."""
+        result = self._results.get(alias)
+        if result is None or result[0] <= time.monotonic():
+            return None
+        return result[1]
+
+    def is_healthy(self, alias: str) -> bool:
+        healthy = self.cached(alias)
+        if healthy is None:
+            healthy = self.check(alias)
+        return healthy
+
+    def check(self, alias: str) -> bool:
+        """Check ``alias`` now and cache the result."""
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                if connection.vendor == "postgresql":
+                    cursor.execute(REPLICATION_LAG_SQL)
+                else:
+                    cursor.execute("SELECT NULL")
+                lag = cursor.fetchone()[0]
+        except DatabaseError as ex:
+            logger.warning(f"Read replica {alias} is unavailable: {ex}")
+            connection.close()
+            healthy = False
+        else:
+            max_lag = getattr(settings, "DB_REPLICA_MAX_LAG_SECONDS", 30)
+            healthy = lag is None or float(lag) <= max_lag
+            if not healthy:
+                logger.warning(
+                    f"Read replica {alias} is {float(lag):.1f}s behind"
+                )
+        self.set(alias, healthy)
+        return healthy
+
+    def set(self, alias: str, healthy: bool) -> None:
+        ttl = getattr(settings, "DB_REPLICA_CHECK_SECONDS", 10)
+        with self._lock:
+            self._results[alias] = (time.monotonic() + ttl, healthy)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+    def choose(self) -> Optional[str]:
+        """Return a healthy replica at random, or None for the primary."""
+        candidates = replica_aliases()
+        random.shuffle(candidates)
+        for alias in candidates:
+            if self.is_healthy(alias):
+                return alias
+        return None
+
+
+replica_health = ReplicaHealth()
+
+
+def pin_key(client_id: str) -> str:
+    return f"replica:pin:{client_id}"
@@ -0,0 +1,193 @@
+"""
+Person search behind ``GET /api/person/search/``.
+
+Name terms match ``LOWER(first_name)``/``LOWER(last_name)``, which
+``NameSearchIndex`` indexes: a trigram GIN index on PostgreSQL, a B-tree
+elsewhere. Address and credit card filters are ``EXISTS`` subqueries, so
+a person is returned once however many of their rows match.
+"""
+import re
+from typing import Any, Dict, List, Mapping, Optional
+
+from django.contrib.postgres.lookups import TrigramSimilar
+from django.db import connections
+from django.db.models import (
+    Exists,
+    F,
+    FloatField,
+    Func,
+    OuterRef,
+    Q,
+    QuerySet,
+    Value,
+)
+from django.db.models.functions import Lower
+from django.db.models.lookups import GreaterThanOrEqual, LessThan, StartsWith
+from rest_framework.exceptions import ValidationError
+
+from .models import Address, CreditCard
+
+# pg_trgm's default similarity threshold, which its % operator applies
+SIMILARITY_THRESHOLD = 0.3
+
+NAME_FIELDS = {
+    "first_name": ("first_name",),
+    "last_name": ("last_name",),
+    "name": ("first_name", "last_name"),
+}
+MATCH_MODES = ("prefix", "fuzzy")
+FILTERS = ("zip_code", "state", "card_type", "is_active")
+
+_ZIP_CODE = re.compile(r"^\d{5}(-\d{4})?$")
+_STATE = re.compile(r"^[A-Za-z]{2}$")
+_WORDS = re.compile(r"[^\W_]+")
+_ASCII_LOWER = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"
+)
+
+
+def trigrams(value: str) -> set:
+    """Return the trigrams of ``value`` the way pg_trgm extracts them."""
+    result = set()
+    for word in _WORDS.findall(value.lower()):
+        padded = f"  {word} "
+        result.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def similarity(a: Optional[str], b: Optional[str]) -> Optional[float]:
+    """pg_trgm's ``similarity()``, registered as ``API_SIMILARITY`` on
+    SQLite connections by ``api.signals``."""
+    if a is None or b is None:
+        return None
+    left, right = trigrams(a), trigrams(b)
+    if not left or not right:
+        return 0.0
+    shared = len(left & right)
+    return shared / (len(left) + len(right) - shared)
+
+
+class Similarity(Func):
+    function = "API_SIMILARITY"
+    output_field = FloatField()
+
+
+class PersonSearch:
+    """Validate search parameters and apply them to a person queryset.
+
+    ``first_name``, ``last_name`` and ``name`` (either of the two) are
+    matched by prefix, or with ``match=fuzzy`` by trigram similarity.
+    ``zip_code`` and ``state`` must match the same address, and
+    ``card_type`` and ``is_active`` the same credit card.
+    """
+
+    def __init__(self, params: Mapping[str, Any]) -> None:
+        self.terms: Dict[str, str] = {}
+        self.filters: Dict[str, Any] = {}
+        errors: Dict[str, List[str]] = {}
+
+        for name in NAME_FIELDS:
+            value = (params.get(name) or "").strip()
+            if value:
+                self.terms[name] = value
+        self.match = params.get("match") or "prefix"
+        if self.match not in MATCH_MODES:
+            errors["match"] = [f"Expected {' or '.join(MATCH_MODES)}."]
+
+        zip_code = params.get("zip_code")
+        if zip_code:
+            if _ZIP_CODE.match(zip_code):
+                self.filters["zip_code"] = zip_code
+            else:
+                errors["zip_code"] = ["Expected 12345 or 12345-6789."]
+        state = params.get("state")
+        if state:
+            if _STATE.match(state):
+                self.filters["state"] = state.upper()
+            else:
+                errors["state"] = ["Expected a two-letter state code."]
+        card_type = params.get("card_type")
+        if card_type:
+            card_types = [value for value, _ in CreditCard.CARD_TYPE_CHOICES]
+            if card_type in card_types:
+                self.filters["card_type"] = card_type
+            else:
+                errors["card_type"] = [f"Expected {', '.join(card_types)}."]
+        is_active = params.get("is_active")
+        if is_active:
+            if is_active.lower() in ("true", "1", "false", "0"):
+                self.filters["is_active"] = is_active.lower() in ("true", "1")
+            else:
+                errors["is_active"] = ["Expected true or false."]
+
+        if not errors and not self.terms and not self.filters:
+            errors["non_field_errors"] = [
+                "Give a name (first_name, last_name or name) or a filter "
+                f"({', '.join(FILTERS)})."
+            ]
+        if errors:
+            raise ValidationError(errors)
+
+    def apply(self, queryset: QuerySet) -> QuerySet:
+        vendor = connections[queryset.db].vendor
+        for name, term in self.terms.items():
+            condition = Q()
+            for field in NAME_FIELDS[name]:
+                condition |= self._name_condition(field, term, vendor)
+            queryset = queryset.filter(condition)
+
+        addresses = self._address_filters()
+        if addresses:
+            queryset = queryset.filter(
+                Exists(
+                    Address.objects.filter(person=OuterRef("pk"), **addresses)
+                )
+            )
+        cards = {
+            key: self.filters[key]
+            for key in ("card_type", "is_active")
+            if key in self.filters
+        }
+        if cards:
+            queryset = queryset.filter(
+                Exists(
+                    CreditCard.objects.filter(person=OuterRef("pk"), **cards)
+                )
+            )
+        return queryset
+
+    def _address_filters(self) -> Dict[str, Any]:
+        filters = {}
+        zip_code = self.filters.get("zip_code")
+        if zip_code is not None:
+            if len(zip_code) == 5:
+                # Both 12345 and 12345-xxxx, as an index range
+                filters["zip_code__gte"] = zip_code
+                filters["zip_code__lte"] = f"{zip_code}-9999"
+            else:
+                filters["zip_code"] = zip_code
+        if "state" in self.filters:
+            filters["state"] = self.filters["state"]
+        return filters
+
+    def _name_condition(self, field: str, term: str, vendor: str) -> Any:
+        lowered = Lower(field)
+        if vendor == "postgresql":
+            if self.match == "fuzzy":
+                return Q(TrigramSimilar(lowered, term.lower()))
+            return Q(StartsWith(lowered, term.lower()))
+
+        if self.match == "fuzzy":
+            return Q(
+                GreaterThanOrEqual(
+                    Similarity(F(field), Value(term)),
+                    SIMILARITY_THRESHOLD,
+                )
+            )
+        # SQLite's LOWER() folds ASCII letters only; a range on it can use
+        # the B-tree index, unlike LIKE
+        prefix = term.translate(_ASCII_LOWER)
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return Q(GreaterThanOrEqual(lowered, prefix)) & Q(
+            LessThan(lowered, upper)
+        )
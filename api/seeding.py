@@ -0,0 +1,285 @@
+import datetime
+import random
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .models import Address, CreditCard, Person
+from .workers import init_worker
+
+# Persons generated from one random stream. Blocks, not batches or
+# workers, fix the data, so any --workers/--batch-size gives the same rows.
+BLOCK_SIZE = 1000
+
+# Person n is created about n minutes after EPOCH
+EPOCH = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+# fmt: off
+FIRST_NAMES = [
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael",
+    "Linda", "David", "Elizabeth", "William", "Barbara", "Richard", "Susan",
+    "Joseph", "Jessica", "Thomas", "Sarah", "Christopher", "Karen", "Daniel",
+    "Lisa", "Matthew", "Nancy", "Anthony", "Betty", "Mark", "Sandra",
+    "Donald", "Margaret", "Steven", "Ashley", "Andrew", "Kimberly", "Paul",
+    "Emily", "Joshua", "Donna", "Kenneth", "Michelle", "Maria", "Jose",
+    "Wei", "Aisha", "Mohammed", "Priya", "Hiroshi", "Olga", "Fatima", "Luis",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller",
+    "Davis", "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez",
+    "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark",
+    "Ramirez", "Lewis", "Robinson", "Walker", "Young", "Allen", "King",
+    "Wright", "Scott", "Torres", "Nguyen", "Hill", "Flores", "Green",
+    "Adams", "Nelson", "Baker", "Hall", "Rivera", "Campbell", "Mitchell",
+    "Carter", "Roberts", "Kim", "Patel", "O'Brien", "Müller", "Chen",
+]
+STREET_NAMES = [
+    "Main", "Oak", "Pine", "Maple", "Cedar", "Elm", "Washington", "Lake",
+    "Hill", "Park", "View", "Sunset", "Lincoln", "Church", "River", "Mill",
+]
+# fmt: on
+STREET_SUFFIXES = ["St", "Ave", "Rd", "Blvd", "Ln", "Dr", "Ct", "Way"]
+# (city, state, first three zip digits), most populous first
+CITIES = [
+    ("New York", "NY", "100"),
+    ("Los Angeles", "CA", "900"),
+    ("Chicago", "IL", "606"),
+    ("Houston", "TX", "770"),
+    ("Phoenix", "AZ", "850"),
+    ("Philadelphia", "PA", "191"),
+    ("San Antonio", "TX", "782"),
+    ("San Diego", "CA", "921"),
+    ("Dallas", "TX", "752"),
+    ("Austin", "TX", "787"),
+    ("Jacksonville", "FL", "322"),
+    ("Columbus", "OH", "432"),
+    ("Charlotte", "NC", "282"),
+    ("Seattle", "WA", "981"),
+    ("Denver", "CO", "802"),
+    ("Boston", "MA", "021"),
+    ("Nashville", "TN", "372"),
+    ("Portland", "OR", "972"),
+    ("Atlanta", "GA", "303"),
+    ("Miami", "FL", "331"),
+]
+CITY_WEIGHTS = [1 / (rank + 2) for rank in range(len(CITIES))]
+
+ADDRESS_TYPES = (("Home", "Work", "Mailing"), (65, 25, 10))
+CARD_TYPES = (
+    ("Visa", "MasterCard", "American Express", "Discover"),
+    (52, 30, 12, 6),
+)
+# Addresses and cards per person
+ADDRESS_COUNTS = ((0, 1, 2, 3), (3, 60, 28, 9))
+CARD_COUNTS = ((0, 1, 2, 3, 4), (25, 40, 23, 9, 3))
+
+Rows = Tuple[List[Person], List[Address], List[CreditCard]]
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _ssn(rng: random.Random) -> Optional[str]:
+    """A valid-looking SSN (no 000/666/9xx area, 00 group or 0000 serial)
+    in either format chk_ssn_format allows, or None."""
+    if rng.random() < 0.05:
+        return None
+    area = rng.randrange(1, 899)
+    area += area >= 666
+    group, serial = rng.randrange(1, 100), rng.randrange(1, 10000)
+    if rng.random() < 0.3:
+        return f"{area:03d}-{group:02d}-{serial:04d}"
+    return f"{area:03d}{group:02d}{serial:04d}"
+
+
+def _person(rng: random.Random, index: int) -> Person:
+    created_at = EPOCH + datetime.timedelta(
+        minutes=index, seconds=rng.randrange(60)
+    )
+    return Person(
+        id=_uuid(rng),
+        first_name=rng.choice(FIRST_NAMES),
+        last_name=rng.choice(LAST_NAMES),
+        birth_date=datetime.date(1940, 1, 1)
+        + datetime.timedelta(days=rng.randrange(66 * 365)),
+        ssn=_ssn(rng),
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+def _address(rng: random.Random, person: Person, number: int) -> Address:
+    city, state, zip_prefix = rng.choices(CITIES, CITY_WEIGHTS)[0]
+    zip_code = f"{zip_prefix}{rng.randrange(100):02d}"
+    if rng.random() < 0.2:
+        zip_code += f"-{rng.randrange(10000):04d}"
+    created_at = person.created_at + datetime.timedelta(
+        hours=rng.randrange(24 * 30)
+    )
+    return Address(
+        id=_uuid(rng),
+        # The id, not the instance: skips the related descriptor
+        person_id=person.id,
+        address_type=rng.choices(*ADDRESS_TYPES)[0],
+        street_address=(
+            f"{rng.randrange(1, 10000)} {rng.choice(STREET_NAMES)} "
+            f"{rng.choice(STREET_SUFFIXES)}"
+        ),
+        city=city,
+        state=state,
+        zip_code=zip_code,
+        is_primary=number == 0,
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+def _card(rng: random.Random, person: Person) -> CreditCard:
+    created_at = person.created_at + datetime.timedelta(
+        hours=rng.randrange(24 * 365)
+    )
+    return CreditCard(
+        id=_uuid(rng),
+        person_id=person.id,
+        card_type=rng.choices(*CARD_TYPES)[0],
+        last_four_digits=f"{rng.randrange(10000):04d}",
+        expiration_month=rng.randrange(1, 13),
+        expiration_year=rng.randrange(2024, 2031),
+        is_active=rng.random() < 0.9,
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+def generate(seed: int, start: int, stop: int) -> Rows:
+    """Return persons ``start`` to ``stop - 1`` of ``seed``'s data set
+    with their addresses and credit cards, unsaved."""
+    persons: List[Person] = []
+    addresses: List[Address] = []
+    cards: List[CreditCard] = []
+    for block in range(start // BLOCK_SIZE, -(-stop // BLOCK_SIZE)):
+        rng = random.Random(f"{seed}:{block}")
+        first = block * BLOCK_SIZE
+        for index in range(first, first + BLOCK_SIZE):
+            # Generate the whole block so skipping persons keeps the stream
+            person = _person(rng, index)
+            person_addresses = [
+                _address(rng, person, number)
+                for number in range(rng.choices(*ADDRESS_COUNTS)[0])
+            ]
+            person_cards = [
+                _card(rng, person) for _ in range(rng.choices(*CARD_COUNTS)[0])
+            ]
+            if start <= index < stop:
+                persons.append(person)
+                addresses.extend(person_addresses)
+                cards.extend(person_cards)
+    return persons, addresses, cards
+
+
+def _restore_timestamps(model: Any, rows: List[Tuple]) -> None:
+    """Set ``(created_at, updated_at, id)`` rows back on ``model``'s table,
+    which bulk_create stamped with "now" (auto_now_add/auto_now)."""
+    connection = connections[DEFAULT_DB_ALIAS]
+    created_at, updated_at, pk = (
+        model._meta.get_field(name)
+        for name in ("created_at", "updated_at", "id")
+    )
+    sql = "UPDATE {} SET {} = %s, {} = %s WHERE {} = %s".format(
+        *map(
+            connection.ops.quote_name,
+            (
+                model._meta.db_table,
+                created_at.column,
+                updated_at.column,
+                pk.column,
+            ),
+        )
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            sql,
+            [
+                tuple(
+                    field.get_db_prep_value(value, connection)
+                    for field, value in zip((created_at, updated_at, pk), row)
+                )
+                for row in rows
+            ],
+        )
+
+
+def write(
+    seed: int, start: int, stop: int, batch_size: int
+) -> Tuple[int, int, int]:
+    """Generate and insert persons ``start`` to ``stop - 1``; return the
+    person, address and credit card counts."""
+    persons, addresses, cards = generate(seed, start, stop)
+    with transaction.atomic():
+        for model, rows in (
+            (Person, persons),
+            (Address, addresses),
+            (CreditCard, cards),
+        ):
+            # Read before bulk_create overwrites them on the instances
+            timestamps = [
+                (row.created_at, row.updated_at, row.pk) for row in rows
+            ]
+            model.objects.bulk_create(rows, batch_size=batch_size)
+            _restore_timestamps(model, timestamps)
+    return len(persons), len(addresses), len(cards)
+
+
+def usable_workers(requested: int) -> int:
+    """Return how many worker processes the database can take."""
+    # SQLite has one writer at a time and doesn't share in-memory databases
+    if connections[DEFAULT_DB_ALIAS].vendor == "sqlite":
+        return 1
+    return max(requested, 1)
+
+
+def seed_data(
+    persons: int,
+    seed: int = 0,
+    start: int = 0,
+    workers: int = 1,
+    batch_size: int = 5000,
+    progress: Optional[Callable[[Dict[str, int]], None]] = None,
+) -> Dict[str, int]:
+    """Insert persons ``start`` to ``persons - 1`` of ``seed``'s data set,
+    ``batch_size`` persons per transaction, from ``workers`` processes.
+
+    Returns the row counts per model; ``progress`` is called with the
+    running totals after every batch.
+    """
+    ranges = [
+        (first, min(first + batch_size, persons))
+        for first in range(start, persons, batch_size)
+    ]
+    totals = {"persons": 0, "addresses": 0, "credit_cards": 0}
+
+    def add(counts: Tuple[int, int, int]) -> None:
+        for key, count in zip(totals, counts):
+            totals[key] += count
+        if progress is not None:
+            progress(dict(totals))
+
+    if workers <= 1:
+        for first, stop in ranges:
+            add(write(seed, first, stop, batch_size))
+        return totals
+
+    # Workers open their own connections; don't hand them open ones
+    connections.close_all()
+    with ProcessPoolExecutor(workers, initializer=init_worker) as executor:
+        futures = [
+            executor.submit(write, seed, first, stop, batch_size)
+            for first, stop in ranges
+        ]
+        for future in as_completed(futures):
+            add(future.result())
+    return totals
@@ -1,12 +1,91 @@
+from typing import Dict
+
 from rest_framework import serializers
 from django.core.validators import RegexValidator
+from django.db import models, transaction
 from .models import Person, Address, CreditCard
 from .services import DataMaskingService
 
 
-class AddressSerializer(serializers.ModelSerializer):
+class MaskedListSerializer(serializers.ListSerializer):
+    """List serializer that masks a whole page in one pass per column.
+
+    Rows are first represented unmasked and then masked with the
+    ``DataMaskingService`` batch methods, including the rows of nested
+    masked serializers. When nested inside another masked serializer the
+    parent does the masking, so every column is masked once per page.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        rows = [
+            self.child.to_unmasked_representation(item) for item in iterable
+        ]
+        if not isinstance(self.parent, MaskedSerializerMixin):
+            self.child.mask_rows(rows, DataMaskingService())
+        return rows
+
+
+class MaskedSerializerMixin:
+    """Mask the fields listed in ``masked_fields`` on output.
+
+    ``masked_fields`` maps a field name to a ``DataMaskingService`` method.
+    Serializers using it set ``Meta.list_serializer_class`` to
+    ``MaskedListSerializer`` so lists are masked in batches.
+    """
+
+    masked_fields: Dict[str, str] = {}
+
+    def to_unmasked_representation(self, instance):
+        return super().to_representation(instance)
+
+    def to_representation(self, instance):
+        data = self.to_unmasked_representation(instance)
+        if not isinstance(self.parent, MaskedSerializerMixin):
+            self.mask_rows([data], DataMaskingService())
+        return data
+
+    def mask_rows(self, rows, masking_service):
+        """Mask ``rows`` and the rows of nested masked list fields."""
+        masking_service.mask_columns(
+            rows,
+            {
+                name: method
+                for name, method in self.masked_fields.items()
+                if name in self.fields
+            },
+        )
+        for name, field in self.fields.items():
+            if isinstance(field, MaskedListSerializer):
+                nested = [item for row in rows for item in row[name]]
+                field.child.mask_rows(nested, masking_service)
+            elif isinstance(field, MaskedSerializerMixin):
+                nested = [row[name] for row in rows if row[name] is not None]
+                field.mask_rows(nested, masking_service)
+
+
+class SelectableFieldsMixin:
+    """Accept a ``fields`` argument limiting the fields that are output."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class AddressSerializer(MaskedSerializerMixin, serializers.ModelSerializer):
+    masked_fields = {
+        "street_address": "mask_address",
+        "city": "mask_city",
+        "state": "mask_state",
+        "zip_code": "mask_zip_code",
+        "country": "mask_country",
+    }
+
     class Meta:
         model = Address
+        list_serializer_class = MaskedListSerializer
         fields = [
             "id",
             "person",
@@ -22,19 +101,6 @@ class AddressSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "created_at", "updated_at"]
 
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        # Apply data masking
-        masking_service = DataMaskingService()
-        data["street_address"] = masking_service.mask_address(
-            data["street_address"]
-        )
-        data["city"] = masking_service.mask_city(data["city"])
-        data["state"] = masking_service.mask_state(data["state"])
-        data["zip_code"] = masking_service.mask_zip_code(data["zip_code"])
-        data["country"] = masking_service.mask_country(data["country"])
-        return data
-
 
 class UnmaskedAddressSerializer(serializers.ModelSerializer):
     class Meta:
@@ -83,9 +149,12 @@ class UpdateAddressSerializer(serializers.ModelSerializer):
         ]
 
 
-class CreditCardSerializer(serializers.ModelSerializer):
+class CreditCardSerializer(MaskedSerializerMixin, serializers.ModelSerializer):
+    masked_fields = {"last_four_digits": "mask_credit_card"}
+
     class Meta:
         model = CreditCard
+        list_serializer_class = MaskedListSerializer
         fields = [
             "id",
             "person",
@@ -99,15 +168,6 @@ class CreditCardSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "created_at", "updated_at"]
 
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        # Apply data masking
-        masking_service = DataMaskingService()
-        data["last_four_digits"] = masking_service.mask_credit_card(
-            data["last_four_digits"]
-        )
-        return data
-
 
 class CreateCreditCardSerializer(serializers.ModelSerializer):
     card_number = serializers.CharField(
@@ -168,12 +228,16 @@ class UpdateCreditCardSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
-class PersonSerializer(serializers.ModelSerializer):
+class PersonSerializer(
+    SelectableFieldsMixin, MaskedSerializerMixin, serializers.ModelSerializer
+):
     addresses = AddressSerializer(many=True, read_only=True)
     credit_cards = CreditCardSerializer(many=True, read_only=True)
+    masked_fields = {"ssn": "mask_ssn"}
 
     class Meta:
         model = Person
+        list_serializer_class = MaskedListSerializer
         fields = [
             "id",
             "first_name",
@@ -187,13 +251,6 @@ class PersonSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "created_at", "updated_at"]
 
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        # Apply data masking
-        masking_service = DataMaskingService()
-        data["ssn"] = masking_service.mask_ssn(data["ssn"])
-        return data
-
 
 class CreatePersonSerializer(serializers.ModelSerializer):
     addresses = CreateAddressSerializer(many=True, required=False)
@@ -217,21 +274,34 @@ class CreatePersonSerializer(serializers.ModelSerializer):
             "credit_cards",
         ]
 
-    def create(self, validated_data):
+    def build_instances(self, validated_data):
+        """Build unsaved person, address and credit card instances."""
+        validated_data = dict(validated_data)
         addresses_data = validated_data.pop("addresses", [])
         credit_cards_data = validated_data.pop("credit_cards", [])
 
-        person = Person.objects.create(**validated_data)
-
-        # Create addresses
-        for address_data in addresses_data:
-            Address.objects.create(person=person, **address_data)
+        person = Person(**validated_data)
+        addresses = [
+            Address(person=person, **address_data)
+            for address_data in addresses_data
+        ]
 
-        # Create credit cards
+        credit_cards = []
         for card_data in credit_cards_data:
+            card_data = dict(card_data)
             card_number = card_data.pop("card_number")
             card_data["last_four_digits"] = card_number[-4:]
-            CreditCard.objects.create(person=person, **card_data)
+            credit_cards.append(CreditCard(person=person, **card_data))
+
+        return person, addresses, credit_cards
+
+    def create(self, validated_data):
+        person, addresses, credit_cards = self.build_instances(validated_data)
+
+        with transaction.atomic():
+            person.save(force_insert=True)
+            Address.objects.bulk_create(addresses)
+            CreditCard.objects.bulk_create(credit_cards)
 
         return person
 
@@ -247,3 +317,5 @@ class HealthSerializer(serializers.Serializer):
     timestamp = serializers.DateTimeField()
     database = serializers.CharField()
     statistics = serializers.DictField()
+    cache = serializers.DictField(required=False)
+    connections = serializers.DictField(required=False)
@@ -1,9 +1,80 @@
 import re
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import (
+    Case,
+    CharField,
+    Expression,
+    F,
+    Func,
+    Q,
+    Value,
+    When,
+)
+from django.db.models.functions import Concat, Left, Length, Repeat, Right
+from django.db.models.lookups import GreaterThanOrEqual, In, LessThanOrEqual
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional
+    np = None
+
+_NON_DIGITS = re.compile(r"[^\d]")
+
+
+class Digits(Func):
+    """``expression`` with every non-digit removed, in SQL.
+
+    SQLite has no ``REGEXP_REPLACE``; ``api.signals`` registers an
+    ``API_DIGITS`` function on its connections instead.
+    """
+
+    function = "REGEXP_REPLACE"
+    template = "%(function)s(%(expressions)s, '[^0-9]', '')"
+    output_field = CharField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="%(function)s(%(expressions)s, '[^0-9]', '', 'g')",
+            **extra_context,
+        )
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            function="API_DIGITS",
+            template="%(function)s(%(expressions)s)",
+            **extra_context,
+        )
+
+
+def digits(value: Optional[str]) -> Optional[str]:
+    """Python implementation of ``API_DIGITS`` for SQLite."""
+    return None if value is None else _NON_DIGITS.sub("", value)
+
+
+def _stars(length: Any) -> Repeat:
+    return Repeat(Value("*"), length)
+
+
+def _blank(field: str) -> Q:
+    return Q(**{f"{field}__isnull": True}) | Q(**{field: ""})
 
 
 class DataMaskingService:
-    """Service for masking sensitive data in API responses."""
+    """Service for masking sensitive data in API responses.
+
+    Every ``mask_*`` method has a ``mask_*_many`` counterpart that masks a
+    list (or NumPy string array) of values in a single pass, and a
+    ``mask_*_expression`` counterpart that masks a model field in SQL, both
+    producing the same output as calling the per-item method on each value.
+    """
 
     def mask_ssn(self, ssn: Optional[str]) -> str:
         """Mask SSN, showing only last 4 digits."""
@@ -11,7 +82,7 @@ class DataMaskingService:
             return ""
 
         # Remove any formatting
-        clean_ssn = re.sub(r"[^\d]", "", ssn)
+        clean_ssn = _NON_DIGITS.sub("", ssn)
 
         if len(clean_ssn) == 9:
             return f"***-**-{clean_ssn[-4:]}"
@@ -54,7 +125,7 @@ class DataMaskingService:
             return ""
 
         # Remove any formatting
-        clean_zip = re.sub(r"[^\d]", "", zip_code)
+        clean_zip = _NON_DIGITS.sub("", zip_code)
 
         if len(clean_zip) >= 2:
             return "*" * (len(clean_zip) - 2) + clean_zip[-2:]
@@ -77,3 +148,262 @@ class DataMaskingService:
             return "****" + last_four[-4:]
 
         return "*" * len(last_four)
+
+    def mask_ssn_many(self, values: Iterable[Optional[str]]) -> Any:
+        """Mask a batch of SSNs."""
+        result: List[str] = []
+        append = result.append
+        sub = _NON_DIGITS.sub
+        for ssn in _as_list(values):
+            if not ssn:
+                append("")
+                continue
+            # Plain and dash-formatted SSNs need no regex pass
+            clean_ssn = ssn.replace("-", "")
+            if not clean_ssn.isdecimal():
+                clean_ssn = sub("", clean_ssn)
+            if len(clean_ssn) in (9, 11):
+                append("***-**-" + clean_ssn[-4:])
+            else:
+                append("***-**-****")
+        return _like(values, result)
+
+    def mask_address_many(self, values: Iterable[str]) -> Any:
+        """Mask a batch of street addresses."""
+        result = [
+            ""
+            if not address
+            else "*" * len(address)
+            if len(address) <= 5
+            else address[:2] + "*" * (len(address) - 2)
+            for address in _as_list(values)
+        ]
+        return _like(values, result)
+
+    def mask_city_many(self, values: Iterable[str]) -> Any:
+        """Mask a batch of city names."""
+        result = [
+            ""
+            if not city
+            else "*" * len(city)
+            if len(city) <= 2
+            else city[0] + "*" * (len(city) - 1)
+            for city in _as_list(values)
+        ]
+        return _like(values, result)
+
+    def mask_state_many(self, values: Iterable[str]) -> Any:
+        """Mask a batch of state abbreviations."""
+        result = [
+            "*" * len(state) if state else "" for state in _as_list(values)
+        ]
+        return _like(values, result)
+
+    def mask_zip_code_many(self, values: Iterable[str]) -> Any:
+        """Mask a batch of zip codes."""
+        result: List[str] = []
+        append = result.append
+        sub = _NON_DIGITS.sub
+        for zip_code in _as_list(values):
+            if not zip_code:
+                append("")
+                continue
+            clean_zip = zip_code.replace("-", "")
+            if not clean_zip.isdecimal():
+                clean_zip = sub("", clean_zip)
+            if len(clean_zip) >= 2:
+                append("*" * (len(clean_zip) - 2) + clean_zip[-2:])
+            else:
+                append("*" * len(clean_zip))
+        return _like(values, result)
+
+    def mask_country_many(self, values: Iterable[str]) -> Any:
+        """Mask a batch of country codes."""
+        result = [
+            "*" * len(country) if country else ""
+            for country in _as_list(values)
+        ]
+        return _like(values, result)
+
+    def mask_credit_card_many(self, values: Iterable[str]) -> Any:
+        """Mask a batch of credit card last four digits."""
+        result = [
+            ""
+            if not last_four
+            else "****" + last_four[-4:]
+            if len(last_four) >= 4
+            else "*" * len(last_four)
+            for last_four in _as_list(values)
+        ]
+        return _like(values, result)
+
+    def mask_ssn_expression(self, field: str) -> Expression:
+        """Mask an SSN column in SQL."""
+        clean_ssn = Digits(F(field))
+        return Case(
+            When(_blank(field), then=Value("")),
+            When(
+                In(Length(clean_ssn), [9, 11]),
+                then=Concat(Value("***-**-"), Right(clean_ssn, 4)),
+            ),
+            default=Value("***-**-****"),
+            output_field=CharField(),
+        )
+
+    def mask_address_expression(self, field: str) -> Expression:
+        """Mask a street address column in SQL."""
+        length = Length(field)
+        return Case(
+            When(_blank(field), then=Value("")),
+            When(LessThanOrEqual(length, 5), then=_stars(length)),
+            default=Concat(Left(field, 2), _stars(length - 2)),
+            output_field=CharField(),
+        )
+
+    def mask_city_expression(self, field: str) -> Expression:
+        """Mask a city column in SQL."""
+        length = Length(field)
+        return Case(
+            When(_blank(field), then=Value("")),
+            When(LessThanOrEqual(length, 2), then=_stars(length)),
+            default=Concat(Left(field, 1), _stars(length - 1)),
+            output_field=CharField(),
+        )
+
+    def mask_state_expression(self, field: str) -> Expression:
+        """Mask a state column in SQL."""
+        return Case(
+            When(_blank(field), then=Value("")),
+            default=_stars(Length(field)),
+            output_field=CharField(),
+        )
+
+    def mask_zip_code_expression(self, field: str) -> Expression:
+        """Mask a zip code column in SQL."""
+        clean_zip = Digits(F(field))
+        length = Length(clean_zip)
+        return Case(
+            When(_blank(field), then=Value("")),
+            When(
+                GreaterThanOrEqual(length, 2),
+                then=Concat(_stars(length - 2), Right(clean_zip, 2)),
+            ),
+            default=_stars(length),
+            output_field=CharField(),
+        )
+
+    def mask_country_expression(self, field: str) -> Expression:
+        """Mask a country code column in SQL."""
+        return self.mask_state_expression(field)
+
+    def mask_credit_card_expression(self, field: str) -> Expression:
+        """Mask a credit card last four digits column in SQL."""
+        length = Length(field)
+        return Case(
+            When(_blank(field), then=Value("")),
+            When(
+                GreaterThanOrEqual(length, 4),
+                then=Concat(Value("****"), Right(field, 4)),
+            ),
+            default=_stars(length),
+            output_field=CharField(),
+        )
+
+    def mask_columns(
+        self, rows: List[Dict[str, Any]], columns: Mapping[str, str]
+    ) -> List[Dict[str, Any]]:
+        """Mask ``columns`` of dict ``rows`` in place, one batch per column.
+
+        ``columns`` maps a row key to the name of a per-item mask method,
+        e.g. ``{"ssn": "mask_ssn"}``.
+        """
+        if not rows:
+            return rows
+        for column, method in columns.items():
+            masked = getattr(self, f"{method}_many")(
+                [row[column] for row in rows]
+            )
+            for row, value in zip(rows, masked):
+                row[column] = value
+        return rows
+
+
+def _as_list(values: Iterable[Any]) -> List[Any]:
+    if np is not None and isinstance(values, np.ndarray):
+        return values.ravel().tolist()
+    return values if isinstance(values, list) else list(values)
+
+
+def _like(values: Iterable[Any], result: List[str]) -> Any:
+    """Return ``result`` as an array when the input was a NumPy array."""
+    if np is not None and isinstance(values, np.ndarray):
+        return np.array(result, dtype=str).reshape(values.shape)
+    return result
+
+
+class StatisticsService:
+    """Row counts for the health endpoints, cached for a short TTL.
+
+    In ``exact`` mode the counts come from ``COUNT(*)``. In ``estimate``
+    mode Postgres planner statistics (``pg_class.reltuples``) are used
+    instead, falling back to ``COUNT(*)`` on other databases or for tables
+    that have never been analyzed.
+    """
+
+    cache_key = "health:statistics"
+    tables = {
+        "persons": "api_person",
+        "addresses": "api_address",
+        "credit_cards": "api_creditcard",
+    }
+
+    def __init__(
+        self, mode: Optional[str] = None, ttl: Optional[int] = None
+    ) -> None:
+        self.mode = mode or getattr(settings, "HEALTH_STATS_MODE", "exact")
+        self.ttl = (
+            ttl
+            if ttl is not None
+            else getattr(settings, "HEALTH_STATS_CACHE_SECONDS", 30)
+        )
+
+    def get_counts(self) -> Dict[str, int]:
+        """Return the row count of each table, keyed by short name."""
+        counts = cache.get(self.cache_key) if self.ttl else None
+        if counts is None:
+            counts = self._compute()
+            if self.ttl:
+                cache.set(self.cache_key, counts, timeout=self.ttl)
+        return counts
+
+    def _compute(self) -> Dict[str, int]:
+        estimates: Dict[str, int] = {}
+        if self.mode == "estimate" and connection.vendor == "postgresql":
+            estimates = self._estimate()
+
+        counts = {}
+        with connection.cursor() as cursor:
+            for name, table in self.tables.items():
+                if name in estimates:
+                    counts[name] = estimates[name]
+                    continue
+                cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                counts[name] = cursor.fetchone()[0]
+        return counts
+
+    def _estimate(self) -> Dict[str, int]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relname, reltuples FROM pg_class "
+                "WHERE relname = ANY(%s) AND relkind = 'r'",
+                [list(self.tables.values())],
+            )
+            by_table = dict(cursor.fetchall())
+
+        estimates = {}
+        for name, table in self.tables.items():
+            reltuples = by_table.get(table)
+            # reltuples is -1 (or 0 before PG 14) until the table is analyzed
+            if reltuples is not None and reltuples > 0:
+                estimates[name] = int(reltuples)
+        return estimates
@@ -0,0 +1,77 @@
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import person_cache
+from .dbstats import connection_stats
+from .middleware import observe_queries
+from .models import Address, CreditCard, Person, Tombstone
+from .search import similarity
+from .services import digits
+
+
+def invalidate_person(person_id) -> None:
+    """Drop a person's cached representation now and after commit.
+
+    The second invalidation catches a reader that re-populated the cache
+    from the pre-commit state in between.
+    """
+    if not person_cache.enabled:
+        return
+    person_cache.invalidate(person_id)
+    transaction.on_commit(lambda: person_cache.invalidate(person_id))
+
+
+@receiver(post_save, sender=Person)
+@receiver(post_delete, sender=Person)
+def person_changed(sender, instance, **kwargs):
+    invalidate_person(instance.pk)
+
+
+@receiver(post_save, sender=Address)
+@receiver(post_delete, sender=Address)
+@receiver(post_save, sender=CreditCard)
+@receiver(post_delete, sender=CreditCard)
+def person_child_changed(sender, instance, **kwargs):
+    invalidate_person(instance.person_id)
+
+
+@receiver(post_delete, sender=Person)
+@receiver(post_delete, sender=Address)
+@receiver(post_delete, sender=CreditCard)
+def record_deletion(sender, instance, **kwargs):
+    """Write the change feed's tombstone, in the deleting transaction."""
+    object_type = {
+        Person: Tombstone.PERSON,
+        Address: Tombstone.ADDRESS,
+        CreditCard: Tombstone.CREDIT_CARD,
+    }[sender]
+    Tombstone.objects.create(
+        object_type=object_type,
+        object_id=instance.pk,
+        person_id=instance.pk if sender is Person else instance.person_id,
+    )
+
+
+@receiver(connection_created)
+def database_connection_opened(sender, connection, **kwargs):
+    connection_stats.opened(connection.alias)
+    # Request query counts; the wrapper list outlives reconnects
+    if observe_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(observe_queries)
+    if connection.vendor == "sqlite":
+        # Used by services.Digits, for the SQL masking expressions
+        connection.connection.create_function(
+            "API_DIGITS", 1, digits, deterministic=True
+        )
+        # Used by search.Similarity, for fuzzy name matches
+        connection.connection.create_function(
+            "API_SIMILARITY", 2, similarity, deterministic=True
+        )
+
+
+@receiver(request_started)
+def request_started_for_stats(sender, **kwargs):
+    connection_stats.request_started()
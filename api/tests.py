@@ -1,3 +1,5 @@
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
@@ -65,6 +67,82 @@ class PersonAPITestCase(APITestCase):
         person.refresh_from_db()
         self.assertEqual(person.first_name, "Jane")
 
+    def test_create_person_with_nested_records(self):
+        """Test creating a person with addresses and credit cards."""
+        url = reverse("api:person-list-create")
+        data = dict(
+            self.person_data,
+            addresses=[
+                {
+                    "address_type": "Home",
+                    "street_address": "123 Main St",
+                    "city": "Anytown",
+                    "state": "NY",
+                    "zip_code": "12345",
+                }
+            ],
+            credit_cards=[
+                {
+                    "card_type": "Visa",
+                    "card_number": "4111111111111111",
+                    "expiration_month": 12,
+                    "expiration_year": 2025,
+                }
+            ],
+        )
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        person = Person.objects.get()
+        self.assertEqual(person.addresses.count(), 1)
+        self.assertEqual(person.credit_cards.get().last_four_digits, "1111")
+
+    def test_bulk_create_persons(self):
+        """Test bulk creating persons with per-item results."""
+        url = reverse("api:person-bulk-create")
+        valid = dict(
+            self.person_data,
+            addresses=[
+                {
+                    "address_type": "Work",
+                    "street_address": "1 Market St",
+                    "city": "Springfield",
+                    "state": "IL",
+                    "zip_code": "62701",
+                }
+            ],
+            credit_cards=[
+                {
+                    "card_type": "Visa",
+                    "card_number": "4111111111114242",
+                    "expiration_month": 1,
+                    "expiration_year": 2027,
+                }
+            ],
+        )
+        invalid = dict(self.person_data, ssn="12-34")
+        response = self.client.post(
+            url, [valid, invalid, valid], format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["failed"], 1)
+        self.assertEqual(response.data["rows_inserted"], 6)
+        self.assertIn("rows_per_second", response.data)
+        statuses = [r["status"] for r in response.data["results"]]
+        self.assertEqual(statuses, ["created", "error", "created"])
+        self.assertIn("ssn", response.data["results"][1]["errors"])
+        self.assertEqual(Person.objects.count(), 2)
+        self.assertEqual(
+            set(CreditCard.objects.values_list("last_four_digits", flat=True)),
+            {"4242"},
+        )
+
+    def test_bulk_create_requires_list(self):
+        """Test bulk create rejects a non-list body."""
+        url = reverse("api:person-bulk-create")
+        response = self.client.post(url, self.person_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_delete_person(self):
         """Test deleting a person."""
         person = Person.objects.create(**self.person_data)
@@ -234,3 +312,2739 @@ class HealthCheckTestCase(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["status"], "ready")
+
+    def test_liveness_check_runs_no_queries(self):
+        """Test liveness check endpoint does not touch the database."""
+        url = reverse("api:liveness-check")
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "alive")
+
+    def test_statistics_are_cached(self):
+        """Test health statistics are served from cache within the TTL."""
+        from .services import StatisticsService
+
+        cache.clear()
+        Person.objects.create(
+            first_name="John",
+            last_name="Doe",
+            birth_date="1990-01-01",
+            ssn="123456789",
+        )
+        service = StatisticsService(ttl=60)
+        self.assertEqual(service.get_counts()["persons"], 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(service.get_counts()["persons"], 1)
+
+    def test_estimate_mode_falls_back_to_count(self):
+        """Test estimate mode returns exact counts on SQLite."""
+        from .services import StatisticsService
+
+        counts = StatisticsService(mode="estimate", ttl=0).get_counts()
+        self.assertEqual(
+            counts, {"persons": 0, "addresses": 0, "credit_cards": 0}
+        )
+
+
+class KeysetPaginationTestCase(APITestCase):
+    def setUp(self):
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_creditcard")
+            cursor.execute("DELETE FROM api_address")
+            cursor.execute("DELETE FROM api_person")
+
+        self.persons = [
+            Person.objects.create(
+                first_name=f"Person{i}",
+                last_name="Doe",
+                birth_date="1990-01-01",
+                ssn="123456789",
+            )
+            for i in range(5)
+        ]
+
+    def test_keyset_pages_cover_all_rows_without_count(self):
+        """Test walking all pages forward and back with cursors."""
+        url = reverse("api:person-list-create")
+        response = self.client.get(
+            url, {"pagination": "keyset", "page_size": 2}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertIsNone(response.data["previous"])
+
+        seen = [row["id"] for row in response.data["results"]]
+        pages = [response.data]
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            seen.extend(row["id"] for row in response.data["results"])
+            pages.append(response.data)
+
+        expected = [
+            str(p.id) for p in Person.objects.order_by("-created_at", "-id")
+        ]
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), 3)
+
+        # Step back from the last page to the middle one
+        response = self.client.get(pages[-1]["previous"])
+        self.assertEqual(response.data["results"], pages[1]["results"])
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is rejected."""
+        url = reverse("api:person-list-create")
+        response = self.client.get(url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_mode_is_default(self):
+        """Test that page-number pagination is kept without a cursor."""
+        url = reverse("api:person-list-create")
+        response = self.client.get(url)
+        self.assertEqual(response.data["count"], 5)
+
+
+class RateLimitTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(RATE_LIMIT_MAX_REQUESTS=2)
+    def test_write_operations_are_limited(self):
+        """Test that writes beyond the limit are rejected with 429."""
+        url = reverse("api:person-list-create")
+        for _ in range(2):
+            response = self.client.post(url, {}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(url, {}, format="json")
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertEqual(response.json()["remainingRequests"], 0)
+
+        # Reads are never limited
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_limiter_counts_and_peek(self):
+        """Test that the counter limiter keeps integers and peek is free."""
+        from .ratelimit import SlidingWindowCounterLimiter
+
+        limiter = SlidingWindowCounterLimiter()
+        first = limiter.hit("client", 3, 3600)
+        self.assertTrue(first.allowed)
+        self.assertEqual(first.remaining, 2)
+        self.assertEqual(limiter.peek("client", 3, 3600).remaining, 2)
+
+        limiter.hit("client", 3, 3600)
+        limiter.hit("client", 3, 3600)
+        self.assertFalse(limiter.hit("client", 3, 3600).allowed)
+        # Rejections do not consume quota from other clients
+        self.assertTrue(limiter.hit("other", 3, 3600).allowed)
+
+    def test_check_warns_about_per_worker_cache(self):
+        """Test that several workers without a shared cache are flagged."""
+        from .checks import check_shared_cache
+
+        self.assertEqual(check_shared_cache(None), [])
+        with override_settings(GUNICORN_WORKERS=3):
+            messages = check_shared_cache(None)
+        self.assertEqual([m.id for m in messages], ["api.W001"])
+        self.assertNotIn("own writes", messages[0].msg)
+        with override_settings(
+            GUNICORN_WORKERS=3, DATABASE_REPLICAS=["replica"]
+        ):
+            (message,) = check_shared_cache(None)
+        self.assertIn("own writes", message.msg)
+
+        shared = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                "LOCATION": "api_cache",
+            }
+        }
+        with override_settings(GUNICORN_WORKERS=3, CACHES=shared):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+class PersonExportTestCase(APITestCase):
+    def setUp(self):
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_creditcard")
+            cursor.execute("DELETE FROM api_address")
+            cursor.execute("DELETE FROM api_person")
+
+        self.person = Person.objects.create(
+            first_name="John",
+            last_name="Doe",
+            birth_date="1990-01-01",
+            ssn="123456789",
+        )
+        Address.objects.create(
+            person=self.person,
+            address_type="Home",
+            street_address="123 Main St",
+            city="Anytown",
+            state="NY",
+            zip_code="12345",
+        )
+        CreditCard.objects.create(
+            person=self.person,
+            card_type="Visa",
+            last_four_digits="1111",
+            expiration_month=12,
+            expiration_year=2025,
+        )
+
+    def _stream(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_ndjson_matches_serializer(self):
+        """Test NDJSON export rows match the masked person detail."""
+        import json
+
+        response = self.client.get(reverse("api:person-export"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = self._stream(response).splitlines()
+        self.assertEqual(len(lines), 1)
+
+        detail = self.client.get(
+            reverse("api:person-detail", kwargs={"pk": self.person.id})
+        )
+        self.assertEqual(json.loads(lines[0]), detail.json())
+
+    def test_export_csv(self):
+        """Test CSV export has a header and masked values."""
+        response = self.client.get(
+            reverse("api:person-export"), {"output": "csv"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = self._stream(response).splitlines()
+        self.assertTrue(lines[0].startswith("id,first_name,last_name"))
+        self.assertIn("***-**-6789", lines[1])
+        self.assertNotIn("123 Main St", lines[1])
+
+    def test_export_invalid_format(self):
+        """Test unknown export formats are rejected."""
+        response = self.client.get(
+            reverse("api:person-export"), {"output": "xml"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_command(self):
+        """Test the export_people management command."""
+        from io import StringIO
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command("export_people", stdout=out)
+        self.assertIn('"ssn":"***-**-6789"', out.getvalue())
+
+
+class ImportPeopleCommandTestCase(APITestCase):
+    def setUp(self):
+        import os
+        import shutil
+        import tempfile
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_creditcard")
+            cursor.execute("DELETE FROM api_address")
+            cursor.execute("DELETE FROM api_person")
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, True)
+        self.path = os.path.join(self.tmpdir, "people.ndjson")
+
+    def _write(self, records):
+        import json
+
+        with open(self.path, "w") as handle:
+            for record in records:
+                handle.write(json.dumps(record) + "\n")
+
+    def _person(self, first_name, **extra):
+        person = {
+            "first_name": first_name,
+            "last_name": "Doe",
+            "birth_date": "1990-01-01",
+            "ssn": "123456789",
+        }
+        person.update(extra)
+        return person
+
+    def test_import_ndjson(self):
+        """Test importing valid and invalid NDJSON records."""
+        from io import StringIO
+        from django.core.management import call_command
+
+        self._write(
+            [
+                self._person(
+                    "Ann",
+                    credit_cards=[
+                        {
+                            "card_type": "Visa",
+                            "card_number": "4111111111119876",
+                            "expiration_month": 6,
+                            "expiration_year": 2028,
+                        }
+                    ],
+                ),
+                self._person("Bad", ssn="nope"),
+                self._person("Bob"),
+            ]
+        )
+        out, err = StringIO(), StringIO()
+        call_command(
+            "import_people",
+            self.path,
+            workers=1,
+            batch_size=2,
+            stdout=out,
+            stderr=err,
+        )
+        self.assertEqual(Person.objects.count(), 2)
+        self.assertEqual(CreditCard.objects.get().last_four_digits, "9876")
+        self.assertIn("record 1:", err.getvalue())
+        self.assertIn("rows/sec", out.getvalue())
+
+    def test_import_resumes_from_checkpoint(self):
+        """Test that a checkpoint file skips already imported records."""
+        import os
+        from io import StringIO
+        from django.core.management import call_command
+
+        self._write([self._person(f"P{i}") for i in range(3)])
+        checkpoint = os.path.join(self.tmpdir, "people.checkpoint")
+        with open(checkpoint, "w") as handle:
+            handle.write("2")
+
+        call_command(
+            "import_people",
+            self.path,
+            workers=1,
+            checkpoint=checkpoint,
+            stdout=StringIO(),
+        )
+        self.assertEqual(
+            list(Person.objects.values_list("first_name", flat=True)),
+            ["P2"],
+        )
+        with open(checkpoint) as handle:
+            self.assertEqual(handle.read(), "3")
+
+    def test_worker_processes_set_up_django(self):
+        """Test validation workers run Django's setup, as spawned ones
+        start without it."""
+        from io import StringIO
+        from unittest import mock
+        from concurrent.futures import ThreadPoolExecutor
+        from django.core.management import call_command
+        from api.workers import init_worker
+
+        self._write([self._person("Ann"), self._person("Bob")])
+        pools = []
+
+        def pool(**kwargs):
+            pools.append(kwargs)
+            return ThreadPoolExecutor(**kwargs)
+
+        with mock.patch(
+            "api.management.commands.import_people.ProcessPoolExecutor", pool
+        ):
+            call_command(
+                "import_people", self.path, workers=2, stdout=StringIO()
+            )
+        self.assertEqual(pools[0]["initializer"], init_worker)
+        self.assertEqual(Person.objects.count(), 2)
+
+    def test_copy_writer_uses_the_installed_driver(self):
+        """Test COPY goes through psycopg 3's copy() or psycopg2's
+        copy_expert(), whichever Django uses."""
+        from unittest import mock
+        from api.bulk import PersonCopyWriter, build_person
+
+        try:
+            from django.db.backends.postgresql import psycopg_any
+        except ImportError:
+            self.skipTest("Neither psycopg 3 nor psycopg2 is installed")
+
+        person = build_person(self._person("Ann"))[0]
+        writer = PersonCopyWriter()
+
+        cursor = mock.MagicMock()
+        with mock.patch.object(psycopg_any, "is_psycopg3", True):
+            writer._copy(cursor, [person])
+        sql = cursor.copy.call_args[0][0]
+        self.assertTrue(sql.startswith('COPY "api_person" ('))
+        copy = cursor.copy.return_value.__enter__.return_value
+        self.assertIn("Ann", copy.write.call_args[0][0])
+        cursor.cursor.copy_expert.assert_not_called()
+
+        cursor = mock.MagicMock()
+        with mock.patch.object(psycopg_any, "is_psycopg3", False):
+            writer._copy(cursor, [person])
+        sql, buffer = cursor.cursor.copy_expert.call_args[0]
+        self.assertTrue(sql.startswith('COPY "api_person" ('))
+        self.assertIn("Ann", buffer.getvalue())
+        cursor.copy.assert_not_called()
+
+
+class DataMaskingBatchTestCase(APITestCase):
+    values = [
+        None,
+        "",
+        "1",
+        "12",
+        "123456789",
+        "123-45-6789",
+        "12345-6789",
+        "12345678901",
+        "1234",
+        "Main St",
+        "123 Main St",
+        "NY",
+        "Anytown",
+        "٣٤٥٦٧٨٩٠١",
+        "ab-12",
+    ]
+    methods = [
+        "mask_ssn",
+        "mask_address",
+        "mask_city",
+        "mask_state",
+        "mask_zip_code",
+        "mask_country",
+        "mask_credit_card",
+    ]
+
+    def test_batch_methods_match_per_item(self):
+        """Test every *_many method matches its per-item method."""
+        from .services import DataMaskingService
+
+        service = DataMaskingService()
+        for method in self.methods:
+            single = getattr(service, method)
+            expected = [single(value) for value in self.values]
+            self.assertEqual(
+                getattr(service, f"{method}_many")(self.values),
+                expected,
+                method,
+            )
+
+    def test_batch_methods_accept_numpy_arrays(self):
+        """Test *_many methods accept and return NumPy string arrays."""
+        from .services import DataMaskingService, np
+
+        if np is None:
+            self.skipTest("NumPy is not installed")
+        service = DataMaskingService()
+        values = np.array(["123456789", "123 Main St", "12345"])
+        result = service.mask_address_many(values)
+        self.assertIsInstance(result, np.ndarray)
+        self.assertEqual(
+            result.tolist(),
+            [service.mask_address(v) for v in values.tolist()],
+        )
+
+    def test_person_list_masks_nested_records(self):
+        """Test the person list masks nested rows in batches."""
+        person = Person.objects.create(
+            first_name="John",
+            last_name="Doe",
+            birth_date="1990-01-01",
+            ssn="123456789",
+        )
+        Address.objects.create(
+            person=person,
+            address_type="Home",
+            street_address="123 Main St",
+            city="Anytown",
+            state="NY",
+            zip_code="12345",
+        )
+        response = self.client.get(reverse("api:person-list-create"))
+        row = response.data["results"][0]
+        self.assertEqual(row["ssn"], "***-**-6789")
+        address = row["addresses"][0]
+        self.assertEqual(address["street_address"], "12*********")
+        self.assertEqual(address["city"], "A******")
+        self.assertEqual(address["state"], "**")
+        self.assertEqual(address["zip_code"], "***45")
+        self.assertEqual(address["country"], "**")
+
+
+class RepresentationParityTestCase(APITestCase):
+    def setUp(self):
+        import random
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_creditcard")
+            cursor.execute("DELETE FROM api_address")
+            cursor.execute("DELETE FROM api_person")
+
+        rng = random.Random(1234)
+        for i in range(20):
+            ssn = rng.choice([None, "123456789", "987-65-4321", f"{i:09d}"])
+            person = Person.objects.create(
+                first_name=rng.choice(["Ann", "José", "李", "O'Neil"]),
+                last_name=f"Last{i}",
+                birth_date=f"19{rng.randint(50, 99)}-0{rng.randint(1, 9)}-10",
+                ssn=ssn,
+            )
+            for _ in range(rng.randint(0, 3)):
+                Address.objects.create(
+                    person=person,
+                    address_type=rng.choice(["Home", "Work", "Mailing"]),
+                    street_address=rng.choice(
+                        ["1 A", "123 Main St", "Ünter 5"]
+                    ),
+                    city=rng.choice(["X", "Boise", "São Paulo"]),
+                    state=rng.choice(["NY", "C"]),
+                    zip_code=rng.choice(["12345", "12345-6789"]),
+                    country=rng.choice(["US", "BR"]),
+                    is_primary=rng.random() < 0.5,
+                )
+            for _ in range(rng.randint(0, 2)):
+                CreditCard.objects.create(
+                    person=person,
+                    card_type=rng.choice(["Visa", "Discover"]),
+                    last_four_digits=rng.choice(["1111", "12", "9876"]),
+                    expiration_month=rng.randint(1, 12),
+                    expiration_year=rng.randint(2024, 2030),
+                    is_active=rng.random() < 0.5,
+                )
+
+    def _render(self, data):
+        from rest_framework.renderers import JSONRenderer
+
+        return JSONRenderer().render(data)
+
+    def test_person_representation_matches_serializer(self):
+        """Test compiled person rows render byte-identical JSON."""
+        from .representations import person_representation
+        from .serializers import PersonSerializer
+
+        persons = list(
+            Person.objects.prefetch_related("addresses", "credit_cards")
+        )
+        self.assertEqual(
+            self._render(person_representation.render(persons)),
+            self._render(PersonSerializer(persons, many=True).data),
+        )
+        self.assertEqual(
+            self._render(person_representation.render(persons[:1])[0]),
+            self._render(PersonSerializer(persons[0]).data),
+        )
+
+    def test_values_rows_match_serializer(self):
+        """Test rows built from .values() match the serializer."""
+        from collections import defaultdict
+        from .representations import (
+            address_representation,
+            credit_card_representation,
+            person_representation,
+        )
+        from .serializers import (
+            AddressSerializer,
+            CreditCardSerializer,
+            PersonSerializer,
+        )
+
+        addresses = list(Address.objects.values())
+        cards = list(CreditCard.objects.values())
+        self.assertEqual(
+            self._render(address_representation.render_values(addresses)),
+            self._render(
+                AddressSerializer(Address.objects.all(), many=True).data
+            ),
+        )
+        self.assertEqual(
+            self._render(credit_card_representation.render_values(cards)),
+            self._render(
+                CreditCardSerializer(CreditCard.objects.all(), many=True).data
+            ),
+        )
+
+        by_person = defaultdict(lambda: {"addresses": [], "credit_cards": []})
+        for row in addresses:
+            by_person[row["person_id"]]["addresses"].append(row)
+        for row in cards:
+            by_person[row["person_id"]]["credit_cards"].append(row)
+        persons = [
+            dict(row, **by_person[row["id"]])
+            for row in Person.objects.values()
+        ]
+        self.assertEqual(
+            self._render(person_representation.render_values(persons)),
+            self._render(
+                PersonSerializer(
+                    Person.objects.prefetch_related(
+                        "addresses", "credit_cards"
+                    ),
+                    many=True,
+                ).data
+            ),
+        )
+
+    def test_endpoints_match_with_fast_path_disabled(self):
+        """Test GET endpoints return identical bytes on both paths."""
+        person = Person.objects.filter(addresses__isnull=False).first()
+        address = person.addresses.first()
+        urls = [
+            reverse("api:person-list-create"),
+            reverse("api:person-detail", kwargs={"pk": person.id}),
+            reverse(
+                "api:address-list-create", kwargs={"person_id": person.id}
+            ),
+            reverse(
+                "api:creditcard-list-create", kwargs={"person_id": person.id}
+            ),
+            reverse("api:address-detail", kwargs={"pk": address.id}),
+        ]
+        for url in urls:
+            fast = self.client.get(url).content
+            with override_settings(API_FAST_REPRESENTATION=False):
+                slow = self.client.get(url).content
+            self.assertEqual(fast, slow, url)
+
+
+class FastJSONRendererTestCase(APITestCase):
+    def setUp(self):
+        import datetime
+        import uuid
+
+        self.data = {
+            "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "birth_date": datetime.date(1990, 1, 1),
+            "created_at": datetime.datetime(
+                2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc
+            ),
+            "name": "José\u2028李",
+            "nested": [{"count": 3, "active": True, "missing": None}],
+            1: "non-string key",
+        }
+
+    def test_output_matches_stdlib_renderer(self):
+        """Test the orjson renderer emits the same bytes as JSONRenderer."""
+        from rest_framework.renderers import JSONRenderer
+        from .renderers import FastJSONRenderer, orjson
+
+        if orjson is None:
+            self.skipTest("orjson is not installed")
+        self.assertEqual(
+            FastJSONRenderer().render(self.data),
+            JSONRenderer().render(self.data),
+        )
+
+    def test_falls_back_without_orjson(self):
+        """Test the renderer uses the stdlib encoder when orjson is missing."""
+        from unittest import mock
+        from rest_framework.renderers import JSONRenderer
+        from .renderers import FastJSONRenderer
+
+        with mock.patch("api.renderers.orjson", None):
+            rendered = FastJSONRenderer().render(self.data)
+        self.assertEqual(rendered, JSONRenderer().render(self.data))
+
+    def test_indent_uses_stdlib_renderer(self):
+        """Test pretty printing is delegated to JSONRenderer."""
+        from .renderers import FastJSONRenderer
+
+        rendered = FastJSONRenderer().render(
+            {"a": 1}, "application/json; indent=2"
+        )
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+
+
+class ConditionalRequestTestCase(APITestCase):
+    def setUp(self):
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_creditcard")
+            cursor.execute("DELETE FROM api_address")
+            cursor.execute("DELETE FROM api_person")
+
+        self.person = Person.objects.create(
+            first_name="John",
+            last_name="Doe",
+            birth_date="1990-01-01",
+            ssn="123456789",
+        )
+        self.url = reverse("api:person-detail", kwargs={"pk": self.person.id})
+
+    def test_if_none_match_returns_304_with_one_query(self):
+        """Test a matching ETag short-circuits to 304 with one query."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_child_changes_update_person_etag(self):
+        """Test that adding an address changes the person's ETag."""
+        etag = self.client.get(self.url)["ETag"]
+        Address.objects.create(
+            person=self.person,
+            address_type="Home",
+            street_address="123 Main St",
+            city="Anytown",
+            state="NY",
+            zip_code="12345",
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_if_modified_since(self):
+        """Test If-Modified-Since returns 304 for unchanged records."""
+        last_modified = self.client.get(self.url)["Last-Modified"]
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_if_match_on_update_and_delete(self):
+        """Test If-Match rejects stale writes with 412."""
+        etag = self.client.get(self.url)["ETag"]
+        update_data = {
+            "first_name": "Jane",
+            "last_name": "Doe",
+            "birth_date": "1990-01-01",
+        }
+        response = self.client.put(
+            self.url, update_data, format="json", HTTP_IF_MATCH='"stale"'
+        )
+        self.assertEqual(
+            response.status_code, status.HTTP_412_PRECONDITION_FAILED
+        )
+
+        response = self.client.put(
+            self.url, update_data, format="json", HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        response = self.client.delete(self.url, HTTP_IF_MATCH=etag)
+        self.assertEqual(
+            response.status_code, status.HTTP_412_PRECONDITION_FAILED
+        )
+        self.assertEqual(Person.objects.count(), 1)
+
+    def test_credit_card_detail_etag(self):
+        """Test credit card detail responses carry an ETag."""
+        card = CreditCard.objects.create(
+            person=self.person,
+            card_type="Visa",
+            last_four_digits="1111",
+            expiration_month=12,
+            expiration_year=2025,
+        )
+        url = reverse("api:creditcard-detail", kwargs={"pk": card.id})
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class PersonCacheTestCase(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from django.db import connection
+        from api.cache import person_cache
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_creditcard")
+            cursor.execute("DELETE FROM api_address")
+            cursor.execute("DELETE FROM api_person")
+        cache.clear()
+        person_cache.clear()
+        self.person_cache = person_cache
+
+        self.person = Person.objects.create(
+            first_name="John",
+            last_name="Doe",
+            birth_date="1990-01-01",
+            ssn="123456789",
+        )
+        self.url = reverse("api:person-detail", kwargs={"pk": self.person.id})
+
+    def test_second_get_is_served_from_cache(self):
+        """Test a warm GET costs only the version query."""
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second.data["ssn"], "***-**-6789")
+
+        stats = self.person_cache.stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["local_hits"], 1)
+
+    def test_child_create_through_view_invalidates(self):
+        """Test adding an address via the API refreshes the cached person."""
+        from django.core.cache import cache
+
+        self.client.get(self.url)
+        key = self.person_cache.key(self.person.id)
+        self.assertIsNotNone(cache.get(key))
+
+        response = self.client.post(
+            reverse(
+                "api:address-list-create",
+                kwargs={"person_id": self.person.id},
+            ),
+            {
+                "address_type": "Home",
+                "street_address": "123 Main St",
+                "city": "Anytown",
+                "state": "NY",
+                "zip_code": "12345",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(cache.get(key))
+        self.assertGreater(self.person_cache.stats()["invalidations"], 0)
+
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data["addresses"]), 1)
+
+    def test_writes_without_signals_are_caught_by_version(self):
+        """Test entries are not served once the ETag has moved on."""
+        from django.utils import timezone
+
+        self.client.get(self.url)
+        Person.objects.filter(id=self.person.id).update(
+            first_name="Jane", updated_at=timezone.now()
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["first_name"], "Jane")
+
+        Person.objects.filter(id=self.person.id).delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_local_tier_evicts_least_recently_used(self):
+        """Test the in-process LRU is bounded and counts evictions."""
+        from api.cache import RepresentationCache
+
+        cache = RepresentationCache("test:lru", timeout=60, local_size=2)
+        cache.set("a", "v1", {"id": "a"})
+        cache.set("b", "v1", {"id": "b"})
+        cache.get("a", "v1")
+        cache.set("c", "v1", {"id": "c"})
+
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["local_entries"], 2)
+        self.assertEqual(stats["local_hits"], 1)
+        # "b" was evicted locally but is still in the shared tier
+        self.assertEqual(cache.get("b", "v1"), {"id": "b"})
+        self.assertEqual(cache.stats()["shared_hits"], 1)
+        self.assertIsNone(cache.get("b", "v2"))
+
+    def test_health_reports_cache_counters(self):
+        """Test the health endpoint exposes the person cache counters."""
+        self.client.get(self.url)
+        response = self.client.get(reverse("api:health-check"))
+        self.assertEqual(response.data["cache"]["person"]["misses"], 1)
+
+
+class SparseFieldsetTestCase(APITestCase):
+    def setUp(self):
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_creditcard")
+            cursor.execute("DELETE FROM api_address")
+            cursor.execute("DELETE FROM api_person")
+        cache.clear()
+
+        self.person = Person.objects.create(
+            first_name="John",
+            last_name="Doe",
+            birth_date="1990-01-01",
+            ssn="123456789",
+        )
+        Address.objects.create(
+            person=self.person,
+            address_type="Home",
+            street_address="123 Main St",
+            city="Anytown",
+            state="NY",
+            zip_code="12345",
+        )
+        CreditCard.objects.create(
+            person=self.person,
+            card_type="Visa",
+            last_four_digits="1111",
+            expiration_month=12,
+            expiration_year=2025,
+        )
+        self.list_url = reverse("api:person-list-create")
+        self.detail_url = reverse(
+            "api:person-detail", kwargs={"pk": self.person.id}
+        )
+
+    def test_names_only_listing_is_one_narrow_query(self):
+        """Test ?fields= skips prefetches and unselected columns."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                self.list_url,
+                {"fields": "first_name,last_name", "pagination": "keyset"},
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"],
+            [{"first_name": "John", "last_name": "Doe"}],
+        )
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("ssn", queries[0]["sql"])
+
+    def test_expand_embeds_only_named_relations(self):
+        """Test ?expand= adds one masked relation to the default fields."""
+        response = self.client.get(self.detail_url, {"expand": "addresses"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("credit_cards", response.data)
+        self.assertEqual(response.data["ssn"], "***-**-6789")
+        self.assertEqual(response.data["addresses"][0]["state"], "**")
+
+        response = self.client.get(self.detail_url, {"expand": ""})
+        self.assertNotIn("addresses", response.data)
+        self.assertIn("first_name", response.data)
+
+    def test_serializer_path_matches_fast_path(self):
+        """Test sparse output is identical with and without the fast path."""
+        params = {"fields": "id,ssn,credit_cards"}
+        fast = self.client.get(self.detail_url, params)
+        with override_settings(API_FAST_REPRESENTATION=False):
+            slow = self.client.get(self.detail_url, params)
+        self.assertEqual(fast.content, slow.content)
+        self.assertEqual(list(fast.data), ["id", "ssn", "credit_cards"])
+
+    def test_unknown_fields_are_rejected(self):
+        """Test unknown field or relation names return 400."""
+        response = self.client.get(self.list_url, {"fields": "password"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("fields", response.data)
+
+        response = self.client.get(self.detail_url, {"expand": "ssn"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("expand", response.data)
+
+
+class BatchGetTestCase(APITestCase):
+    def setUp(self):
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_creditcard")
+            cursor.execute("DELETE FROM api_address")
+            cursor.execute("DELETE FROM api_person")
+        cache.clear()
+
+        self.persons = [
+            Person.objects.create(
+                first_name=f"Person{i}",
+                last_name="Doe",
+                birth_date="1990-01-01",
+                ssn="123456789",
+            )
+            for i in range(3)
+        ]
+        for person in self.persons:
+            Address.objects.create(
+                person=person,
+                address_type="Home",
+                street_address="123 Main St",
+                city="Anytown",
+                state="NY",
+                zip_code="12345",
+            )
+        self.card = CreditCard.objects.create(
+            person=self.persons[0],
+            card_type="Visa",
+            last_four_digits="1111",
+            expiration_month=12,
+            expiration_year=2025,
+        )
+
+    def test_person_batch_get_uses_three_queries(self):
+        """Test persons are resolved with one query plus two prefetches."""
+        import uuid
+
+        missing = str(uuid.uuid4())
+        ids = [str(p.id) for p in self.persons] + [missing]
+        with self.assertNumQueries(3):
+            response = self.client.post(
+                reverse("api:person-batch-get"), {"ids": ids}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(list(results), ids)
+        self.assertIsNone(results[missing])
+        self.assertEqual(response.data["not_found"], [missing])
+
+        first = results[str(self.persons[0].id)]
+        detail = self.client.get(
+            reverse("api:person-detail", kwargs={"pk": self.persons[0].id})
+        )
+        self.assertEqual(first, detail.data)
+        self.assertEqual(first["ssn"], "***-**-6789")
+
+    def test_address_and_card_batch_get(self):
+        """Test the address and credit card batch endpoints."""
+        address = self.persons[1].addresses.get()
+        response = self.client.post(
+            reverse("api:address-batch-get"),
+            {"ids": [str(address.id).upper()]},
+            format="json",
+        )
+        self.assertEqual(
+            response.data["results"][str(address.id)]["state"], "**"
+        )
+
+        with override_settings(API_FAST_REPRESENTATION=False):
+            response = self.client.post(
+                reverse("api:creditcard-batch-get"),
+                {"ids": [str(self.card.id)]},
+                format="json",
+            )
+        card = response.data["results"][str(self.card.id)]
+        self.assertEqual(card["last_four_digits"], "****1111")
+
+    def test_batch_get_validation(self):
+        """Test malformed bodies, bad ids and oversized batches."""
+        url = reverse("api:person-batch-get")
+        response = self.client.post(url, {"id": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(url, {"ids": ["nope"]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["ids"], ["nope"])
+
+        with override_settings(BATCH_GET_MAX_IDS=2):
+            ids = [str(p.id) for p in self.persons]
+            response = self.client.post(url, {"ids": ids}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(RATE_LIMIT_MAX_REQUESTS=1)
+    def test_batch_get_is_not_rate_limited(self):
+        """Test batch reads do not consume the write rate limit."""
+        url = reverse("api:person-batch-get")
+        for _ in range(3):
+            response = self.client.post(url, {"ids": []}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class QueryPlanTestCase(APITestCase):
+    """Query-count and ``EXPLAIN`` regression tests for the hot endpoints.
+
+    Every query an endpoint runs is explained; a full table scan fails the
+    test, as does any change in the number of queries.
+    """
+
+    def setUp(self):
+        from django.db import connection
+        from api.cache import person_cache
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_creditcard")
+            cursor.execute("DELETE FROM api_address")
+            cursor.execute("DELETE FROM api_person")
+        cache.clear()
+        person_cache.clear()
+
+        self.person = Person.objects.create(
+            first_name="John",
+            last_name="Doe",
+            birth_date="1990-01-01",
+            ssn="123456789",
+        )
+        self.address = Address.objects.create(
+            person=self.person,
+            address_type="Home",
+            street_address="123 Main St",
+            city="Anytown",
+            state="NY",
+            zip_code="12345",
+        )
+        self.card = CreditCard.objects.create(
+            person=self.person,
+            card_type="Visa",
+            last_four_digits="1111",
+            expiration_month=12,
+            expiration_year=2025,
+        )
+
+    def explain(self, sql, params):
+        """Return the plan lines for one query on the current backend."""
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                # Tiny test tables would otherwise always be seq-scanned
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("EXPLAIN " + sql, params)
+            else:
+                cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            return [str(row[-1]) for row in cursor.fetchall()]
+
+    def is_table_scan(self, line):
+        if "Seq Scan" in line:
+            return True
+        line = line.strip()
+        return line.startswith("SCAN ") and " USING " not in line
+
+    def assertQueryPlans(self, method, url, num_queries, **kwargs):
+        from django.db import connection
+
+        captured = []
+
+        def record(execute, sql, params, many, context):
+            captured.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            response = getattr(self.client, method)(url, **kwargs)
+        self.assertLess(response.status_code, 300, response.content)
+        self.assertEqual(
+            len(captured),
+            num_queries,
+            "\n".join(sql for sql, params in captured),
+        )
+        for sql, params in captured:
+            if not sql.lstrip().upper().startswith("SELECT"):
+                continue
+            plan = self.explain(sql, params)
+            scans = [line for line in plan if self.is_table_scan(line)]
+            self.assertFalse(
+                scans, f"Table scan in plan for {sql}:\n" + "\n".join(plan)
+            )
+        return response
+
+    def test_person_list(self):
+        """Test the person list reads through the pagination index."""
+        url = reverse("api:person-list-create")
+        self.assertQueryPlans("get", url, 4)
+        self.assertQueryPlans("get", url + "?pagination=keyset", 3)
+
+    def test_person_detail(self):
+        """Test person detail cold and warm query counts."""
+        url = reverse("api:person-detail", kwargs={"pk": self.person.id})
+        self.assertQueryPlans("get", url, 4)
+        self.assertQueryPlans("get", url, 1)
+
+    def test_child_lists(self):
+        """Test per-person address and card lists seek the person index."""
+        for name in ("address-list-create", "creditcard-list-create"):
+            url = reverse(f"api:{name}", kwargs={"person_id": self.person.id})
+            self.assertQueryPlans("get", url, 2)
+            self.assertQueryPlans("get", url + "?pagination=keyset", 1)
+
+    def test_child_details(self):
+        """Test address and card detail lookups by primary key."""
+        for name, obj in (
+            ("address-detail", self.address),
+            ("creditcard-detail", self.card),
+        ):
+            url = reverse(f"api:{name}", kwargs={"pk": obj.id})
+            self.assertQueryPlans("get", url, 2)
+
+    def test_batch_get(self):
+        """Test person batch-get is one lookup plus two prefetches."""
+        self.assertQueryPlans(
+            "post",
+            reverse("api:person-batch-get"),
+            3,
+            data={"ids": [str(self.person.id)]},
+            format="json",
+        )
+
+    # Replicas are never migrated, so makemigrations leaves the test's
+    # stand-in replica database alone
+    @override_settings(MIGRATION_MODULES={}, DATABASE_REPLICAS=["replica"])
+    def test_migrations_match_models(self):
+        """Test the models have no changes missing from api/migrations."""
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        try:
+            call_command(
+                "makemigrations",
+                "api",
+                check=True,
+                dry_run=True,
+                stdout=StringIO(),
+            )
+        except SystemExit:
+            self.fail("Model changes are missing a migration")
+
+    def test_index_migrations_build_concurrently(self):
+        """Test indexes are added without locking out writes on Postgres."""
+        from django.db import connection
+        from django.db.migrations.loader import MigrationLoader
+        from django.db.migrations.operations import AddIndex
+        from api.operations import AddIndexConcurrently
+
+        loader = MigrationLoader(connection, ignore_no_migrations=True)
+        with self.settings(MIGRATION_MODULES={}):
+            loader.build_graph()
+        for name in (
+            "0002_listing_indexes",
+            "0003_change_feed",
+            "0004_person_search",
+        ):
+            key = ("api", name)
+            migration = loader.disk_migrations[key]
+            for operation in migration.operations:
+                if isinstance(operation, AddIndex):
+                    self.assertIsInstance(operation, AddIndexConcurrently, key)
+                    self.assertFalse(migration.atomic, key)
+
+
+class QueryTimingMiddlewareTestCase(APITestCase):
+    def setUp(self):
+        from django.db import connection
+        from api.cache import person_cache
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_creditcard")
+            cursor.execute("DELETE FROM api_address")
+            cursor.execute("DELETE FROM api_person")
+        cache.clear()
+        person_cache.clear()
+
+        self.person = Person.objects.create(
+            first_name="John",
+            last_name="Doe",
+            birth_date="1990-01-01",
+            ssn="123456789",
+        )
+        self.url = reverse("api:person-detail", kwargs={"pk": self.person.id})
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=1.0)
+    def test_server_timing_header_and_log(self):
+        """Test sampled requests report query count and phase timings."""
+        with self.assertLogs("api.middleware", "INFO") as logs:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        header = response["Server-Timing"]
+        self.assertIn('desc="4 queries"', header)
+        for name in ("db", "serialize", "render", "total"):
+            self.assertRegex(header, rf"\b{name};dur=\d+\.\d\d")
+
+        record = logs.records[0]
+        self.assertEqual(record.view, "api:person-detail")
+        self.assertEqual(record.db_queries, 4)
+        self.assertEqual(record.status, 200)
+        self.assertIn("db_queries=4", record.getMessage())
+
+    def test_disabled_by_default(self):
+        """Test no timing is added when the sample rate is 0."""
+        response = self.client.get(self.url)
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0.5)
+    def test_sampling(self):
+        """Test only the sampled share of requests is timed."""
+        from unittest import mock
+
+        with mock.patch("api.middleware.random.random", return_value=0.7):
+            response = self.client.get(self.url)
+        self.assertNotIn("Server-Timing", response)
+
+        with mock.patch("api.middleware.random.random", return_value=0.2):
+            response = self.client.get(self.url)
+        self.assertIn("Server-Timing", response)
+
+
+class MetricsTestCase(APITestCase):
+    def setUp(self):
+        from django.db import connection
+        from api.cache import person_cache
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_creditcard")
+            cursor.execute("DELETE FROM api_address")
+            cursor.execute("DELETE FROM api_person")
+        cache.clear()
+        person_cache.clear()
+
+        self.person = Person.objects.create(
+            first_name="John",
+            last_name="Doe",
+            birth_date="1990-01-01",
+            ssn="123456789",
+        )
+
+    def sample(self, text, line_prefix):
+        """Return the value of the exposition line starting with a prefix."""
+        for line in text.splitlines():
+            if line.startswith(line_prefix + " "):
+                return float(line.rsplit(" ", 1)[1])
+        return 0.0
+
+    def scrape(self):
+        response = self.client.get("/api/metrics")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        return response.content.decode()
+
+    def test_request_metrics_per_view(self):
+        """Test latency, query and size histograms are labelled by view."""
+        labels = '{view="api:person-detail",method="GET"}'
+        before = self.scrape()
+        url = reverse("api:person-detail", kwargs={"pk": self.person.id})
+        self.client.get(url)
+        self.client.get(url)
+        after = self.scrape()
+
+        name = "api_request_duration_seconds_count" + labels
+        self.assertEqual(
+            self.sample(after, name) - self.sample(before, name), 2
+        )
+        self.assertIn('api_request_duration_seconds_bucket{view="api:', after)
+        name = 'api_db_queries_per_request_sum{view="api:person-detail"}'
+        # Cold read (4 queries) then a cache hit (1 query)
+        self.assertEqual(
+            self.sample(after, name) - self.sample(before, name), 5
+        )
+        self.assertIn(
+            'api_response_size_bytes_count{view="api:person-detail"}', after
+        )
+        self.assertIn(
+            'api_cache_requests_total{cache="person",result="hit_local"} 1.0',
+            after,
+        )
+
+    @override_settings(RATE_LIMIT_MAX_REQUESTS=1)
+    def test_rate_limit_rejections(self):
+        """Test rejected writes are counted."""
+        name = "api_rate_limit_rejections_total"
+        before = self.sample(self.scrape(), name)
+        url = reverse("api:person-list-create")
+        for _ in range(3):
+            self.client.post(url, {}, format="json")
+        self.assertEqual(self.sample(self.scrape(), name) - before, 2)
+
+    def test_multiprocess_files_are_merged(self):
+        """Test each process's snapshot file is summed on render."""
+        import tempfile
+
+        from api.metrics import MetricsRegistry
+
+        with tempfile.TemporaryDirectory() as directory:
+            workers = []
+            for value in (0.2, 3.0):
+                worker = MetricsRegistry(multiproc_dir=directory)
+                latency = worker.histogram("latency", "Latency.", ("view",))
+                hits = worker.counter("hits", "Hits.")
+                latency.observe(value, "a")
+                hits.inc(amount=2)
+                worker.flush()
+                workers.append(worker)
+
+            text = workers[0].render()
+        self.assertIn("hits 4.0", text)
+        self.assertIn('latency_bucket{view="a",le="0.25"} 1.0', text)
+        self.assertIn('latency_bucket{view="a",le="+Inf"} 2.0', text)
+        self.assertIn('latency_count{view="a"} 2.0', text)
+        self.assertIn('latency_sum{view="a"} 3.2', text)
+
+
+class AsyncReadViewTestCase(APITestCase):
+    def setUp(self):
+        from django.db import connection
+        from api.cache import person_cache
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_creditcard")
+            cursor.execute("DELETE FROM api_address")
+            cursor.execute("DELETE FROM api_person")
+        cache.clear()
+        person_cache.clear()
+
+        self.people = []
+        for index in range(3):
+            person = Person.objects.create(
+                first_name=f"John{index}",
+                last_name="Doe",
+                birth_date="1990-01-01",
+                ssn=f"12345678{index}",
+            )
+            Address.objects.create(
+                person=person,
+                address_type="Home",
+                street_address="123 Main St",
+                city="Anytown",
+                state="NY",
+                zip_code="12345",
+            )
+            CreditCard.objects.create(
+                person=person,
+                card_type="Visa",
+                last_four_digits=f"111{index}",
+                expiration_month=12,
+                expiration_year=2025,
+            )
+            self.people.append(person)
+        self.person = self.people[0]
+
+    def call(self, view_class, url, method="get", data=None, **headers):
+        """Call an async view directly and return its response."""
+        from asgiref.sync import async_to_sync
+        from django.test import RequestFactory
+        from django.urls import resolve
+
+        factory = RequestFactory()
+        if method == "get":
+            request = factory.get(url, data, **headers)
+        else:
+            request = getattr(factory, method)(
+                url, data, content_type="application/json", **headers
+            )
+        kwargs = resolve(request.path).kwargs
+        response = async_to_sync(view_class.as_view())(request, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+    def assert_same(self, view_class, url, data=None, **headers):
+        expected = self.client.get(url, data, **headers)
+        response = self.call(view_class, url, data=data, **headers)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+        for header in ("Content-Type", "ETag", "Last-Modified", "Allow"):
+            self.assertEqual(response.get(header), expected.get(header))
+        return response
+
+    def test_list_endpoints_match_sync_views(self):
+        """Test async list output is byte-identical to the DRF views."""
+        from api import async_views
+
+        url = reverse("api:person-list-create")
+        self.assert_same(async_views.PersonListCreateView, url)
+        self.assert_same(
+            async_views.PersonListCreateView, url, {"page_size": 2}
+        )
+        self.assert_same(
+            async_views.PersonListCreateView,
+            url,
+            {"pagination": "keyset", "page_size": 2},
+        )
+        response = self.assert_same(
+            async_views.PersonListCreateView, url, {"page": 9}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        kwargs = {"person_id": self.person.id}
+        self.assert_same(
+            async_views.AddressListCreateView,
+            reverse("api:address-list-create", kwargs=kwargs),
+        )
+        self.assert_same(
+            async_views.CreditCardListCreateView,
+            reverse("api:creditcard-list-create", kwargs=kwargs),
+        )
+
+    @override_settings(API_DB_MASKING=True)
+    def test_list_endpoints_match_sync_views_with_db_masking(self):
+        """Test async lists masked in SQL match the DRF views."""
+        self.test_list_endpoints_match_sync_views()
+
+    def test_detail_endpoints_match_sync_views(self):
+        """Test async detail output, validators and 404s match."""
+        import uuid
+
+        from api import async_views
+
+        url = reverse("api:person-detail", kwargs={"pk": self.person.id})
+        self.assert_same(async_views.PersonDetailView, url)
+        address = self.person.addresses.get()
+        self.assert_same(
+            async_views.AddressDetailView,
+            reverse("api:address-detail", kwargs={"pk": address.id}),
+        )
+        card = self.person.credit_cards.get()
+        self.assert_same(
+            async_views.CreditCardDetailView,
+            reverse("api:creditcard-detail", kwargs={"pk": card.id}),
+        )
+        for name, view_class in (
+            ("person-detail", async_views.PersonDetailView),
+            ("address-detail", async_views.AddressDetailView),
+        ):
+            response = self.assert_same(
+                view_class,
+                reverse(f"api:{name}", kwargs={"pk": uuid.uuid4()}),
+            )
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_query_threads_close_connections_without_max_age(self):
+        """Test query threads keep no connection CONN_MAX_AGE=0 would close,
+        and leave persistent ones to CONN_MAX_AGE."""
+        from unittest import mock
+        from django.db import connections
+        from api.async_views import _call
+
+        connection = connections["default"]
+        for max_age, closed in ((0, True), (60, False), (None, False)):
+            with mock.patch.dict(
+                connection.settings_dict, CONN_MAX_AGE=max_age
+            ), mock.patch.object(
+                connection, "close"
+            ) as close, mock.patch.object(
+                connection, "close_if_unusable_or_obsolete"
+            ) as close_if_obsolete:
+                self.assertEqual(_call(len, ("abc",), "default"), 3)
+            self.assertEqual(close.called, closed, max_age)
+            self.assertEqual(close_if_obsolete.called, not closed, max_age)
+
+    def test_detail_reads_version_before_body(self):
+        """Test the ETag version is read before, not alongside, the body."""
+        from unittest import mock
+        from api import async_views
+
+        fetch = async_views.fetch
+        batches = []
+
+        async def recording_fetch(*querysets):
+            batches.append(len(querysets))
+            return await fetch(*querysets)
+
+        address = self.person.addresses.get()
+        url = reverse("api:address-detail", kwargs={"pk": address.id})
+        with mock.patch("api.async_views.fetch", recording_fetch):
+            response = self.call(async_views.AddressDetailView, url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(batches, [1, 1])
+
+    def test_conditional_requests_and_cache(self):
+        """Test 304 responses and that the person cache is shared."""
+        from django.test.utils import CaptureQueriesContext
+        from django.db import connection
+        from api import async_views
+        from api.cache import person_cache
+
+        url = reverse("api:person-detail", kwargs={"pk": self.person.id})
+        etag = self.client.get(url)["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.call(async_views.PersonDetailView, url)
+        # Version only: the sync view cached the representation
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(person_cache.stats()["local_hits"], 1)
+        self.assertEqual(response["ETag"], etag)
+
+        response = self.call(
+            async_views.PersonDetailView, url, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+        address = self.person.addresses.get()
+        url = reverse("api:address-detail", kwargs={"pk": address.id})
+        etag = self.client.get(url)["ETag"]
+        response = self.call(
+            async_views.AddressDetailView, url, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_writes_and_sparse_fieldsets_use_drf_views(self):
+        """Test non-GET requests and ?fields= are delegated."""
+        from api import async_views
+
+        url = reverse("api:person-detail", kwargs={"pk": self.person.id})
+        response = self.call(
+            async_views.PersonDetailView,
+            url,
+            method="patch",
+            data={"first_name": "Jane"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.person.refresh_from_db()
+        self.assertEqual(self.person.first_name, "Jane")
+
+        response = self.assert_same(
+            async_views.PersonDetailView, url, {"fields": "id,first_name"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.assert_same(
+            async_views.PersonListCreateView,
+            reverse("api:person-list-create"),
+            {"fields": "password"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_async_middleware_chain(self):
+        """Test the middleware runs in async mode under the ASGI handler."""
+        from asgiref.sync import async_to_sync
+        from api import metrics
+
+        url = reverse("api:person-detail", kwargs={"pk": self.person.id})
+        labels = ("api:person-detail", "GET", "200")
+        before = metrics.REQUESTS.values.get(labels, 0)
+        response = async_to_sync(self.async_client.get)(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, self.client.get(url).content)
+        self.assertEqual(metrics.REQUESTS.values[labels] - before, 2)
+
+
+class AsyncConcurrentFetchTestCase(TransactionTestCase):
+    def test_querysets_run_on_pool_connections(self):
+        """Test concurrent fetches use pool threads and count queries."""
+        import threading
+
+        from asgiref.sync import async_to_sync
+        from api.async_views import fetch
+        from api.middleware import QueryCounter, observing
+
+        person = Person.objects.create(
+            first_name="John",
+            last_name="Doe",
+            birth_date="1990-01-01",
+            ssn="123456789",
+        )
+        Address.objects.create(
+            person=person,
+            address_type="Home",
+            street_address="123 Main St",
+            city="Anytown",
+            state="NY",
+            zip_code="12345",
+        )
+        threads = set()
+
+        class ThreadRecorder(QueryCounter):
+            def record(self, seconds):
+                super().record(seconds)
+                threads.add(threading.current_thread().name)
+
+        async def run():
+            with observing(ThreadRecorder()) as counter:
+                results = await fetch(
+                    Person.objects.values("id"),
+                    Address.objects.values("person_id"),
+                )
+            return results, counter.count
+
+        with override_settings(ASYNC_CONCURRENT_QUERIES=True):
+            (people, addresses), count = async_to_sync(run)()
+        self.assertEqual(people, [{"id": person.id}])
+        self.assertEqual(addresses, [{"person_id": person.id}])
+        self.assertEqual(count, 2)
+        self.assertTrue(threads)
+        self.assertTrue(all(name.startswith("api-query") for name in threads))
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=1.0)
+    def test_concurrent_requests_count_their_own_queries(self):
+        """Test each of several concurrent requests reports its queries."""
+        import asyncio
+        import re
+
+        from asgiref.sync import async_to_sync
+        from django.test import RequestFactory
+        from api import async_views
+        from api.cache import person_cache
+        from api.middleware import QueryTimingMiddleware
+
+        people = [
+            Person.objects.create(
+                first_name=f"John{index}",
+                last_name="Doe",
+                birth_date="1990-01-01",
+                ssn="123456789",
+            )
+            for index in range(8)
+        ]
+        view = async_views.PersonDetailView.as_view()
+
+        async def get_response(request):
+            return await view(request, pk=request.pk)
+
+        middleware = QueryTimingMiddleware(get_response)
+
+        async def get(person, data=None):
+            request = RequestFactory().get(f"/api/person/{person.id}/", data)
+            request.pk = person.id
+            response = await middleware(request)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return int(
+                re.search(r'desc="(\d+) queries"', response["Server-Timing"])[
+                    1
+                ]
+            )
+
+        async def run(data=None):
+            return await asyncio.gather(
+                *(get(person, data) for person in people)
+            )
+
+        for concurrent in (True, False):
+            with override_settings(ASYNC_CONCURRENT_QUERIES=concurrent):
+                cache.clear()
+                person_cache.clear()
+                alone = async_to_sync(get)(people[0])
+                cache.clear()
+                person_cache.clear()
+                counts = async_to_sync(run)()
+                self.assertGreater(alone, 1)
+                self.assertEqual(counts, [alone] * len(people))
+
+                # Delegated to the DRF view, in a thread
+                alone = async_to_sync(get)(people[0], {"fields": "id"})
+                counts = async_to_sync(run)({"fields": "id"})
+                self.assertGreater(alone, 0)
+                self.assertEqual(counts, [alone] * len(people))
+
+
+class DatabaseConnectionStatsTestCase(APITestCase):
+    def setUp(self):
+        from api.dbstats import connection_stats
+
+        cache.clear()
+        connection_stats.reset()
+
+    def connection_handler(self, **databases):
+        import os
+        import tempfile
+
+        from django.db.utils import ConnectionHandler
+
+        # A file database: in-memory SQLite connections are never closed
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        handler = ConnectionHandler(
+            {
+                "default": {
+                    "ENGINE": "django.db.backends.sqlite3",
+                    "NAME": os.path.join(directory.name, "db.sqlite3"),
+                },
+                **databases,
+            }
+        )
+        self.addCleanup(handler.close_all)
+        return handler
+
+    def test_health_reports_connection_churn(self):
+        """Test new connections per request are reported by alias."""
+        from api.dbstats import connection_stats
+
+        handler = self.connection_handler()
+        for _ in range(2):
+            self.client.get(reverse("api:liveness-check"))
+            handler["default"].ensure_connection()
+            handler["default"].close()
+        stats = connection_stats.snapshot()
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["aliases"]["default"]["opened"], 2)
+
+        response = self.client.get(reverse("api:health-check"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        default = response.data["connections"]["default"]
+        self.assertEqual(default["vendor"], "sqlite")
+        self.assertEqual(default["requests"], 3)
+        self.assertEqual(default["opened"], 2)
+        self.assertEqual(default["opened_per_request"], 0.667)
+        self.assertIsNone(default["pool"])
+
+    def test_pool_requires_non_persistent_connections(self):
+        """Test OPTIONS['pool'] is rejected together with CONN_MAX_AGE."""
+        from django.core.exceptions import ImproperlyConfigured
+
+        handler = self.connection_handler(
+            pooled={
+                "ENGINE": "api.backends.postgresql",
+                "NAME": "personalinfo",
+                "CONN_MAX_AGE": 60,
+                "OPTIONS": {"pool": True},
+            }
+        )
+        self.assertNotIn("pool", handler["pooled"].get_connection_params())
+        with self.assertRaises(ImproperlyConfigured):
+            handler["pooled"].pool
+
+    def test_pool_wait_is_reported(self):
+        """Test pool checkouts time out and are counted in pool stats."""
+        try:
+            import psycopg_pool  # noqa: F401
+            from django.db.backends.postgresql.base import is_psycopg3
+        except ImportError:
+            is_psycopg3 = False
+        if not is_psycopg3:
+            self.skipTest("psycopg 3 and psycopg_pool are not installed")
+
+        from django.db import OperationalError
+        from api.dbstats import connection_stats
+
+        handler = self.connection_handler(
+            pooled={
+                "ENGINE": "api.backends.postgresql",
+                "NAME": "personalinfo",
+                # Nothing listens here, so every checkout waits and fails
+                "HOST": "127.0.0.1",
+                "PORT": "1",
+                "OPTIONS": {
+                    "pool": {"min_size": 0, "max_size": 1, "timeout": 0.2}
+                },
+            }
+        )
+        pooled = handler["pooled"]
+        self.addCleanup(pooled.close_pool)
+        with self.assertRaises(OperationalError):
+            pooled.ensure_connection()
+
+        stats = pooled.existing_pool.get_stats()
+        self.assertEqual(stats["requests_errors"], 1)
+        self.assertGreaterEqual(stats["requests_wait_ms"], 150)
+        self.assertNotIn("pooled", connection_stats.snapshot()["aliases"])
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRoutingTestCase(APITestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        from django.db import connections
+        from api.cache import person_cache
+        from api.routers import replica_health
+
+        for alias in self.databases:
+            with connections[alias].cursor() as cursor:
+                cursor.execute("DELETE FROM api_creditcard")
+                cursor.execute("DELETE FROM api_address")
+                cursor.execute("DELETE FROM api_person")
+        cache.clear()
+        person_cache.clear()
+        replica_health.reset()
+
+        # Same row with a different name on each database, to tell which
+        # one served a read
+        data = {
+            "last_name": "Doe",
+            "birth_date": "1990-01-01",
+            "ssn": "123456789",
+        }
+        self.person = Person.objects.create(first_name="Primary", **data)
+        Person.objects.using("replica").create(
+            id=self.person.id, first_name="Replica", **data
+        )
+        self.url = reverse("api:person-list-create")
+
+    def read_name(self, client_ip="10.0.0.1"):
+        response = self.client.get(self.url, REMOTE_ADDR=client_ip)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["results"][0]["first_name"]
+
+    def test_reads_go_to_replica(self):
+        """Test GET requests read from the replica."""
+        self.assertEqual(self.read_name(), "Replica")
+
+    def test_writer_is_pinned_to_primary(self):
+        """Test a client reads from the primary right after writing."""
+        response = self.client.patch(
+            reverse("api:person-detail", args=[self.person.id]),
+            {"last_name": "Smith"},
+            format="json",
+            REMOTE_ADDR="10.0.0.1",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            Person.objects.using("replica").get().last_name, "Doe"
+        )
+
+        self.assertEqual(self.read_name(), "Primary")
+        self.assertEqual(self.read_name(client_ip="10.0.0.2"), "Replica")
+        with override_settings(DB_REPLICA_PIN_SECONDS=0):
+            cache.clear()
+            self.assertEqual(self.read_name(), "Replica")
+
+    def test_database_cache_is_read_from_primary(self):
+        """Test pins kept in the database cache are not read from replicas."""
+        from django.core.cache.backends.db import DatabaseCache
+        from api.routers import ReplicaRouter, read_from
+
+        entry = DatabaseCache("api_cache", {}).cache_model_class
+        with read_from("replica"):
+            self.assertEqual(ReplicaRouter().db_for_read(entry), "default")
+            self.assertEqual(ReplicaRouter().db_for_read(Person), "replica")
+
+    def test_unhealthy_replica_fails_over_to_primary(self):
+        """Test reads fall back to the primary while the replica is down."""
+        from unittest import mock
+        from django.db import OperationalError, connections
+        from api.routers import replica_health
+
+        replica = connections["replica"]
+        with mock.patch.object(
+            replica, "cursor", side_effect=OperationalError("down")
+        ):
+            self.assertEqual(self.read_name(), "Primary")
+        self.assertIs(replica_health.cached("replica"), False)
+
+        # Not checked again until the result expires
+        self.assertEqual(self.read_name(), "Primary")
+        replica_health.reset()
+        self.assertEqual(self.read_name(), "Replica")
+
+        response = self.client.get(reverse("api:health-check"))
+        self.assertIs(
+            response.data["connections"]["replica"]["replica_healthy"], True
+        )
+
+    def test_writes_go_to_primary(self):
+        """Test saving an instance read from the replica writes the primary."""
+        from api.routers import read_from
+
+        with read_from("replica"):
+            person = Person.objects.get()
+        self.assertEqual(person._state.db, "replica")
+        person.last_name = "Smith"
+        person.save()
+        self.assertEqual(Person.objects.get().last_name, "Smith")
+        self.assertEqual(
+            Person.objects.using("replica").get().last_name, "Doe"
+        )
+
+    def test_async_middleware_routes_reads(self):
+        """Test the middleware picks the replica in async mode too."""
+        from asgiref.sync import async_to_sync
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from api.middleware import ReplicaRoutingMiddleware
+        from api.routers import get_read_alias
+
+        aliases = []
+
+        async def get_response(request):
+            aliases.append(get_read_alias())
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        factory = RequestFactory()
+        async_to_sync(middleware)(factory.get(self.url))
+        async_to_sync(middleware)(factory.post(self.url))
+        async_to_sync(middleware)(factory.get(self.url))
+        self.assertEqual(aliases, ["replica", None, None])
+        self.assertIsNone(get_read_alias())
+
+
+class EndpointBenchmarkTestCase(APITestCase):
+    def setUp(self):
+        from django.db import connection
+        from api.cache import person_cache
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_creditcard")
+            cursor.execute("DELETE FROM api_address")
+            cursor.execute("DELETE FROM api_person")
+            cursor.execute("DELETE FROM api_tombstone")
+        cache.clear()
+        person_cache.clear()
+
+    def options(self, **overrides):
+        import argparse
+        from benchmarks import endpoints
+
+        parser = argparse.ArgumentParser()
+        endpoints.add_arguments(parser)
+        options = vars(parser.parse_args([]))
+        options.update(overrides)
+        return options
+
+    def test_scenarios_cover_every_route(self):
+        """Test every URL name in api/urls.py has a benchmark scenario."""
+        from api.urls import urlpatterns
+        from benchmarks.endpoints import scenarios
+
+        self.assertEqual(
+            {pattern.name for pattern in urlpatterns},
+            {scenario.route for scenario in scenarios()},
+        )
+
+    def test_client_driver_reports_every_scenario(self):
+        """Test an in-process run seeds, measures and cleans up."""
+        import datetime
+        from django.utils import timezone
+        from api.models import Tombstone
+        from api.seeding import seed_data
+        from benchmarks import endpoints
+
+        seed_data(5)
+        existing = {
+            model: list(model.objects.order_by("pk").values())
+            for model in (Person, Address, CreditCard)
+        }
+        # Written by another client during the run
+        tombstone = Tombstone.objects.create(
+            object_type=Tombstone.PERSON,
+            object_id=Person.objects.first().pk,
+            person_id=Person.objects.first().pk,
+        )
+        Tombstone.objects.filter(pk=tombstone.pk).update(
+            deleted_at=timezone.now() + datetime.timedelta(hours=1)
+        )
+
+        report = endpoints.run(
+            self.options(persons=5, requests=2, warmup=0),
+            log=lambda message: None,
+        )
+        for model, rows in existing.items():
+            self.assertEqual(
+                list(model.objects.order_by("pk").values()), rows, model
+            )
+        self.assertEqual(list(Tombstone.objects.all()), [tombstone])
+        self.assertEqual(
+            set(report["routes"]),
+            {scenario.name for scenario in endpoints.scenarios()},
+        )
+        for name, result in report["routes"].items():
+            self.assertEqual(result["requests"], 2, name)
+            self.assertEqual(result["errors"], 0, name)
+        self.assertEqual(
+            report["routes"]["liveness-check GET"]["queries_per_request"], 0
+        )
+        self.assertGreater(
+            report["routes"]["person-detail GET"]["queries_per_request"], 0
+        )
+
+    @override_settings(BENCHMARK_DATABASE=False)
+    def test_refuses_unmarked_database(self):
+        """Test the benchmark won't write to a database not set aside."""
+        from benchmarks import endpoints
+
+        with self.assertRaises(RuntimeError):
+            endpoints.run(self.options(persons=5), log=lambda message: None)
+        self.assertEqual(Person.objects.count(), 0)
+
+    def test_runs_are_deterministic(self):
+        """Test repeated runs make the same requests from the same state."""
+        from benchmarks import endpoints
+
+        options = self.options(
+            persons=20, requests=30, warmup=5, routes=["person-detail"]
+        )
+        first, second = (
+            endpoints.run(options, log=lambda message: None)["routes"]
+            for _ in range(2)
+        )
+        for name in ("person-detail GET", "person-detail PATCH"):
+            self.assertEqual(
+                first[name]["queries_per_request"],
+                second[name]["queries_per_request"],
+            )
+
+    def test_compare_flags_regressions(self):
+        """Test slower, costlier or failing routes count as regressions."""
+        from benchmarks.endpoints import compare
+
+        def report(rps, p95_ms, queries, errors=0):
+            return {
+                "routes": {
+                    "person-detail GET": {
+                        "rps": rps,
+                        "p95_ms": p95_ms,
+                        "queries_per_request": queries,
+                        "errors": errors,
+                    }
+                }
+            }
+
+        baseline = report(100.0, 10.0, 3.0)
+        self.assertEqual(
+            compare(report(90.0, 11.0, 3.0), baseline, 0.2, True)[1], []
+        )
+        self.assertEqual(
+            len(compare(report(50.0, 30.0, 4.0, 1), baseline, 0.2, True)[1]),
+            4,
+        )
+        # Timings depend on the host and are only compared on request
+        self.assertEqual(
+            len(compare(report(50.0, 30.0, 4.0, 1), baseline, 0.2)[1]), 2
+        )
+        self.assertEqual(
+            compare(report(50.0, 30.0, 3.0), baseline, 0.2)[1], []
+        )
+        # Small absolute latency changes are noise
+        self.assertEqual(
+            compare(
+                report(100.0, 0.5, 3.0), report(100.0, 0.2, 3.0), 0.2, True
+            )[1],
+            [],
+        )
+        self.assertEqual(
+            compare(
+                report(600.0, 0.5, 3.0), report(800.0, 0.5, 3.0), 0.2, True
+            )[1],
+            [],
+        )
+        # The http driver can't reset the server's person cache, and other
+        # request counts hit it differently
+        http = dict(report(100.0, 10.0, 4.0), meta={"driver": "http"})
+        self.assertEqual(compare(http, baseline, 0.2)[1], [])
+        shorter = dict(
+            report(100.0, 10.0, 4.0), meta={"requests_per_route": 50}
+        )
+        self.assertEqual(compare(shorter, baseline, 0.2)[1], [])
+        # Nor do other database backends issue the same queries
+        postgres = dict(report(100.0, 10.0, 4.0), meta={"database": "pg"})
+        self.assertEqual(compare(postgres, baseline, 0.2)[1], [])
+
+    def test_default_baseline_keeps_no_timings(self):
+        """Test the committed baseline only holds host-independent counts
+        and a timing baseline is only written where asked for."""
+        import json
+        import tempfile
+        from pathlib import Path
+        from unittest import mock
+        from benchmarks import endpoints
+
+        options = self.options(
+            persons=5, requests=2, warmup=0, routes=["liveness-check"]
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            options.update(
+                output=str(Path(directory) / "report.json"),
+                save_baseline=True,
+            )
+            with mock.patch.object(endpoints, "BASELINE_DIR", Path(directory)):
+                endpoints.main(options, log=lambda message: None)
+                default = json.loads(
+                    endpoints.default_baseline(options).read_text()
+                )
+            options["baseline"] = str(Path(directory) / "timed.json")
+            endpoints.main(options, log=lambda message: None)
+            timed = json.loads(Path(options["baseline"]).read_text())
+
+        self.assertEqual(
+            default["routes"]["liveness-check GET"],
+            {"requests": 2, "queries_per_request": 0, "errors": 0},
+        )
+        self.assertIn("p95_ms", timed["routes"]["liveness-check GET"])
+
+        stored = json.loads(
+            (endpoints.BASELINE_DIR / "client-1k.json").read_text()
+        )
+        for name, result in stored["routes"].items():
+            self.assertNotIn("rps", result, name)
+            self.assertNotIn("p95_ms", result, name)
+
+
+class SeedDataTestCase(APITestCase):
+    def setUp(self):
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_creditcard")
+            cursor.execute("DELETE FROM api_address")
+            cursor.execute("DELETE FROM api_person")
+
+    def seed(self, **options):
+        from io import StringIO
+        from django.core.management import call_command
+
+        call_command("seed_data", stdout=StringIO(), **options)
+
+    def snapshot(self):
+        return (
+            list(Person.objects.order_by("id").values_list()),
+            list(Address.objects.order_by("id").values_list()),
+            list(CreditCard.objects.order_by("id").values_list()),
+        )
+
+    def test_generated_rows_are_valid(self):
+        """Test generated rows pass the model validators and constraints."""
+        from api.seeding import generate
+
+        persons, addresses, cards = generate(0, 0, 300)
+        for person in persons:
+            person.full_clean(validate_unique=False)
+        for row in [*addresses, *cards]:
+            row.full_clean(exclude=["person"], validate_unique=False)
+        ssns = [person.ssn for person in persons]
+        self.assertIn(None, ssns)
+        self.assertTrue(any(ssn and "-" in ssn for ssn in ssns))
+
+        # chk_ssn_format is checked by the database
+        self.seed(persons=300)
+        self.assertEqual(Person.objects.count(), 300)
+        self.assertEqual(Address.objects.count(), len(addresses))
+        self.assertEqual(CreditCard.objects.count(), len(cards))
+        self.assertEqual(
+            Person.objects.order_by("created_at").first().created_at.year,
+            2020,
+        )
+        # The generated timestamps are stored as the ORM stores them, and
+        # the fields still stamp rows saved later
+        self.assertEqual(
+            sorted(Address.objects.values_list("created_at", "updated_at")),
+            sorted((row.created_at, row.updated_at) for row in addresses),
+        )
+        self.assertTrue(
+            Person.objects.filter(created_at=persons[0].created_at).exists()
+        )
+        self.assertTrue(Person._meta.get_field("updated_at").auto_now)
+
+    def test_data_depends_only_on_seed(self):
+        """Test batch sizes and topping up don't change the data set."""
+        self.seed(persons=1200, seed=5, batch_size=1200)
+        expected = self.snapshot()
+
+        self.seed(persons=1200, seed=5, clear=True, batch_size=7)
+        self.assertEqual(self.snapshot(), expected)
+
+        self.seed(persons=500, seed=5, clear=True, batch_size=300)
+        self.seed(persons=1200, seed=5)
+        self.assertEqual(self.snapshot(), expected)
+
+        self.seed(persons=1200, seed=6, clear=True)
+        self.assertNotEqual(self.snapshot(), expected)
+
+
+class DatabaseMaskingTestCase(APITestCase):
+    def setUp(self):
+        from django.db import connection
+        from .cache import person_cache
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_creditcard")
+            cursor.execute("DELETE FROM api_address")
+            cursor.execute("DELETE FROM api_person")
+        cache.clear()
+        person_cache.clear()
+
+    def test_expressions_match_python_masking(self):
+        """Test every mask_*_expression matches its Python method."""
+        import random
+        from django.db.models import CharField, Value
+        from .services import DataMaskingService
+
+        Person.objects.create(
+            first_name="John", last_name="Doe", birth_date="1990-01-01"
+        )
+        rng = random.Random(22)
+        # ASCII digits only: Postgres' [0-9] doesn't match other scripts'
+        alphabet = "0123456789-- abcXYZéß李"
+        values = [None, *DataMaskingBatchTestCase.values[:13]]
+        values += [
+            "".join(rng.choices(alphabet, k=rng.randrange(15)))
+            for _ in range(150)
+        ]
+        service = DataMaskingService()
+        for method in DataMaskingBatchTestCase.methods:
+            expression = getattr(service, f"{method}_expression")
+            python = getattr(service, method)
+            for value in values:
+                masked = (
+                    Person.objects.annotate(
+                        raw=Value(value, output_field=CharField())
+                    )
+                    .values_list(expression("raw"), flat=True)
+                    .get()
+                )
+                self.assertEqual(masked, python(value), (method, value))
+
+    def test_list_endpoints_match_python_masking(self):
+        """Test list responses are identical with API_DB_MASKING."""
+        from api.seeding import seed_data
+
+        seed_data(130, seed=3)
+        Address.objects.update(country="CA")
+        person_id = CreditCard.objects.values_list("person", flat=True)[0]
+        urls = [
+            reverse("api:person-list-create"),
+            reverse("api:person-list-create") + "?page=2",
+            reverse("api:person-list-create") + "?fields=id,ssn&expand=",
+            reverse("api:person-list-create") + "?expand=addresses",
+            reverse("api:person-list-create") + "?cursor=&page_size=7",
+            reverse("api:address-list-create", args=[person_id]),
+            reverse("api:creditcard-list-create", args=[person_id]),
+        ]
+        for url in urls:
+            expected = self.client.get(url)
+            self.assertEqual(expected.status_code, 200, url)
+            with override_settings(API_DB_MASKING=True):
+                response = self.client.get(url)
+            self.assertEqual(response.json(), expected.json(), url)
+
+    def test_raw_values_are_not_selected(self):
+        """Test masked list queries never select the raw columns."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        person = Person.objects.create(
+            first_name="John",
+            last_name="Doe",
+            birth_date="1990-01-01",
+            ssn="123456789",
+        )
+        CreditCard.objects.create(
+            person=person,
+            card_type="Visa",
+            last_four_digits="4242",
+            expiration_month=1,
+            expiration_year=2030,
+        )
+        with override_settings(API_DB_MASKING=True), CaptureQueriesContext(
+            connection
+        ) as queries:
+            response = self.client.get(reverse("api:person-list-create"))
+        row = response.data["results"][0]
+        self.assertEqual(row["ssn"], "***-**-6789")
+        self.assertEqual(
+            row["credit_cards"][0]["last_four_digits"], "****4242"
+        )
+        for query in queries:
+            self.assertNotRegex(
+                query["sql"], r'"api_person"\."ssn"\s+(,|FROM)'
+            )
+
+
+class ReadModelTestCase(APITestCase):
+    def setUp(self):
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_creditcard")
+            cursor.execute("DELETE FROM api_address")
+            cursor.execute("DELETE FROM api_person")
+
+        from api.seeding import seed_data
+
+        seed_data(40, seed=23)
+
+    def test_serializers_read_records(self):
+        """Test the DRF serializers give the same output for records."""
+        from api.records import ReadModel
+        from .serializers import (
+            AddressSerializer,
+            CreditCardSerializer,
+            PersonSerializer,
+        )
+
+        read_model = ReadModel(
+            Person,
+            children={
+                "addresses": ReadModel(Address),
+                "credit_cards": ReadModel(CreditCard),
+            },
+        )
+        records = read_model.fetch(Person.objects.order_by("id"))
+        persons = Person.objects.order_by("id").prefetch_related(
+            "addresses", "credit_cards"
+        )
+        self.assertEqual(
+            PersonSerializer(records, many=True).data,
+            PersonSerializer(persons, many=True).data,
+        )
+        addresses = [a for record in records for a in record.addresses]
+        self.assertEqual(
+            AddressSerializer(addresses, many=True).data,
+            AddressSerializer(
+                [a for p in persons for a in p.addresses.all()], many=True
+            ).data,
+        )
+        self.assertEqual(
+            CreditCardSerializer(records[0].credit_cards, many=True).data,
+            CreditCardSerializer(
+                persons[0].credit_cards.all(), many=True
+            ).data,
+        )
+        self.assertFalse(hasattr(records[0], "__dict__"))
+        self.assertEqual(records[0].pk, persons[0].pk)
+
+    def test_records_group_children_by_parent(self):
+        """Test children are loaded with one query per relation."""
+        from api.representations import person_representation
+
+        queryset = person_representation.records(
+            Person.objects.all(), ["created_at"]
+        )
+        with self.assertNumQueries(3):
+            records = person_representation.load_nested(
+                queryset[:10], ["created_at"]
+            )
+        for record in records:
+            person = Person.objects.get(pk=record.id)
+            self.assertEqual(
+                [a.id for a in record.addresses],
+                list(person.addresses.values_list("id", flat=True)),
+            )
+            self.assertEqual(
+                [c.id for c in record.credit_cards],
+                list(person.credit_cards.values_list("id", flat=True)),
+            )
+
+    def test_list_reads_only_representation_columns(self):
+        """Test sparse fieldsets narrow the record columns."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("api:person-list-create"),
+                {"fields": "id,first_name", "pagination": "keyset"},
+            )
+        self.assertEqual(
+            set(response.data["results"][0]), {"id", "first_name"}
+        )
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("ssn", queries[0]["sql"])
+
+
+@override_settings(CHANGES_SETTLE_SECONDS=0)
+class ChangeFeedTestCase(APITestCase):
+    def setUp(self):
+        from django.db import connection
+        from .cache import person_cache
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_creditcard")
+            cursor.execute("DELETE FROM api_address")
+            cursor.execute("DELETE FROM api_person")
+            cursor.execute("DELETE FROM api_tombstone")
+        cache.clear()
+        person_cache.clear()
+
+        self.person = Person.objects.create(
+            first_name="John",
+            last_name="Doe",
+            birth_date="1990-01-01",
+            ssn="123456789",
+        )
+        self.address = Address.objects.create(
+            person=self.person,
+            address_type="Home",
+            street_address="123 Main St",
+            city="Anytown",
+            state="NY",
+            zip_code="12345",
+        )
+
+    def read(self, cursor=None, **params):
+        if cursor is not None:
+            params["since"] = cursor
+        response = self.client.get(reverse("api:changes"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def ops(self, data):
+        return [(c["type"], c["op"], c["id"]) for c in data["changes"]]
+
+    def test_changes_since_cursor(self):
+        """Test creates, updates and deletes are returned in order."""
+        data = self.read()
+        self.assertEqual(
+            self.ops(data),
+            [
+                ("person", "created", str(self.person.id)),
+                ("address", "created", str(self.address.id)),
+            ],
+        )
+        self.assertFalse(data["has_more"])
+        self.assertEqual(self.read(data["cursor"])["changes"], [])
+
+        self.person.first_name = "Jane"
+        self.person.save()
+        card = CreditCard.objects.create(
+            person=self.person,
+            card_type="Visa",
+            last_four_digits="4242",
+            expiration_month=1,
+            expiration_year=2030,
+        )
+        person_id, address_id = str(self.person.id), str(self.address.id)
+        self.address.delete()
+        changes = self.read(data["cursor"])
+        self.assertEqual(
+            self.ops(changes),
+            [
+                ("person", "updated", person_id),
+                ("creditcard", "created", str(card.id)),
+                ("address", "deleted", address_id),
+            ],
+        )
+        self.assertEqual(
+            {c["person_id"] for c in changes["changes"]}, {person_id}
+        )
+
+        self.person.delete()
+        deleted = self.read(changes["cursor"])
+        self.assertEqual(
+            sorted(self.ops(deleted)),
+            [
+                ("creditcard", "deleted", str(card.id)),
+                ("person", "deleted", person_id),
+            ],
+        )
+
+    def test_limit_pages_through_changes(self):
+        """Test small pages return every change exactly once."""
+        for index in range(5):
+            Address.objects.create(
+                person=self.person,
+                address_type="Work",
+                street_address=f"{index} Side St",
+                city="Anytown",
+                state="NY",
+                zip_code="12345",
+            )
+        expected = self.ops(self.read())
+        seen, cursor = [], None
+        while True:
+            data = self.read(cursor, limit=2)
+            self.assertLessEqual(len(data["changes"]), 2)
+            seen += self.ops(data)
+            cursor = data["cursor"]
+            if not data["has_more"]:
+                break
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(seen), 7)
+
+        only = self.read(types="address")
+        self.assertEqual({c["type"] for c in only["changes"]}, {"address"})
+
+    def test_payloads_are_masked(self):
+        """Test ?payload= adds the masked representations."""
+        data = self.read(payload="true")
+        person, address = (c["data"] for c in data["changes"])
+        self.assertEqual(person["ssn"], "***-**-6789")
+        self.assertNotIn("addresses", person)
+        self.assertEqual(address["street_address"], "12*********")
+        self.assertNotIn("data", self.read(data["cursor"])["changes"])
+
+    def test_new_readers_skip_old_deletions(self):
+        """Test a first read has no tombstones and old cursors expire."""
+        import datetime
+        from django.utils import timezone
+        from api.changes import Cursor, encode_cursor
+
+        self.address.delete()
+        self.assertEqual(
+            [c["op"] for c in self.read()["changes"]], ["created"]
+        )
+
+        now = timezone.now()
+        old = now - datetime.timedelta(days=31)
+        # Backfilling from an old position is fine if the reader is new
+        self.read(encode_cursor(Cursor(old, self.person.id, now)))
+        response = self.client.get(
+            reverse("api:changes"),
+            {"since": encode_cursor(Cursor(old, self.person.id, old))},
+        )
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_invalid_parameters(self):
+        """Test bad cursors, types and limits are rejected."""
+        response = self.client.get(
+            reverse("api:changes"),
+            {"since": "nope", "types": "person,nope", "limit": "0"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(
+            reverse("api:changes"), {"types": "nope", "limit": "0"}
+        )
+        self.assertEqual(set(response.data), {"types", "limit"})
+
+    def test_prune_tombstones(self):
+        """Test prune_tombstones deletes only expired tombstones."""
+        import datetime
+        from io import StringIO
+        from django.core.management import call_command
+        from django.utils import timezone
+        from .models import Tombstone
+
+        self.person.delete()
+        self.assertEqual(Tombstone.objects.count(), 2)
+        Tombstone.objects.filter(object_type=Tombstone.ADDRESS).update(
+            deleted_at=timezone.now() - datetime.timedelta(days=40)
+        )
+        out = StringIO()
+        call_command("prune_tombstones", stdout=out)
+        self.assertIn("Deleted 1 tombstone(s)", out.getvalue())
+        self.assertEqual(
+            list(Tombstone.objects.values_list("object_type", flat=True)),
+            [Tombstone.PERSON],
+        )
+
+
+class PersonSearchTestCase(APITestCase):
+    def setUp(self):
+        from django.db import connection
+        from .cache import person_cache
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM api_creditcard")
+            cursor.execute("DELETE FROM api_address")
+            cursor.execute("DELETE FROM api_person")
+        cache.clear()
+        person_cache.clear()
+
+        self.smith = self.create_person("John", "Smith", "NY", "10012-3456")
+        self.johnson = self.create_person("Mary", "Johnson", "TX", "75001")
+        self.jones = self.create_person("Smitha", "Jones", "TX", "10012")
+        CreditCard.objects.create(
+            person=self.smith,
+            card_type="Visa",
+            last_four_digits="4242",
+            expiration_month=1,
+            expiration_year=2030,
+        )
+        CreditCard.objects.create(
+            person=self.smith,
+            card_type="Visa",
+            last_four_digits="1111",
+            expiration_month=1,
+            expiration_year=2030,
+        )
+        CreditCard.objects.create(
+            person=self.johnson,
+            card_type="Visa",
+            last_four_digits="0005",
+            expiration_month=1,
+            expiration_year=2030,
+            is_active=False,
+        )
+
+    def create_person(self, first_name, last_name, state, zip_code):
+        person = Person.objects.create(
+            first_name=first_name,
+            last_name=last_name,
+            birth_date="1990-01-01",
+            ssn="123456789",
+        )
+        for address_type in ("Home", "Work"):
+            Address.objects.create(
+                person=person,
+                address_type=address_type,
+                street_address="123 Main St",
+                city="Anytown",
+                state=state,
+                zip_code=zip_code,
+            )
+        return person
+
+    def search(self, **params):
+        response = self.client.get(reverse("api:person-search"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def names(self, **params):
+        return [row["last_name"] for row in self.search(**params)["results"]]
+
+    def test_prefix_match(self):
+        """Test names match by case-insensitive prefix, newest first."""
+        self.assertEqual(self.names(last_name="smi"), ["Smith"])
+        self.assertEqual(self.names(last_name="JO"), ["Jones", "Johnson"])
+        self.assertEqual(self.names(first_name="Smith"), ["Jones"])
+        self.assertEqual(self.names(name="smith"), ["Jones", "Smith"])
+        self.assertEqual(
+            self.names(first_name="jo", last_name="sm"), ["Smith"]
+        )
+        self.assertEqual(self.names(last_name="mith"), [])
+
+    def test_fuzzy_match(self):
+        """Test match=fuzzy finds misspelt names by trigram similarity."""
+        self.assertEqual(self.names(last_name="Brown", match="fuzzy"), [])
+        self.assertEqual(
+            self.names(last_name="smyth", match="fuzzy"), ["Smith"]
+        )
+        self.assertEqual(
+            self.names(last_name="Jonson", match="fuzzy"),
+            ["Jones", "Johnson"],
+        )
+
+    def test_similarity_matches_pg_trgm(self):
+        """Test similarity() returns pg_trgm's values."""
+        from .search import similarity, trigrams
+
+        self.assertEqual(
+            trigrams("Smith"), {"  s", " sm", "smi", "mit", "ith", "th "}
+        )
+        self.assertAlmostEqual(similarity("word", "two words"), 4 / 11)
+        self.assertAlmostEqual(similarity("Smith", "SMITH"), 1.0)
+        self.assertAlmostEqual(similarity("Smith", "Smyth"), 1 / 3)
+        self.assertEqual(similarity("", "Smith"), 0.0)
+        self.assertIsNone(similarity(None, "Smith"))
+
+    def test_address_and_card_filters(self):
+        """Test filters match within one address or card, once per person."""
+        self.assertEqual(self.names(zip_code="10012"), ["Jones", "Smith"])
+        self.assertEqual(self.names(zip_code="10012-3456"), ["Smith"])
+        self.assertEqual(self.names(state="tx"), ["Jones", "Johnson"])
+        self.assertEqual(self.names(state="TX", zip_code="10012"), ["Jones"])
+        self.assertEqual(self.names(card_type="Visa"), ["Johnson", "Smith"])
+        self.assertEqual(
+            self.names(card_type="Visa", is_active="false"), ["Johnson"]
+        )
+        self.assertEqual(
+            self.names(name="j", state="TX", is_active="true"), []
+        )
+
+    def test_keyset_pagination(self):
+        """Test results page by cursor without repeats."""
+        for i in range(5):
+            self.create_person("Ann", f"Smith{i}", "CA", "90001")
+        data = self.search(last_name="smith", page_size=4)
+        seen = [row["id"] for row in data["results"]]
+        self.assertEqual(len(seen), 4)
+        response = self.client.get(data["next"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        seen += [row["id"] for row in response.data["results"]]
+        self.assertIsNone(response.data["next"])
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(len(set(seen)), 6)
+
+    def test_prefix_query_uses_name_index(self):
+        """Test prefix matches are index range scans on SQLite."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            self.search(last_name="smi", fields="id")
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + queries[0]["sql"])
+            plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn("person_last_name_search_idx", plan)
+
+    def test_invalid_parameters(self):
+        """Test missing criteria and malformed filters are rejected."""
+        url = reverse("api:person-search")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.data)
+        response = self.client.get(
+            url,
+            {
+                "match": "exact",
+                "zip_code": "1234",
+                "state": "Texas",
+                "card_type": "Diners",
+                "is_active": "maybe",
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            set(response.data),
+            {"match", "zip_code", "state", "card_type", "is_active"},
+        )
@@ -1,29 +1,61 @@
-from django.urls import path
+from django.conf import settings
+from django.urls import path, re_path
 from . import views
 
+# Views serving the person, address and credit card GET endpoints
+if getattr(settings, "API_ASYNC_VIEWS", False):
+    from . import async_views as read_views
+else:
+    read_views = views
+
 app_name = "api"
 
 urlpatterns = [
     # Person endpoints
     path(
         "person/",
-        views.PersonListCreateView.as_view(),
+        read_views.PersonListCreateView.as_view(),
         name="person-list-create",
     ),
+    path(
+        "person/search/",
+        views.PersonSearchView.as_view(),
+        name="person-search",
+    ),
+    path(
+        "person/bulk/",
+        views.PersonBulkCreateView.as_view(),
+        name="person-bulk-create",
+    ),
+    path(
+        "person/export/",
+        views.person_export,
+        name="person-export",
+    ),
+    path(
+        "person/batch-get/",
+        views.PersonBatchGetView.as_view(),
+        name="person-batch-get",
+    ),
     path(
         "person/<uuid:pk>/",
-        views.PersonDetailView.as_view(),
+        read_views.PersonDetailView.as_view(),
         name="person-detail",
     ),
     # Address endpoints
     path(
         "address/person/<uuid:person_id>/",
-        views.AddressListCreateView.as_view(),
+        read_views.AddressListCreateView.as_view(),
         name="address-list-create",
     ),
+    path(
+        "address/batch-get/",
+        views.AddressBatchGetView.as_view(),
+        name="address-batch-get",
+    ),
     path(
         "address/<uuid:pk>/",
-        views.AddressDetailView.as_view(),
+        read_views.AddressDetailView.as_view(),
         name="address-detail",
     ),
     path(
@@ -34,15 +66,25 @@ urlpatterns = [
     # Credit card endpoints
     path(
         "creditcard/person/<uuid:person_id>/",
-        views.CreditCardListCreateView.as_view(),
+        read_views.CreditCardListCreateView.as_view(),
         name="creditcard-list-create",
     ),
+    path(
+        "creditcard/batch-get/",
+        views.CreditCardBatchGetView.as_view(),
+        name="creditcard-batch-get",
+    ),
     path(
         "creditcard/<uuid:pk>/",
-        views.CreditCardDetailView.as_view(),
+        read_views.CreditCardDetailView.as_view(),
         name="creditcard-detail",
     ),
+    # Change feed
+    path("changes/", views.changes, name="changes"),
     # Health check endpoints
     path("health/", views.health_check, name="health-check"),
     path("health/ready/", views.readiness_check, name="readiness-check"),
+    path("health/live/", views.liveness_check, name="liveness-check"),
+    # Metrics, with or without the trailing slash scrapers usually omit
+    re_path(r"^metrics/?$", views.metrics, name="metrics"),
 ]
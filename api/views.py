@@ -1,10 +1,30 @@
+import uuid
+
 from rest_framework import generics, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.db import connection
 from django.utils import timezone
 from .models import Person, Address, CreditCard
+from .bulk import PersonBulkCreator
+from .cache import person_cache
+from .changes import SOURCES, ChangeFeed, decode_cursor, encode_cursor
+from .conditional import ConditionalRequestMixin, PERSON_VERSION_ANNOTATIONS
+from .dbstats import database_stats
+from .export import EXPORT_FORMATS, PersonExporter
+from .fieldsets import SparseFieldsetMixin
+from .metrics import registry
+from .pagination import KeysetPagination, ListPagination
+from .representations import (
+    address_representation,
+    credit_card_representation,
+    person_representation,
+)
+from .search import PersonSearch
+from .services import StatisticsService
 from .serializers import (
     PersonSerializer,
     CreatePersonSerializer,
@@ -20,9 +40,111 @@ from .serializers import (
 )
 
 
-class PersonListCreateView(generics.ListCreateAPIView):
+class FastReadMixin:
+    """Serve GET list/retrieve through a compiled ``Representation``.
+
+    The output is identical to the masked serializer's, without DRF's
+    per-field machinery; lists read slotted records (``api.records``)
+    rather than model instances. Disabled by
+    ``API_FAST_REPRESENTATION = False``.
+    With ``API_DB_MASKING``, lists are read as ``.values()`` rows whose
+    sensitive columns the database has already masked.
+
+    With a ``representation_cache`` and a version from
+    ``ConditionalRequestMixin``, retrieved objects are served from the
+    cache while their version is current.
+    """
+
+    representation = None
+    representation_cache = None
+
+    def get_representation(self):
+        return self.representation
+
+    def get_representation_cache(self):
+        return self.representation_cache
+
+    def _fast(self):
+        return self.representation is not None and getattr(
+            settings, "API_FAST_REPRESENTATION", True
+        )
+
+    def _db_masking(self):
+        return self._fast() and getattr(settings, "API_DB_MASKING", False)
+
+    def cursor_columns(self):
+        """Columns list rows need besides the representation's own."""
+        return getattr(self, "required_columns", ("id", "created_at"))
+
+    def list(self, request, *args, **kwargs):
+        if not self._fast():
+            return super().list(request, *args, **kwargs)
+        if self._db_masking():
+            return self._list_db_masked()
+        representation = self.get_representation()
+        extra = self.cursor_columns()
+        queryset = representation.records(
+            self.filter_queryset(self.get_queryset()), extra
+        )
+        page = self.paginate_queryset(queryset)
+        records = representation.load_nested(
+            queryset if page is None else page, extra
+        )
+        data = representation.render(records)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def _list_db_masked(self):
+        representation = self.get_representation()
+        queryset = representation.values(
+            self.filter_queryset(self.get_queryset()),
+            masked=True,
+            extra=self.cursor_columns(),
+        )
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset) if page is None else page
+        if representation.nested and rows:
+            model = queryset.model
+            representation.attach_nested(
+                model,
+                rows,
+                representation.nested_querysets(
+                    model, [row["id"] for row in rows], masked=True
+                ),
+            )
+        data = representation.render_values(rows, masked=True)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        version = getattr(self, "current_version", None)
+        cache = self.get_representation_cache()
+        if cache is None or version is None or not cache.enabled:
+            return Response(self._render_object())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        data = cache.get_or_render(
+            self.kwargs[lookup_url_kwarg], version[0], self._render_object
+        )
+        return Response(data)
+
+    def _render_object(self):
+        instance = self.get_object()
+        if not self._fast():
+            return dict(self.get_serializer(instance).data)
+        return self.get_representation().render([instance])[0]
+
+
+class PersonListCreateView(
+    SparseFieldsetMixin, FastReadMixin, generics.ListCreateAPIView
+):
     """List all persons or create a new person."""
 
+    pagination_class = ListPagination
+    representation = person_representation
+    fieldset_serializer_class = PersonSerializer
+    expandable_fields = ("addresses", "credit_cards")
     queryset = Person.objects.prefetch_related(
         "addresses", "credit_cards"
     ).all()
@@ -33,9 +155,72 @@ class PersonListCreateView(generics.ListCreateAPIView):
         return PersonSerializer
 
 
-class PersonDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PersonSearchView(
+    SparseFieldsetMixin, FastReadMixin, generics.ListAPIView
+):
+    """Search persons by name, address and credit card (``api.search``)."""
+
+    pagination_class = KeysetPagination
+    representation = person_representation
+    serializer_class = PersonSerializer
+    fieldset_serializer_class = PersonSerializer
+    expandable_fields = ("addresses", "credit_cards")
+    queryset = Person.objects.prefetch_related(
+        "addresses", "credit_cards"
+    ).all()
+
+    def get_queryset(self):
+        search = PersonSearch(self.request.query_params)
+        return search.apply(super().get_queryset())
+
+
+class PersonBulkCreateView(generics.GenericAPIView):
+    """Create many persons, with nested addresses and cards, at once."""
+
+    serializer_class = CreatePersonSerializer
+
+    def post(self, request, *args, **kwargs):
+        items = request.data
+        max_items = getattr(settings, "BULK_CREATE_MAX_ITEMS", 10000)
+        if not isinstance(items, list):
+            return Response(
+                {"error": "Expected a list of persons"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > max_items:
+            return Response(
+                {"error": f"At most {max_items} persons per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        result = PersonBulkCreator().create(items)
+        if result["failed"] == 0:
+            response_status = status.HTTP_201_CREATED
+        elif result["created"] == 0:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        return Response(result, status=response_status)
+
+
+class PersonDetailView(
+    ConditionalRequestMixin,
+    SparseFieldsetMixin,
+    FastReadMixin,
+    generics.RetrieveUpdateDestroyAPIView,
+):
     """Retrieve, update or delete a person."""
 
+    representation = person_representation
+    representation_cache = person_cache
+    fieldset_serializer_class = PersonSerializer
+    expandable_fields = ("addresses", "credit_cards")
+    version_annotations = PERSON_VERSION_ANNOTATIONS
+    last_modified_annotations = (
+        "addresses_updated_at",
+        "credit_cards_updated_at",
+    )
+
     queryset = Person.objects.prefetch_related(
         "addresses", "credit_cards"
     ).all()
@@ -46,9 +231,12 @@ class PersonDetailView(generics.RetrieveUpdateDestroyAPIView):
         return PersonSerializer
 
 
-class AddressListCreateView(generics.ListCreateAPIView):
+class AddressListCreateView(FastReadMixin, generics.ListCreateAPIView):
     """List addresses for a person or create a new address."""
 
+    pagination_class = ListPagination
+    representation = address_representation
+
     def get_queryset(self):
         person_id = self.kwargs["person_id"]
         return Address.objects.filter(person_id=person_id)
@@ -64,9 +252,15 @@ class AddressListCreateView(generics.ListCreateAPIView):
         serializer.save(person=person)
 
 
-class AddressDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AddressDetailView(
+    ConditionalRequestMixin,
+    FastReadMixin,
+    generics.RetrieveUpdateDestroyAPIView,
+):
     """Retrieve, update or delete an address."""
 
+    representation = address_representation
+
     queryset = Address.objects.all()
 
     def get_serializer_class(self):
@@ -82,9 +276,12 @@ class UnmaskedAddressDetailView(generics.RetrieveAPIView):
     serializer_class = UnmaskedAddressSerializer
 
 
-class CreditCardListCreateView(generics.ListCreateAPIView):
+class CreditCardListCreateView(FastReadMixin, generics.ListCreateAPIView):
     """List credit cards for a person or create a new credit card."""
 
+    pagination_class = ListPagination
+    representation = credit_card_representation
+
     def get_queryset(self):
         person_id = self.kwargs["person_id"]
         return CreditCard.objects.filter(person_id=person_id)
@@ -100,9 +297,15 @@ class CreditCardListCreateView(generics.ListCreateAPIView):
         serializer.save(person=person)
 
 
-class CreditCardDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CreditCardDetailView(
+    ConditionalRequestMixin,
+    FastReadMixin,
+    generics.RetrieveUpdateDestroyAPIView,
+):
     """Retrieve, update or delete a credit card."""
 
+    representation = credit_card_representation
+
     queryset = CreditCard.objects.all()
 
     def get_serializer_class(self):
@@ -111,6 +314,158 @@ class CreditCardDetailView(generics.RetrieveUpdateDestroyAPIView):
         return CreditCardSerializer
 
 
+class BatchGetView(FastReadMixin, generics.GenericAPIView):
+    """Resolve up to ``BATCH_GET_MAX_IDS`` objects by id in one request.
+
+    The body is ``{"ids": [...]}``. Objects are loaded with one ``id__in``
+    query plus one query per prefetched relation, and returned keyed by
+    id, with ``null`` for ids that do not exist.
+    """
+
+    def post(self, request, *args, **kwargs):
+        data = request.data
+        ids = data.get("ids") if isinstance(data, dict) else None
+        max_ids = getattr(settings, "BATCH_GET_MAX_IDS", 1000)
+        if not isinstance(ids, list):
+            return Response(
+                {"error": 'Expected {"ids": [...]}'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(ids) > max_ids:
+            return Response(
+                {"error": f"At most {max_ids} ids per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        keys, invalid = [], []
+        for value in ids:
+            try:
+                keys.append(str(uuid.UUID(str(value))))
+            except ValueError:
+                invalid.append(value)
+        if invalid:
+            return Response(
+                {"error": "Invalid id(s)", "ids": invalid},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        keys = list(dict.fromkeys(keys))
+
+        objects = self.get_queryset().filter(id__in=keys).order_by()
+        if self._fast():
+            representation = self.get_representation()
+            rows = representation.render(
+                representation.load_nested(representation.records(objects))
+            )
+        else:
+            rows = self.get_serializer(objects, many=True).data
+        found = {row["id"]: row for row in rows}
+        return Response(
+            {
+                "results": {key: found.get(key) for key in keys},
+                "not_found": [key for key in keys if key not in found],
+            }
+        )
+
+
+class PersonBatchGetView(BatchGetView):
+    """Get many persons, with addresses and cards, by id."""
+
+    representation = person_representation
+    serializer_class = PersonSerializer
+    queryset = Person.objects.prefetch_related("addresses", "credit_cards")
+
+
+class AddressBatchGetView(BatchGetView):
+    """Get many addresses by id."""
+
+    representation = address_representation
+    serializer_class = AddressSerializer
+    queryset = Address.objects.all()
+
+
+class CreditCardBatchGetView(BatchGetView):
+    """Get many credit cards by id."""
+
+    representation = credit_card_representation
+    serializer_class = CreditCardSerializer
+    queryset = CreditCard.objects.all()
+
+
+@api_view(["GET"])
+def changes(request):
+    """Persons, addresses and credit cards changed since a cursor."""
+    params = request.query_params
+    errors = {}
+
+    types = [
+        t.strip() for t in params.get("types", "").split(",") if t.strip()
+    ]
+    unknown = [t for t in types if t not in SOURCES]
+    if unknown:
+        errors["types"] = [
+            f"Unknown type(s): {', '.join(unknown)}. Expected "
+            f"{', '.join(SOURCES)}."
+        ]
+
+    max_limit = getattr(settings, "CHANGES_MAX_LIMIT", 1000)
+    try:
+        limit = int(params.get("limit", settings.REST_FRAMEWORK["PAGE_SIZE"]))
+        if not 1 <= limit <= max_limit:
+            raise ValueError
+    except ValueError:
+        errors["limit"] = [f"Must be between 1 and {max_limit}."]
+    if errors:
+        return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+    since = params.get("since")
+    feed = ChangeFeed(
+        types or SOURCES,
+        limit,
+        payload=params.get("payload", "").lower() in ("1", "true"),
+    )
+    rows, position, has_more = feed.read(
+        decode_cursor(since) if since else None
+    )
+    return Response(
+        {
+            "changes": rows,
+            "cursor": encode_cursor(position),
+            "has_more": has_more,
+        }
+    )
+
+
+@api_view(["GET"])
+def person_export(request):
+    """Stream all persons as NDJSON or CSV with masking applied."""
+    export_format = request.query_params.get("output", "ndjson")
+    if export_format not in EXPORT_FORMATS:
+        return Response(
+            {"error": f"output must be one of {', '.join(EXPORT_FORMATS)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    content_type = {
+        "ndjson": "application/x-ndjson",
+        "csv": "text/csv",
+    }[export_format]
+    response = StreamingHttpResponse(
+        PersonExporter().stream(export_format), content_type=content_type
+    )
+    response[
+        "Content-Disposition"
+    ] = f'attachment; filename="persons.{export_format}"'
+    return response
+
+
+def metrics(request):
+    """Prometheus metrics in the text exposition format."""
+    return HttpResponse(
+        registry.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 @api_view(["GET"])
 def health_check(request):
     """Health check endpoint."""
@@ -121,24 +476,22 @@ def health_check(request):
 
         # Get basic statistics - handle case where tables don't exist yet
         try:
-            person_count = Person.objects.count()
-            address_count = Address.objects.count()
-            credit_card_count = CreditCard.objects.count()
+            counts = StatisticsService().get_counts()
         except Exception:
             # Tables don't exist yet (migrations not run)
-            person_count = 0
-            address_count = 0
-            credit_card_count = 0
+            counts = {"persons": 0, "addresses": 0, "credit_cards": 0}
 
         health_data = {
             "status": "healthy",
             "timestamp": timezone.now(),
             "database": "connected",
             "statistics": {
-                "persons": person_count,
-                "addresses": address_count,
-                "creditCards": credit_card_count,
+                "persons": counts["persons"],
+                "addresses": counts["addresses"],
+                "creditCards": counts["credit_cards"],
             },
+            "cache": {"person": person_cache.stats()},
+            "connections": database_stats(),
         }
 
         serializer = HealthSerializer(health_data)
@@ -159,6 +512,15 @@ def health_check(request):
         )
 
 
+@api_view(["GET"])
+def liveness_check(request):
+    """Liveness check endpoint. Does not touch the database."""
+    return Response(
+        {"status": "alive", "timestamp": timezone.now()},
+        status=status.HTTP_200_OK,
+    )
+
+
 @api_view(["GET"])
 def readiness_check(request):
     """Readiness check endpoint."""
@@ -169,23 +531,19 @@ def readiness_check(request):
 
         # Get basic statistics - handle case where tables don't exist yet
         try:
-            person_count = Person.objects.count()
-            address_count = Address.objects.count()
-            credit_card_count = CreditCard.objects.count()
+            counts = StatisticsService().get_counts()
         except Exception:
             # Tables don't exist yet (migrations not run)
-            person_count = 0
-            address_count = 0
-            credit_card_count = 0
+            counts = {"persons": 0, "addresses": 0, "credit_cards": 0}
 
         readiness_data = {
             "status": "ready",
             "timestamp": timezone.now(),
             "database": "connected",
             "statistics": {
-                "total_persons": person_count,
-                "total_addresses": address_count,
-                "total_credit_cards": credit_card_count,
+                "total_persons": counts["persons"],
+                "total_addresses": counts["addresses"],
+                "total_credit_cards": counts["credit_cards"],
             },
         }
 
@@ -0,0 +1,11 @@
+def init_worker() -> None:
+    """Set up Django in a worker process of a ``ProcessPoolExecutor``.
+
+    Pass it as the pool's ``initializer``: spawned workers (the default on
+    macOS and Windows) start without Django, forked ones have it set up.
+    """
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
@@ -0,0 +1,284 @@
+"""
+Compare the WSGI deployment (sync gunicorn workers, DRF views) with the
+ASGI one (gunicorn + uvicorn workers, api/async_views.py) under high
+concurrency: requests/sec and latency percentiles of the read endpoints.
+
+Both servers run the same number of workers against a seeded file-based
+SQLite database with a simulated network round trip per query
+(``--db-latency-ms``), or against ``--settings`` for e.g. a real Postgres,
+and are hit by a keep-alive asyncio HTTP client. Needs gunicorn and
+uvicorn (requirements.txt).
+
+Usage: python -m benchmarks.asgi [--concurrency 256] [--duration 10]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.common import ROOT, print_table
+
+SETTINGS_TEMPLATE = """\
+from personal_info_api.test_settings import *
+
+DATABASES = {{
+    "default": {{
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": {database!r},
+        "OPTIONS": {{"timeout": 20}},
+    }}
+}}
+DEBUG = False
+ALLOWED_HOSTS = ["*"]
+ASYNC_CONCURRENT_QUERIES = True
+PERSON_CACHE_TIMEOUT = {cache_timeout}
+
+# Simulated network round trip per query, as to a database on another host
+DB_LATENCY = {db_latency}
+if DB_LATENCY:
+    import time
+    from django.db.backends.signals import connection_created
+
+    def _delay(execute, sql, params, many, context):
+        time.sleep(DB_LATENCY)
+        return execute(sql, params, many, context)
+
+    def _add_latency(sender, connection, **kwargs):
+        if _delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(_delay)
+
+    connection_created.connect(_add_latency, weak=False)
+"""
+
+MODES = {
+    "wsgi": {
+        "app": "personal_info_api.wsgi:application",
+        "args": [],
+        "async_views": "False",
+    },
+    "asgi": {
+        "app": "personal_info_api.asgi:application",
+        "args": ["--worker-class", "uvicorn.workers.UvicornWorker"],
+        "async_views": "True",
+    },
+}
+
+
+def seed(persons: int) -> List[str]:
+    """Seed persons with children and return their ids."""
+    from django.core.management import call_command
+    from api.models import Person
+    from benchmarks.pagination import seed as seed_persons
+    from benchmarks.serialization import seed_children
+
+    call_command("migrate", run_syncdb=True, verbosity=0)
+    seed_persons(persons)
+    seed_children(Person.objects.all())
+    return [str(pk) for pk in Person.objects.values_list("id", flat=True)]
+
+
+def start_server(
+    mode: str, settings_module: str, path: str, port: int, workers: int
+) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": settings_module,
+        "PYTHONPATH": os.pathsep.join([path, str(ROOT)]),
+        "API_ASYNC_VIEWS": MODES[mode]["async_views"],
+        "PYTHONWARNINGS": "ignore::UserWarning",
+    }
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+            *MODES[mode]["args"],
+            MODES[mode]["app"],
+        ],
+        cwd=ROOT,
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            url = f"http://127.0.0.1:{port}/api/health/live/"
+            with urllib.request.urlopen(url, timeout=1):
+                return process
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{mode} server did not start")
+
+
+async def _client(
+    port: int,
+    paths: List[str],
+    deadline: float,
+    latencies: List[float],
+    errors: List[int],
+) -> None:
+    writer = None
+    try:
+        while time.monotonic() < deadline:
+            if writer is None:
+                # Sync gunicorn workers close the connection every response
+                reader, writer = await asyncio.open_connection(
+                    "127.0.0.1", port
+                )
+            request = (
+                f"GET {random.choice(paths)} HTTP/1.1\r\n"
+                f"Host: 127.0.0.1\r\n\r\n"
+            )
+            start = time.perf_counter()
+            writer.write(request.encode())
+            head = await reader.readuntil(b"\r\n\r\n")
+            length, close = 0, False
+            for line in head.split(b"\r\n")[1:]:
+                name, _, value = line.partition(b":")
+                name = name.strip().lower()
+                if name == b"content-length":
+                    length = int(value)
+                elif name == b"connection":
+                    close = value.strip().lower() == b"close"
+            await reader.readexactly(length)
+            if close:
+                writer.close()
+                writer = None
+            latencies.append(time.perf_counter() - start)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors.append(1)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def load(
+    port: int, paths: List[str], concurrency: int, duration: float
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors: List[int] = []
+    deadline = time.monotonic() + duration
+    results = await asyncio.gather(
+        *(
+            _client(port, paths, deadline, latencies, errors)
+            for _ in range(concurrency)
+        ),
+        return_exceptions=True,
+    )
+    failures = sum(isinstance(r, Exception) for r in results)
+    latencies.sort()
+    ms = [value * 1000 for value in latencies]
+    return {
+        "requests": len(ms),
+        "rps": len(ms) / duration,
+        "p50_ms": statistics.median(ms) if ms else 0.0,
+        "p99_ms": ms[int(len(ms) * 0.99)] if ms else 0.0,
+        "errors": len(errors) + failures,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--persons", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--modes", default="wsgi,asgi")
+    parser.add_argument(
+        "--db-latency-ms",
+        type=float,
+        default=1.0,
+        help="Round trip added to every SQL query (0 for local SQLite)",
+    )
+    parser.add_argument(
+        "--person-cache",
+        action="store_true",
+        help="Keep the person cache on (off measures the database path)",
+    )
+    parser.add_argument(
+        "--settings",
+        help="Existing, seeded settings module to use instead of SQLite",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        settings_module = args.settings or "asgi_benchmark_settings"
+        if args.settings is None:
+            Path(path, f"{settings_module}.py").write_text(
+                SETTINGS_TEMPLATE.format(
+                    database=str(Path(path, "db.sqlite3")),
+                    cache_timeout=300 if args.person_cache else 0,
+                    db_latency=args.db_latency_ms / 1000,
+                )
+            )
+        sys.path.insert(0, path)
+        os.environ["DJANGO_SETTINGS_MODULE"] = settings_module
+
+        import django
+
+        django.setup()
+        if args.settings is None:
+            print(f"Seeding {args.persons} persons...")
+            ids = seed(args.persons)
+        else:
+            from api.models import Person
+
+            ids = [
+                str(pk)
+                for pk in Person.objects.values_list("id", flat=True)[
+                    : args.persons
+                ]
+            ]
+        paths = [
+            *(f"/api/person/{pk}/" for pk in ids),
+            *(f"/api/address/person/{pk}/" for pk in ids),
+            *(f"/api/creditcard/person/{pk}/" for pk in ids),
+            "/api/person/?page_size=20",
+        ]
+
+        rows = []
+        for mode in args.modes.split(","):
+            server: Optional[subprocess.Popen] = None
+            try:
+                server = start_server(
+                    mode, settings_module, path, args.port, args.workers
+                )
+                # Warm up connections and imports
+                asyncio.run(load(args.port, paths, 16, 1.0))
+                stats = asyncio.run(
+                    load(args.port, paths, args.concurrency, args.duration)
+                )
+            finally:
+                if server is not None:
+                    server.terminate()
+                    server.wait()
+            rows.append([mode, *stats.values()])
+
+    print(
+        f"\n{args.concurrency} connections, {args.workers} workers, "
+        f"{args.duration:.0f}s per mode"
+    )
+    print_table(
+        ["mode", "requests", "req/s", "p50 ms", "p99 ms", "errors"], rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run against the in-memory SQLite test settings by default so
+they need no external database; point DJANGO_SETTINGS_MODULE elsewhere to
+measure a real Postgres instance.
+"""
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def setup_django() -> None:
+    """Configure Django and create the schema if it does not exist yet."""
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    os.environ.setdefault(
+        "DJANGO_SETTINGS_MODULE", "personal_info_api.test_settings"
+    )
+
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    django.setup()
+    # Requests built with the test client/request factory use "testserver".
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+    call_command("migrate", run_syncdb=True, verbosity=0)
+
+
+def measure(func: Callable[[], object], repeat: int = 5) -> Dict[str, float]:
+    """Run ``func`` ``repeat`` times and return timings in milliseconds."""
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "min_ms": min(samples),
+        "median_ms": statistics.median(samples),
+        "max_ms": max(samples),
+    }
+
+
+def print_table(headers: List[str], rows: List[List[object]]) -> None:
+    """Print a fixed-width results table."""
+    widths = [
+        max(len(str(h)), *(len(_fmt(r[i])) for r in rows))
+        for i, h in enumerate(headers)
+    ]
+    print("  ".join(str(h).rjust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(_fmt(v).rjust(w) for v, w in zip(row, widths)))
+
+
+def _fmt(value: object) -> str:
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return str(value)
@@ -0,0 +1,913 @@
+"""
+Throughput, latency percentiles and SQL queries per request for every
+route in api/urls.py, against seeded data at 1k, 100k or 1M persons.
+
+The ``client`` driver calls the views in-process through Django's test
+client, one request at a time. The ``http`` driver sends ``--concurrency``
+parallel keep-alive requests to a server at ``--url``; it reads queries per
+request from the server's /api/metrics, and the server must use the
+database this process is configured with, which is seeded and sampled for
+ids here.
+
+The run seeds and writes to the database, so it refuses to start unless
+``BENCHMARK_DATABASE`` marks the database as one for benchmarks. The
+persons it creates share a last name unique to the run; writes only
+modify them, and they are deleted afterwards.
+
+The report is written as JSON and compared with a baseline. The default,
+benchmarks/baselines/<driver>-<scale>.json, holds only queries per request
+and errors, which don't depend on the host, and more of either makes the
+run fail. Timings are only compared with an explicit ``--baseline``
+recorded on the same host, where throughput or p95 worse than
+``--tolerance`` also fails the run.
+
+Usage: python -m benchmarks.endpoints [--scale 1k] [--driver client]
+       python manage.py benchmark --scale 100k --driver http --url ...
+"""
+import argparse
+import datetime
+import gc
+import http.client
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+from benchmarks.common import ROOT, print_table
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+BASELINE_DIR = ROOT / "benchmarks" / "baselines"
+# Changes smaller than this are noise, whatever the tolerance
+MIN_LATENCY_DELTA_MS = 1.0
+# Last name prefixes searched for, common to rare in the seeded data
+SEARCH_PREFIXES = ("Smi", "Gar", "Lee", "Ngu", "Pat", "Rob")
+
+
+class Sample(NamedTuple):
+    """Ids the scenarios pick from."""
+
+    persons: List[str]
+    addresses: List[str]
+    cards: List[str]
+    # Created by the run; the only persons the write scenarios modify
+    writable: List[str]
+    # Last name of every person the run creates, to find them afterwards
+    marker: str
+
+
+Body = Optional[Any]
+Request = Tuple[str, Body]
+
+
+class Scenario(NamedTuple):
+    """One method of one route, with a request builder."""
+
+    route: str
+    method: str
+    build: Callable[[Sample, random.Random], Request]
+    # What decides the query count besides the request: a cache filled by
+    # the earlier requests ("requests") or one that expires ("time")
+    cache: str = ""
+
+    @property
+    def name(self) -> str:
+        return f"{self.route} {self.method}"
+
+
+def _url(name: str, **kwargs: Any) -> str:
+    from django.urls import reverse
+
+    return reverse(f"api:{name}", kwargs=kwargs)
+
+
+def _new_person(rng: random.Random, ids: Sample) -> Dict[str, Any]:
+    from api.seeding import FIRST_NAMES
+
+    return {
+        "first_name": rng.choice(FIRST_NAMES),
+        "last_name": ids.marker,
+        "birth_date": "1990-01-01",
+        "ssn": f"{rng.randrange(10**9):09d}",
+    }
+
+
+NEW_ADDRESS = {
+    "address_type": "Home",
+    "street_address": "1 Benchmark Way",
+    "city": "Springfield",
+    "state": "IL",
+    "zip_code": "62701",
+}
+NEW_CARD = {
+    "card_type": "Visa",
+    "card_number": "4111111111111111",
+    "expiration_month": 12,
+    "expiration_year": 2028,
+}
+
+
+def scenarios() -> List[Scenario]:
+    """Return the scenarios, covering every route in api/urls.py."""
+    return [
+        Scenario(
+            "person-list-create",
+            "GET",
+            lambda ids, rng: (_url("person-list-create"), None),
+        ),
+        Scenario(
+            "person-list-create",
+            "POST",
+            lambda ids, rng: (
+                _url("person-list-create"),
+                _new_person(rng, ids),
+            ),
+        ),
+        Scenario(
+            "person-search",
+            "GET",
+            lambda ids, rng: (
+                _url("person-search")
+                + f"?last_name={rng.choice(SEARCH_PREFIXES)}&state=TX",
+                None,
+            ),
+        ),
+        Scenario(
+            "person-bulk-create",
+            "POST",
+            lambda ids, rng: (
+                _url("person-bulk-create"),
+                [_new_person(rng, ids) for _ in range(10)],
+            ),
+        ),
+        Scenario(
+            "person-export",
+            "GET",
+            lambda ids, rng: (_url("person-export"), None),
+        ),
+        Scenario(
+            "person-batch-get",
+            "POST",
+            lambda ids, rng: (
+                _url("person-batch-get"),
+                {"ids": rng.sample(ids.persons, min(100, len(ids.persons)))},
+            ),
+        ),
+        Scenario(
+            "person-detail",
+            "GET",
+            lambda ids, rng: (
+                _url("person-detail", pk=rng.choice(ids.persons)),
+                None,
+            ),
+            cache="requests",
+        ),
+        Scenario(
+            "person-detail",
+            "PATCH",
+            lambda ids, rng: (
+                _url("person-detail", pk=rng.choice(ids.writable)),
+                {"first_name": _new_person(rng, ids)["first_name"]},
+            ),
+        ),
+        Scenario(
+            "address-list-create",
+            "GET",
+            lambda ids, rng: (
+                _url("address-list-create", person_id=rng.choice(ids.persons)),
+                None,
+            ),
+        ),
+        Scenario(
+            "address-list-create",
+            "POST",
+            lambda ids, rng: (
+                _url(
+                    "address-list-create", person_id=rng.choice(ids.writable)
+                ),
+                NEW_ADDRESS,
+            ),
+        ),
+        Scenario(
+            "address-batch-get",
+            "POST",
+            lambda ids, rng: (
+                _url("address-batch-get"),
+                {
+                    "ids": rng.sample(
+                        ids.addresses, min(100, len(ids.addresses))
+                    )
+                },
+            ),
+        ),
+        Scenario(
+            "address-detail",
+            "GET",
+            lambda ids, rng: (
+                _url("address-detail", pk=rng.choice(ids.addresses)),
+                None,
+            ),
+        ),
+        Scenario(
+            "address-unmasked",
+            "GET",
+            lambda ids, rng: (
+                _url("address-unmasked", pk=rng.choice(ids.addresses)),
+                None,
+            ),
+        ),
+        Scenario(
+            "creditcard-list-create",
+            "GET",
+            lambda ids, rng: (
+                _url(
+                    "creditcard-list-create",
+                    person_id=rng.choice(ids.persons),
+                ),
+                None,
+            ),
+        ),
+        Scenario(
+            "creditcard-list-create",
+            "POST",
+            lambda ids, rng: (
+                _url(
+                    "creditcard-list-create",
+                    person_id=rng.choice(ids.writable),
+                ),
+                NEW_CARD,
+            ),
+        ),
+        Scenario(
+            "creditcard-batch-get",
+            "POST",
+            lambda ids, rng: (
+                _url("creditcard-batch-get"),
+                {"ids": rng.sample(ids.cards, min(100, len(ids.cards)))},
+            ),
+        ),
+        Scenario(
+            "creditcard-detail",
+            "GET",
+            lambda ids, rng: (
+                _url("creditcard-detail", pk=rng.choice(ids.cards)),
+                None,
+            ),
+        ),
+        Scenario(
+            "changes",
+            "GET",
+            lambda ids, rng: (_url("changes") + "?payload=1", None),
+        ),
+        Scenario(
+            "health-check",
+            "GET",
+            lambda ids, rng: (_url("health-check"), None),
+            cache="time",
+        ),
+        Scenario(
+            "readiness-check",
+            "GET",
+            lambda ids, rng: (_url("readiness-check"), None),
+        ),
+        Scenario(
+            "liveness-check",
+            "GET",
+            lambda ids, rng: (_url("liveness-check"), None),
+        ),
+        Scenario(
+            "metrics",
+            "GET",
+            lambda ids, rng: (_url("metrics"), None),
+        ),
+    ]
+
+
+def seed(persons: int, seed: int = 0) -> int:
+    """Top the data set up to ``persons`` with ``api.seeding``; return how
+    many persons were added."""
+    from api.models import Person
+    from api.seeding import seed_data, usable_workers
+
+    totals = seed_data(
+        persons,
+        seed=seed,
+        start=Person.objects.count(),
+        workers=usable_workers(os.cpu_count() or 1),
+    )
+    return totals["persons"]
+
+
+def sample_ids(size: int) -> Sample:
+    """Return up to ``size`` ids of each model for the scenarios."""
+    from api.models import Address, CreditCard, Person
+
+    def ids(model: Any) -> List[str]:
+        return [
+            str(pk)
+            for pk in model.objects.order_by("pk").values_list(
+                "pk", flat=True
+            )[:size]
+        ]
+
+    return Sample(
+        ids(Person),
+        ids(Address),
+        ids(CreditCard),
+        writable=[],
+        marker=f"Benchmark {uuid.uuid4().hex[:12]}",
+    )
+
+
+def create_writable(ids: Sample, count: int, rng: random.Random) -> Sample:
+    """Create ``count`` persons for the write scenarios to modify, so that
+    they leave the existing rows as they are."""
+    from api.models import Person
+
+    persons = Person.objects.bulk_create(
+        Person(**_new_person(rng, ids)) for _ in range(count)
+    )
+    return ids._replace(writable=[str(person.pk) for person in persons])
+
+
+def delete_created(ids: Sample, chunk_size: int = 500) -> None:
+    """Delete the persons the run created, with the addresses and cards
+    written to them and the tombstones their deletion writes."""
+    from api.models import Person, Tombstone
+
+    created = list(
+        Person.objects.filter(last_name=ids.marker).values_list(
+            "pk", flat=True
+        )
+    )
+    for start in range(0, len(created), chunk_size):
+        chunk = created[start : start + chunk_size]
+        Person.objects.filter(pk__in=chunk).delete()
+        Tombstone.objects.filter(person_id__in=chunk).delete()
+
+
+def _client_ip(rng: random.Random) -> str:
+    # A different client per request, so writes stay under the rate limit
+    return f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}"
+
+
+def _percentile(samples: List[float], share: float) -> float:
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(len(samples) * share))]
+
+
+def _summarize(
+    latencies: List[float], errors: int, elapsed: float, queries: Any
+) -> Dict[str, Any]:
+    ms = sorted(value * 1000 for value in latencies)
+    return {
+        "requests": len(ms),
+        "rps": round(len(ms) / elapsed, 3) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(ms), 3) if ms else 0.0,
+        "p95_ms": round(_percentile(ms, 0.95), 3),
+        "p99_ms": round(_percentile(ms, 0.99), 3),
+        "queries_per_request": queries,
+        "errors": errors,
+    }
+
+
+class ClientDriver:
+    """Run requests in-process through Django's test client."""
+
+    def __init__(self, options: Dict[str, Any]) -> None:
+        from django.test import Client
+
+        self.client = Client()
+
+    def run(
+        self,
+        scenario: Scenario,
+        ids: Sample,
+        rng: random.Random,
+        requests: int,
+        duration: float,
+    ) -> Dict[str, Any]:
+        from api.middleware import QueryCounter, observing
+
+        latencies: List[float] = []
+        errors = 0
+        counter = QueryCounter()
+        start = time.perf_counter()
+        deadline = start + duration
+        with observing(counter):
+            while len(latencies) < requests and time.perf_counter() < deadline:
+                path, body = scenario.build(ids, rng)
+                request_start = time.perf_counter()
+                response = self.client.generic(
+                    scenario.method,
+                    path,
+                    json.dumps(body) if body is not None else "",
+                    content_type="application/json",
+                    HTTP_X_FORWARDED_FOR=_client_ip(rng),
+                )
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                latencies.append(time.perf_counter() - request_start)
+                errors += response.status_code >= 400
+        return _summarize(
+            latencies,
+            errors,
+            time.perf_counter() - start,
+            round(counter.count / len(latencies), 3) if latencies else None,
+        )
+
+
+class HttpDriver:
+    """Run concurrent keep-alive requests against a server."""
+
+    METRIC = re.compile(
+        r"^api_db_queries_per_request_(sum|count)"
+        r'\{view="api:([^"]+)"\} (\S+)$',
+        re.MULTILINE,
+    )
+
+    def __init__(self, options: Dict[str, Any]) -> None:
+        url = urlsplit(options["url"])
+        self.host = url.hostname or "127.0.0.1"
+        self.port = url.port or 80
+        self.prefix = url.path.rstrip("/")
+        self.concurrency = options["concurrency"]
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(
+                self.host, self.port, timeout=60
+            )
+        return connection
+
+    def _request(
+        self, method: str, path: str, body: Body, client_ip: str
+    ) -> Tuple[float, int]:
+        headers = {"X-Forwarded-For": client_ip}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        start = time.perf_counter()
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request(
+                    method, self.prefix + path, payload, headers
+                )
+                response = connection.getresponse()
+                response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # The server closed the kept-alive connection; retry once
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    return time.perf_counter() - start, 599
+        if response.will_close:
+            connection.close()
+            self._local.connection = None
+        return time.perf_counter() - start, response.status
+
+    def queries(self) -> Dict[str, Tuple[float, float]]:
+        """Return (sum, count) of queries per view from /api/metrics."""
+        connection = http.client.HTTPConnection(self.host, self.port)
+        try:
+            connection.request("GET", self.prefix + _url("metrics"))
+            text = connection.getresponse().read().decode()
+        finally:
+            connection.close()
+        totals: Dict[str, List[float]] = {}
+        for kind, view, value in self.METRIC.findall(text):
+            totals.setdefault(view, [0.0, 0.0])[kind == "count"] = float(value)
+        return {view: (total[0], total[1]) for view, total in totals.items()}
+
+    def run(
+        self,
+        scenario: Scenario,
+        ids: Sample,
+        rng: random.Random,
+        requests: int,
+        duration: float,
+    ) -> Dict[str, Any]:
+        # Built up front: the builders aren't thread-safe
+        calls = [
+            (*scenario.build(ids, rng), _client_ip(rng))
+            for _ in range(requests)
+        ]
+        before = self.queries().get(scenario.route, (0.0, 0.0))
+        lock = threading.Lock()
+        latencies: List[float] = []
+        errors = [0]
+        start = time.perf_counter()
+        deadline = start + duration
+        remaining = iter(calls)
+
+        def worker() -> None:
+            while time.perf_counter() < deadline:
+                with lock:
+                    call = next(remaining, None)
+                if call is None:
+                    return
+                elapsed, status = self._request(scenario.method, *call)
+                with lock:
+                    latencies.append(elapsed)
+                    errors[0] += status >= 400
+
+        with ThreadPoolExecutor(self.concurrency) as executor:
+            for _ in range(self.concurrency):
+                executor.submit(worker)
+        elapsed = time.perf_counter() - start
+
+        after = self.queries().get(scenario.route, (0.0, 0.0))
+        counted = after[1] - before[1]
+        queries = (
+            round((after[0] - before[0]) / counted, 3) if counted else None
+        )
+        return _summarize(latencies, errors[0], elapsed, queries)
+
+
+DRIVERS = {"client": ClientDriver, "http": HttpDriver}
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _ensure_schema() -> None:
+    from django.core.management import call_command
+    from django.db import connection
+
+    if "api_person" in connection.introspection.table_names():
+        return
+    if connection.vendor == "sqlite" and connection.is_in_memory_db():
+        call_command("migrate", run_syncdb=True, verbosity=0)
+        return
+    raise RuntimeError(
+        "The database has no api tables; run python manage.py migrate"
+    )
+
+
+def run(options: Dict[str, Any], log: Callable[[str], None] = print) -> Dict:
+    """Seed, run every selected scenario and return the report."""
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import override_settings
+    from api.cache import person_cache
+    from api.models import Person
+
+    if not getattr(settings, "BENCHMARK_DATABASE", False):
+        raise RuntimeError(
+            "The benchmark seeds and writes to the database; run it only "
+            "against one set aside for it, marked with "
+            "BENCHMARK_DATABASE=True"
+        )
+    persons = options["persons"] or SCALES[options["scale"]]
+    _ensure_schema()
+    if options["seed"]:
+        log(f"Seeding up to {persons} persons...")
+        added = seed(persons)
+        log(f"Added {added} persons")
+
+    driver = DRIVERS[options["driver"]](options)
+    ids = sample_ids(options["sample"])
+    if not ids.persons:
+        raise RuntimeError("No persons to benchmark; run without --no-seed")
+
+    selected = options["routes"]
+    ids = create_writable(
+        ids, min(options["sample"], 100), random.Random(options["random_seed"])
+    )
+    results = {}
+    with ExitStack() as stack:
+        if options["driver"] == "client":
+            # Keep the debug query log out of the measurements and let the
+            # test client's "testserver" host through
+            stack.enter_context(
+                override_settings(
+                    DEBUG=False,
+                    ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+                )
+            )
+        try:
+            for scenario in scenarios():
+                if selected and scenario.route not in selected:
+                    continue
+                # The same requests from the same cache state on every run.
+                # A server's caches can't be reset from here, so the http
+                # driver's counts for cached routes aren't compared.
+                if options["driver"] == "client":
+                    cache.clear()
+                    person_cache.clear()
+                # Nor the previous route's garbage
+                gc.collect()
+                rng = random.Random(
+                    f"{options['random_seed']}:{scenario.name}"
+                )
+                if options["warmup"]:
+                    driver.run(scenario, ids, rng, options["warmup"], 60.0)
+                results[scenario.name] = driver.run(
+                    scenario,
+                    ids,
+                    rng,
+                    options["requests"],
+                    options["duration"],
+                )
+                log(f"{scenario.name}: {results[scenario.name]['rps']} req/s")
+        finally:
+            # Leave the seeded data as it was
+            delete_created(ids)
+
+    return {
+        "meta": {
+            "created": datetime.datetime.now(datetime.timezone.utc)
+            .replace(microsecond=0)
+            .isoformat(),
+            "revision": _git_revision(),
+            "driver": options["driver"],
+            "scale": options["scale"],
+            "persons": Person.objects.count(),
+            "database": connection.vendor,
+            "requests_per_route": options["requests"],
+            "warmup": options["warmup"],
+            "random_seed": options["random_seed"],
+            "concurrency": (
+                options["concurrency"] if options["driver"] == "http" else 1
+            ),
+            "python": platform.python_version(),
+        },
+        "routes": results,
+    }
+
+
+def compare(
+    report: Dict, baseline: Dict, tolerance: float, timings: bool = False
+) -> Tuple[List[List[Any]], List[str]]:
+    """Return comparison table rows and the regressions against
+    ``baseline``: extra queries per request on a route whose count the
+    requests decide, new errors and, with ``timings``, lower throughput or
+    higher p95 beyond ``tolerance``."""
+    meta, base_meta = report.get("meta", {}), baseline.get("meta", {})
+    driver = meta.get("driver", "client")
+    # Backends issue different queries for the same ORM calls
+    same_database = meta.get("database") == base_meta.get("database")
+    # Cache hits depend on the whole request sequence
+    same_requests = all(
+        meta.get(key) == base_meta.get(key)
+        for key in ("requests_per_route", "warmup", "random_seed")
+    )
+    caches = {scenario.name: scenario.cache for scenario in scenarios()}
+    rows, regressions = [], []
+    for name, result in report["routes"].items():
+        base = baseline.get("routes", {}).get(name)
+        if base is None:
+            rows.append(
+                [
+                    name,
+                    result["queries_per_request"],
+                    "-",
+                    result["rps"],
+                    "-",
+                    result["p95_ms"],
+                    "-",
+                ]
+            )
+            continue
+        queries, base_queries = (
+            result["queries_per_request"],
+            base["queries_per_request"],
+        )
+        rps_change = p95_change = None
+        if base.get("rps"):
+            rps_change = result["rps"] / base["rps"] - 1
+        if base.get("p95_ms"):
+            p95_change = result["p95_ms"] / base["p95_ms"] - 1
+        rows.append(
+            [
+                name,
+                queries,
+                "-" if base_queries is None else base_queries,
+                result["rps"],
+                "-" if rps_change is None else f"{rps_change:+.1%}",
+                result["p95_ms"],
+                "-" if p95_change is None else f"{p95_change:+.1%}",
+            ]
+        )
+        deterministic = caches.get(name, "") == "" or (
+            caches[name] == "requests" and driver == "client" and same_requests
+        )
+        if (
+            deterministic
+            and same_database
+            and queries is not None
+            and base_queries is not None
+            and queries > base_queries + 0.01
+        ):
+            regressions.append(
+                f"{name}: {queries} queries per request, "
+                f"baseline {base_queries}"
+            )
+        if result["errors"] and not base["errors"]:
+            regressions.append(f"{name}: {result['errors']} errors")
+        if not timings:
+            continue
+        # Per request, as for p95: fast routes swing widely in req/s
+        slower_ms = (
+            (1 / result["rps"] - 1 / base["rps"]) * 1000
+            if result["rps"] and base.get("rps")
+            else float("inf")
+        )
+        if (
+            rps_change is not None
+            and rps_change < -tolerance
+            and slower_ms >= MIN_LATENCY_DELTA_MS
+        ):
+            regressions.append(
+                f"{name}: {result['rps']} req/s, baseline {base['rps']}"
+            )
+        if (
+            p95_change is not None
+            and p95_change > tolerance
+            and result["p95_ms"] - base["p95_ms"] >= MIN_LATENCY_DELTA_MS
+        ):
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']} ms, "
+                f"baseline {base['p95_ms']} ms"
+            )
+    return rows, regressions
+
+
+def default_baseline(options: Dict[str, Any]) -> Path:
+    return BASELINE_DIR / f"{options['driver']}-{options['scale']}.json"
+
+
+def query_baseline(report: Dict) -> Dict:
+    """Return ``report`` without its timings, which depend on the host."""
+    return {
+        "meta": {
+            key: value
+            for key, value in report["meta"].items()
+            if key not in ("created", "revision", "python")
+        },
+        "routes": {
+            name: {
+                key: result[key]
+                for key in ("requests", "queries_per_request", "errors")
+            }
+            for name, result in report["routes"].items()
+        },
+    }
+
+
+def add_arguments(parser: Any) -> None:
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument(
+        "--persons", type=int, default=None, help="Overrides --scale"
+    )
+    parser.add_argument("--driver", choices=DRIVERS, default="client")
+    parser.add_argument(
+        "--url",
+        default="http://127.0.0.1:8000",
+        help="Server for the http driver",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=32,
+        help="Parallel connections (http driver)",
+    )
+    parser.add_argument(
+        "--requests", type=int, default=200, help="Requests per route"
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=30.0,
+        help="Maximum seconds per route",
+    )
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument(
+        "--routes",
+        nargs="*",
+        default=None,
+        help="URL names to run (default: all)",
+    )
+    parser.add_argument(
+        "--sample", type=int, default=1000, help="Ids sampled per model"
+    )
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument(
+        "--no-seed",
+        dest="seed",
+        action="store_false",
+        help="Use the data as it is instead of seeding up to the scale",
+    )
+    parser.add_argument(
+        "--output",
+        default="benchmark-report.json",
+        help="JSON report to write",
+    )
+    parser.add_argument(
+        "--baseline",
+        default=None,
+        help="Report from this host to compare with, timings included "
+        "(default: query counts in "
+        "benchmarks/baselines/<driver>-<scale>.json)",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed throughput/p95 change before it counts as a "
+        "regression (with --baseline)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store this report as the baseline (without timings unless "
+        "--baseline is given)",
+    )
+
+
+def main(options: Dict[str, Any], log: Callable[[str], None] = print) -> int:
+    """Run, report and compare; return the number of regressions."""
+    report = run(options, log)
+    Path(options["output"]).write_text(json.dumps(report, indent=2) + "\n")
+    log(f"Wrote {options['output']}")
+
+    # Timings only compare on the same host, so only an explicit
+    # --baseline (recorded there) has them; the committed default only
+    # keeps query counts and errors
+    timings = bool(options["baseline"])
+    baseline_path = (
+        Path(options["baseline"]) if timings else default_baseline(options)
+    )
+    if options["save_baseline"]:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        saved = report if timings else query_baseline(report)
+        baseline_path.write_text(json.dumps(saved, indent=2) + "\n")
+        log(f"Saved baseline {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print_table(
+            ["route", "requests", "req/s", "p50", "p95", "p99", "queries"],
+            [
+                [name, *(r[k] for k in list(r)[:6])]
+                for name, r in report["routes"].items()
+            ],
+        )
+        return 0
+
+    baseline = json.loads(baseline_path.read_text())
+    rows, regressions = compare(
+        report, baseline, options["tolerance"], timings
+    )
+    log(f"Compared with {baseline_path}:")
+    print_table(
+        [
+            "route",
+            "queries",
+            "baseline",
+            "req/s",
+            "change",
+            "p95 ms",
+            "change",
+        ],
+        rows,
+    )
+    for regression in regressions:
+        log(f"REGRESSION {regression}")
+    return len(regressions)
+
+
+if __name__ == "__main__":
+    from benchmarks.common import setup_django
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_arguments(parser)
+    arguments = vars(parser.parse_args())
+    setup_django()
+    raise SystemExit(1 if main(arguments) else 0)
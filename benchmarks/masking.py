@@ -0,0 +1,133 @@
+"""
+Compare DataMaskingService per-item masking with the *_many batch methods,
+and person list pages masked in Python with pages masked in SQL
+(API_DB_MASKING).
+
+Usage: python -m benchmarks.masking [--sizes 1000,100000,1000000]
+                                    [--persons 1000]
+"""
+import argparse
+import random
+import string
+import time
+
+from benchmarks.common import measure, print_table, setup_django
+
+
+def generate(size: int, seed: int = 42) -> dict:
+    rng = random.Random(seed)
+    digits = string.digits
+    return {
+        "mask_ssn": [
+            "".join(rng.choices(digits, k=9))
+            if i % 2
+            else "{}-{}-{}".format(
+                "".join(rng.choices(digits, k=3)),
+                "".join(rng.choices(digits, k=2)),
+                "".join(rng.choices(digits, k=4)),
+            )
+            for i in range(size)
+        ],
+        "mask_address": [
+            f"{rng.randint(1, 9999)} Main St" for _ in range(size)
+        ],
+        "mask_city": [
+            rng.choice(["Springfield", "Anytown", "Austin", "Boise"])
+            for _ in range(size)
+        ],
+        "mask_zip_code": [
+            "".join(rng.choices(digits, k=5)) for _ in range(size)
+        ],
+        "mask_credit_card": [
+            "".join(rng.choices(digits, k=4)) for _ in range(size)
+        ],
+    }
+
+
+def page_cpu(persons: int, repeat: int) -> list:
+    """Return CPU milliseconds per person list page in each masking mode.
+
+    CPU time is this process's: on PostgreSQL that excludes the database's
+    share, which is what moving masking into SQL takes off the app servers.
+    On SQLite the database runs in-process, so the two modes cost the same
+    work and the comparison only shows the row-building overhead.
+    """
+    from django.test import Client, override_settings
+    from api.models import Person
+    from api.seeding import seed_data
+
+    seed_data(persons, start=Person.objects.count())
+    client = Client()
+    rows = []
+    for page_size in (10, 100, 1000):
+        url = f"/api/person/?pagination=keyset&page_size={page_size}"
+        timings = []
+        for db_masking in (False, True):
+            with override_settings(API_DB_MASKING=db_masking):
+                client.get(url)
+                samples = []
+                for _ in range(repeat):
+                    start = time.process_time()
+                    client.get(url)
+                    samples.append((time.process_time() - start) * 1000)
+            timings.append(min(samples))
+        python_ms, sql_ms = timings
+        rows.append([page_size, python_ms, sql_ms, python_ms - sql_ms])
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--persons",
+        type=int,
+        default=1000,
+        help="persons seeded for the list page comparison (0 skips it)",
+    )
+    args = parser.parse_args()
+
+    setup_django()
+
+    from api.services import DataMaskingService, np
+
+    service = DataMaskingService()
+    rows = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        for method, values in generate(size).items():
+            single = getattr(service, method)
+            many = getattr(service, f"{method}_many")
+            per_item = measure(
+                lambda: [single(v) for v in values], args.repeat
+            )
+            batch = measure(lambda: many(values), args.repeat)
+            row = [
+                size,
+                method,
+                per_item["median_ms"],
+                batch["median_ms"],
+                per_item["median_ms"] / batch["median_ms"],
+            ]
+            if np is not None:
+                array = np.array(values)
+                row.append(
+                    measure(lambda: many(array), args.repeat)["median_ms"]
+                )
+            rows.append(row)
+
+    headers = ["values", "method", "per_item_ms", "batch_ms", "speedup"]
+    if np is not None:
+        headers.append("numpy_batch_ms")
+    print_table(headers, rows)
+
+    if args.persons:
+        print()
+        print_table(
+            ["page_size", "python_cpu_ms", "sql_cpu_ms", "saved_cpu_ms"],
+            page_cpu(args.persons, max(args.repeat, 5)),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Compare page-number (OFFSET + COUNT) and keyset pagination on the person
+list as the requested page gets deeper.
+
+Usage: python -m benchmarks.pagination [--rows N]
+"""
+import argparse
+import datetime
+import uuid
+
+from benchmarks.common import measure, print_table, setup_django
+
+
+def seed(rows: int) -> None:
+    from django.db import connection
+    from api.models import Person
+
+    Person.objects.all().delete()
+    base = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    batch = []
+    for i in range(rows):
+        batch.append(
+            Person(
+                id=uuid.uuid4(),
+                first_name=f"First{i}",
+                last_name=f"Last{i}",
+                birth_date=datetime.date(1990, 1, 1),
+                ssn="123456789",
+            )
+        )
+        if len(batch) == 5000:
+            Person.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Person.objects.bulk_create(batch)
+
+    # bulk_create stamps created_at with "now"; spread the values out so the
+    # keyset walks a realistic, mostly-unique ordering.
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM api_person")
+        ids = [r[0] for r in cursor.fetchall()]
+        cursor.executemany(
+            "UPDATE api_person SET created_at = %s WHERE id = %s",
+            [
+                (base + datetime.timedelta(seconds=n), pk)
+                for n, pk in enumerate(ids)
+            ],
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+    from rest_framework.test import APIRequestFactory
+    from api.models import Person
+    from api.pagination import KeysetPagination, cursor_from_link
+    from api.views import PersonListCreateView
+
+    print(f"Seeding {args.rows} persons...")
+    seed(args.rows)
+
+    factory = APIRequestFactory()
+    view = PersonListCreateView.as_view()
+    page_size = settings.REST_FRAMEWORK["PAGE_SIZE"]
+    last_page = args.rows // page_size
+    pages = [p for p in (1, 10, 100, 1000, 10_000) if p <= last_page]
+    ordered = Person.objects.order_by(*KeysetPagination.ordering)
+
+    rows = []
+    for page in pages:
+        offset_stats = measure(
+            lambda: view(
+                factory.get(
+                    "/api/person/",
+                    {"page": page},
+                )
+            ),
+            args.repeat,
+        )
+
+        params = {"pagination": "keyset"}
+        if page > 1:
+            # The cursor a client would hold after walking page - 1 pages.
+            anchor = ordered.values("created_at", "id")[
+                (page - 1) * page_size - 1
+            ]
+            paginator = KeysetPagination()
+            paginator.base_url = "http://testserver/api/person/"
+            link = paginator.encode_cursor(
+                (anchor["created_at"], anchor["id"], False)
+            )
+            params["cursor"] = cursor_from_link(link)
+        keyset_stats = measure(
+            lambda: view(factory.get("/api/person/", params)), args.repeat
+        )
+        rows.append(
+            [page, offset_stats["median_ms"], keyset_stats["median_ms"]]
+        )
+
+    print_table(["page", "offset_ms", "keyset_ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compare the previous datetime-list rate limiter with the counter-based
+SlidingWindowCounterLimiter at different request volumes per window.
+
+Usage: python -m benchmarks.ratelimit [--volumes 10,1000,100000]
+"""
+import argparse
+import pickle
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import print_table, setup_django
+
+
+class ListLimiter:
+    """The original implementation: a pickled list of datetimes per client."""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def hit(self, client_id, max_requests, window_seconds):
+        cache_key = f"rate_limit_list:{client_id}"
+        now = datetime.utcnow()
+        window_start = now - timedelta(seconds=window_seconds)
+        requests = self.cache.get(cache_key, [])
+        recent = [t for t in requests if t > window_start]
+        if len(recent) >= max_requests:
+            return False
+        recent.append(now)
+        self.cache.set(cache_key, recent, timeout=window_seconds)
+        return True
+
+    def state_size(self, client_id):
+        value = self.cache.get(f"rate_limit_list:{client_id}", [])
+        return len(pickle.dumps(value))
+
+
+def run(limiter, volume, window_seconds):
+    start = time.perf_counter()
+    for _ in range(volume):
+        limiter.hit("bench-client", volume, window_seconds)
+    return (time.perf_counter() - start) / volume * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--volumes", default="10,1000,100000")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.core.cache import cache
+    from api.ratelimit import SlidingWindowCounterLimiter
+
+    window = 24 * 3600
+    rows = []
+    for volume in (int(v) for v in args.volumes.split(",")):
+        cache.clear()
+        legacy = ListLimiter(cache)
+        counter = SlidingWindowCounterLimiter(cache)
+        # The list limiter is quadratic; cap its run so large volumes finish,
+        # measuring the steady state with a pre-filled list instead.
+        legacy_calls = min(volume, 200)
+        if volume > legacy_calls:
+            cache.set(
+                "rate_limit_list:bench-client",
+                [
+                    datetime.utcnow() - timedelta(microseconds=i)
+                    for i in range(volume - legacy_calls)
+                ],
+                timeout=window,
+            )
+        start = time.perf_counter()
+        for _ in range(legacy_calls):
+            legacy.hit("bench-client", volume, window)
+        legacy_us = (time.perf_counter() - start) / legacy_calls * 1_000_000
+        counter_us = run(counter, volume, window)
+        rows.append(
+            [
+                volume,
+                legacy_us,
+                counter_us,
+                legacy.state_size("bench-client"),
+            ]
+        )
+
+    print_table(
+        ["requests", "list_us_per_hit", "counter_us_per_hit", "list_bytes"],
+        rows,
+    )
+    print("Counter limiter state: two integers per client.")
+
+
+if __name__ == "__main__":
+    main()
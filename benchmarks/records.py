@@ -0,0 +1,78 @@
+"""
+Compare loading persons, with their addresses and cards, as model
+instances (prefetch_related) and as api.records read-model records, per
+10k persons: load time, render time and peak memory.
+
+Usage: python -m benchmarks.records [--persons 10000]
+"""
+import argparse
+import gc
+import tracemalloc
+from functools import partial
+
+from benchmarks.common import measure, print_table, setup_django
+
+
+def peak_mb(func) -> float:
+    """Return the peak memory, in MB, allocated while ``func`` runs."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--persons", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from rest_framework.renderers import JSONRenderer
+    from api.models import Person
+    from api.representations import person_representation
+    from api.seeding import seed_data
+
+    seed_data(args.persons, start=Person.objects.count())
+    queryset = Person.objects.order_by("created_at", "id")[: args.persons]
+    per_10k = 10_000 / args.persons
+
+    def instances():
+        return list(queryset.prefetch_related("addresses", "credit_cards"))
+
+    def records():
+        return person_representation.load_nested(
+            person_representation.records(queryset)
+        )
+
+    rows = []
+    outputs = []
+    for name, load in (("model instances", instances), ("records", records)):
+        loaded = load()
+        outputs.append(
+            JSONRenderer().render(person_representation.render(loaded))
+        )
+        load_ms = measure(load, args.repeat)["median_ms"]
+        render_ms = measure(
+            partial(person_representation.render, loaded), args.repeat
+        )["median_ms"]
+        del loaded
+        rows.append(
+            [
+                name,
+                load_ms * per_10k,
+                render_ms * per_10k,
+                peak_mb(load) * per_10k,
+            ]
+        )
+
+    print_table(["path", "load_ms_10k", "render_ms_10k", "peak_mb_10k"], rows)
+    print(f"Byte-identical output: {outputs[0] == outputs[1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare DRF's JSONRenderer with FastJSONRenderer on large person pages.
+
+Usage: python -m benchmarks.renderers [--page-sizes 100,1000,5000]
+"""
+import argparse
+
+from benchmarks.common import measure, print_table, setup_django
+from benchmarks.pagination import seed
+from benchmarks.serialization import seed_children
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page-sizes", default="100,1000,5000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from rest_framework.renderers import JSONRenderer
+    from api.models import Person
+    from api.renderers import FastJSONRenderer, orjson
+    from api.serializers import PersonSerializer
+
+    sizes = [int(s) for s in args.page_sizes.split(",")]
+    seed(max(sizes))
+    seed_children(Person.objects.all())
+    persons = list(
+        Person.objects.prefetch_related("addresses", "credit_cards")
+    )
+
+    stdlib, fast = JSONRenderer(), FastJSONRenderer()
+    rows = []
+    for size in sizes:
+        page = {
+            "next": None,
+            "previous": None,
+            "results": PersonSerializer(persons[:size], many=True).data,
+        }
+        stdlib_stats = measure(lambda: stdlib.render(page), args.repeat)
+        fast_stats = measure(lambda: fast.render(page), args.repeat)
+        rows.append(
+            [
+                size,
+                len(stdlib.render(page)),
+                stdlib_stats["median_ms"],
+                fast_stats["median_ms"],
+                stdlib_stats["median_ms"] / fast_stats["median_ms"],
+                stdlib.render(page) == fast.render(page),
+            ]
+        )
+
+    print(f"orjson installed: {orjson is not None}")
+    print_table(
+        ["persons", "bytes", "json_ms", "fast_ms", "speedup", "identical"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
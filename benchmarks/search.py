@@ -0,0 +1,69 @@
+"""
+Time GET /api/person/search/ over a large seeded data set: prefix and
+fuzzy name matches, address and card filters, and the page after the
+first through the keyset cursor.
+
+Seeding a million persons takes a while; pass --persons to go smaller.
+
+Usage: python -m benchmarks.search [--persons 1000000]
+"""
+import argparse
+
+from benchmarks.common import measure, print_table, setup_django
+
+QUERIES = (
+    ("prefix last_name", {"last_name": "Smi"}),
+    ("prefix name", {"name": "mar"}),
+    ("fuzzy last_name", {"last_name": "Jonson", "match": "fuzzy"}),
+    ("zip_code", {"zip_code": "10012"}),
+    ("state + card", {"state": "TX", "card_type": "Visa"}),
+    (
+        "combined",
+        {"last_name": "Gar", "state": "CA", "is_active": "true"},
+    ),
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--persons", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.test import Client
+    from django.urls import reverse
+    from api.models import Person
+    from api.seeding import seed_data
+
+    seed_data(args.persons, start=Person.objects.count(), workers=args.workers)
+    client = Client()
+    url = reverse("api:person-search")
+
+    def get(path, params=None):
+        response = client.get(path, params)
+        assert response.status_code == 200, response.content
+        return response.json()
+
+    rows = []
+    for name, params in QUERIES:
+        first = get(url, params)
+        rows.append(
+            [
+                name,
+                len(first["results"]),
+                measure(lambda: get(url, params), args.repeat)["median_ms"],
+                measure(lambda: get(first["next"]), args.repeat)["median_ms"]
+                if first["next"]
+                else "-",
+            ]
+        )
+
+    print(f"{Person.objects.count()} persons")
+    print_table(["query", "rows", "first_page_ms", "next_page_ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compare PersonSerializer with the compiled person_representation when
+building a page of masked persons with nested addresses and cards.
+
+Usage: python -m benchmarks.serialization [--persons 1000]
+"""
+import argparse
+
+from benchmarks.common import measure, print_table, setup_django
+from benchmarks.pagination import seed
+
+
+def seed_children(persons) -> None:
+    from api.models import Address, CreditCard
+
+    addresses, cards = [], []
+    for person in persons:
+        for n in range(3):
+            addresses.append(
+                Address(
+                    person=person,
+                    address_type="Home",
+                    street_address=f"{n} Main St",
+                    city="Springfield",
+                    state="IL",
+                    zip_code="62701",
+                )
+            )
+        for n in range(2):
+            cards.append(
+                CreditCard(
+                    person=person,
+                    card_type="Visa",
+                    last_four_digits=f"{n:04d}",
+                    expiration_month=1,
+                    expiration_year=2028,
+                )
+            )
+    Address.objects.bulk_create(addresses, batch_size=5000)
+    CreditCard.objects.bulk_create(cards, batch_size=5000)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--persons", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from rest_framework.renderers import JSONRenderer
+    from api.models import Person
+    from api.representations import person_representation
+    from api.serializers import PersonSerializer
+
+    seed(args.persons)
+    seed_children(Person.objects.all())
+    persons = list(
+        Person.objects.prefetch_related("addresses", "credit_cards")
+    )
+
+    serializer = measure(
+        lambda: PersonSerializer(persons, many=True).data, args.repeat
+    )
+    compiled = measure(
+        lambda: person_representation.render(persons), args.repeat
+    )
+    same = JSONRenderer().render(
+        PersonSerializer(persons, many=True).data
+    ) == JSONRenderer().render(person_representation.render(persons))
+
+    rows = [
+        [
+            name,
+            stats["median_ms"],
+            len(persons) / stats["median_ms"] * 1000,
+        ]
+        for name, stats in (
+            ("PersonSerializer", serializer),
+            ("person_representation", compiled),
+        )
+    ]
+    print_table(["path", "median_ms", "persons_per_sec"], rows)
+    print(f"Byte-identical output: {same}")
+
+
+if __name__ == "__main__":
+    main()
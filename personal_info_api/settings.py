@@ -25,15 +25,18 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    # Trigram search indexes and lookups on PostgreSQL
+    'django.contrib.postgres',
     'rest_framework',
     'corsheaders',
     'api',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'api.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -41,6 +44,8 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'api.middleware.RateLimitMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
+    'api.middleware.QueryTimingMiddleware',
 ]
 
 ROOT_URLCONF = 'personal_info_api.urls'
@@ -64,19 +69,80 @@ TEMPLATES = [
 WSGI_APPLICATION = 'personal_info_api.wsgi.application'
 
 # Database
+# Connections persist for DB_CONN_MAX_AGE seconds (0 opens one per request)
+# and are checked before reuse when DB_CONN_HEALTH_CHECKS is on. Under
+# ASGI (SERVER_MODE=asgi) each request runs its sync code on a thread of
+# its own, whose connection no later request reuses, so persistent
+# connections pile up; there DB_CONN_MAX_AGE defaults to 0 and DB_POOL is
+# the way to reuse connections. DB_POOL takes them from a per-worker psycopg 3 pool
+# (pip install "psycopg[binary,pool]") of DB_POOL_MIN_SIZE to
+# DB_POOL_MAX_SIZE connections, waiting up to DB_POOL_TIMEOUT seconds for
+# a free one. api.backends.postgresql is Django's backend plus the pool
+# and the connection statistics reported by /api/health/.
+SERVER_MODE = config('SERVER_MODE', default='wsgi')
+DB_POOL = config('DB_POOL', default=False, cast=bool)
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'api.backends.postgresql',
         'NAME': config('DB_NAME', default='personalinfo'),
         'USER': config('DB_USERNAME', default='postgres'),
         'PASSWORD': config('DB_PASSWORD', default='your-db-password'),
         'HOST': config('DB_HOST', default='your-db-host.amazonaws.com'),
         'PORT': config('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': (
+            0
+            if DB_POOL
+            else config(
+                'DB_CONN_MAX_AGE',
+                default=0 if SERVER_MODE == 'asgi' else 60,
+                cast=int,
+            )
+        ),
+        'CONN_HEALTH_CHECKS': config(
+            'DB_CONN_HEALTH_CHECKS', default=True, cast=bool
+        ),
         'OPTIONS': {
             'sslmode': config('DB_SSLMODE', default='require'),
         },
     }
 }
+if DB_POOL:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        'timeout': config('DB_POOL_TIMEOUT', default=10.0, cast=float),
+    }
+
+# Read replicas: one alias (replica_1, replica_2, ...) per host in
+# DB_REPLICA_HOSTS, otherwise configured like the primary. GET/HEAD requests
+# read from a random healthy replica (api.routers); a client that wrote is
+# pinned to the primary for DB_REPLICA_PIN_SECONDS to read its own writes.
+# Replicas are re-checked every DB_REPLICA_CHECK_SECONDS and skipped while
+# unreachable or more than DB_REPLICA_MAX_LAG_SECONDS behind.
+DB_REPLICA_HOSTS = config(
+    'DB_REPLICA_HOSTS',
+    default='',
+    cast=lambda v: [s.strip() for s in v.split(',') if s.strip()],
+)
+DATABASE_REPLICAS = []
+for number, host in enumerate(DB_REPLICA_HOSTS, start=1):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        # Tests read the primary's test database through the replicas
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+DB_REPLICA_PIN_SECONDS = config('DB_REPLICA_PIN_SECONDS', default=5, cast=int)
+DB_REPLICA_CHECK_SECONDS = config(
+    'DB_REPLICA_CHECK_SECONDS', default=10, cast=int
+)
+DB_REPLICA_MAX_LAG_SECONDS = config(
+    'DB_REPLICA_MAX_LAG_SECONDS', default=30.0, cast=float
+)
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -110,7 +176,11 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        # api.renderers.FastJSONRenderer uses orjson when installed and
+        # falls back to the stdlib encoder otherwise
+        config(
+            'API_JSON_RENDERER', default='api.renderers.FastJSONRenderer'
+        ),
     ],
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
@@ -119,6 +189,10 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 100,
 }
 
+# List pagination mode: "page" (page number + count) or "keyset" (cursor,
+# no COUNT). Keyset mode is also used whenever a request sends ?cursor=.
+API_PAGINATION_MODE = config('API_PAGINATION_MODE', default='page')
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5000",
@@ -135,9 +209,115 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Cache behind the rate limiter, the replica pins and the person cache.
+# The default "locmem" cache is per process, so with several gunicorn
+# workers set CACHE_BACKEND to "redis" (pip install redis) or "database"
+# (start.sh runs createcachetable), or to a backend's dotted path, and
+# CACHE_LOCATION to the Redis URL or table name. manage.py check warns
+# when GUNICORN_WORKERS workers would each keep their own cache.
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHES = {
+    'default': {
+        'BACKEND': {
+            'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+            'database': 'django.core.cache.backends.db.DatabaseCache',
+            'redis': 'django.core.cache.backends.redis.RedisCache',
+        }.get(CACHE_BACKEND, CACHE_BACKEND),
+        'LOCATION': config(
+            'CACHE_LOCATION',
+            default={
+                'database': 'api_cache',
+                'redis': 'redis://127.0.0.1:6379/0',
+            }.get(CACHE_BACKEND, ''),
+        ),
+    }
+}
+GUNICORN_WORKERS = config('GUNICORN_WORKERS', default=1, cast=int)
+
 # Rate limiting settings
 RATE_LIMIT_MAX_REQUESTS = 1000
 RATE_LIMIT_WINDOW_HOURS = 24
+# Dotted path to the limiter engine (see api/ratelimit.py)
+RATE_LIMIT_ENGINE = config(
+    'RATE_LIMIT_ENGINE', default='api.ratelimit.SlidingWindowCounterLimiter'
+)
+
+# Serve GET endpoints through the compiled read-only representations in
+# api/representations.py instead of the DRF serializers (same output)
+API_FAST_REPRESENTATION = config(
+    'API_FAST_REPRESENTATION', default=True, cast=bool
+)
+
+# Mask list responses in SQL (DataMaskingService.mask_*_expression) so raw
+# sensitive values never leave the database; needs API_FAST_REPRESENTATION
+API_DB_MASKING = config('API_DB_MASKING', default=False, cast=bool)
+
+# Read-through cache of masked GET /api/person/{id}/ responses: entries
+# live PERSON_CACHE_TIMEOUT seconds in the cache backend (0 disables the
+# cache) behind an in-process LRU of PERSON_CACHE_LOCAL_SIZE entries.
+PERSON_CACHE_TIMEOUT = config('PERSON_CACHE_TIMEOUT', default=300, cast=int)
+PERSON_CACHE_LOCAL_SIZE = config(
+    'PERSON_CACHE_LOCAL_SIZE', default=1024, cast=int
+)
+
+# Route the person, address and credit card GET endpoints to the async
+# views in api/async_views.py (for the ASGI run mode, see start.sh). Their
+# queries run concurrently on a pool of ASYNC_QUERY_THREADS threads, each
+# holding its own database connection, unless ASYNC_CONCURRENT_QUERIES is
+# off.
+API_ASYNC_VIEWS = config('API_ASYNC_VIEWS', default=False, cast=bool)
+ASYNC_CONCURRENT_QUERIES = config(
+    'ASYNC_CONCURRENT_QUERIES', default=True, cast=bool
+)
+ASYNC_QUERY_THREADS = config('ASYNC_QUERY_THREADS', default=8, cast=int)
+
+# Share of requests (0 to 1) timed by api.middleware.QueryTimingMiddleware,
+# which adds Server-Timing headers and request_timing log lines; 0 disables
+# the middleware entirely.
+REQUEST_TIMING_SAMPLE_RATE = config(
+    'REQUEST_TIMING_SAMPLE_RATE', default=0.0, cast=float
+)
+
+# Request metrics served at /api/metrics. Under gunicorn, set
+# METRICS_MULTIPROC_DIR to an empty, writable directory shared by the
+# workers; each flushes its metrics there at most every
+# METRICS_FLUSH_SECONDS.
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_MULTIPROC_DIR = config('METRICS_MULTIPROC_DIR', default='')
+METRICS_FLUSH_SECONDS = config('METRICS_FLUSH_SECONDS', default=1.0, cast=float)
+
+# Bulk person creation (POST /api/person/bulk/)
+BULK_CREATE_MAX_ITEMS = config('BULK_CREATE_MAX_ITEMS', default=10000, cast=int)
+BULK_CREATE_BATCH_SIZE = config(
+    'BULK_CREATE_BATCH_SIZE', default=1000, cast=int
+)
+
+# Maximum ids per POST /api/<resource>/batch-get/ request
+BATCH_GET_MAX_IDS = config('BATCH_GET_MAX_IDS', default=1000, cast=int)
+
+# Rows fetched per server-side cursor round trip by the streaming export
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Change feed (GET /api/changes/): at most CHANGES_MAX_LIMIT changes per
+# request. It stops CHANGES_SETTLE_SECONDS short of the oldest open write
+# (clock skew margin); tombstones of deletions are kept, and cursors
+# accepted, for CHANGES_RETENTION_DAYS (see prune_tombstones).
+CHANGES_MAX_LIMIT = config('CHANGES_MAX_LIMIT', default=1000, cast=int)
+CHANGES_SETTLE_SECONDS = config(
+    'CHANGES_SETTLE_SECONDS', default=1.0, cast=float
+)
+CHANGES_RETENTION_DAYS = config('CHANGES_RETENTION_DAYS', default=30, cast=int)
+
+# Health check statistics: "exact" (COUNT(*)) or "estimate" (Postgres
+# planner statistics), cached for HEALTH_STATS_CACHE_SECONDS (0 disables).
+HEALTH_STATS_MODE = config('HEALTH_STATS_MODE', default='exact')
+HEALTH_STATS_CACHE_SECONDS = config(
+    'HEALTH_STATS_CACHE_SECONDS', default=30, cast=int
+)
+
+# Marks the database as one set aside for benchmarks: manage.py benchmark
+# seeds and writes to it, and refuses to run without this
+BENCHMARK_DATABASE = config('BENCHMARK_DATABASE', default=False, cast=bool)
 
 # Logging
 LOGGING = {
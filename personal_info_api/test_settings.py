@@ -12,8 +12,15 @@ DATABASES = {
         'OPTIONS': {
             'timeout': 20,
         }
-    }
+    },
+    # Separate database standing in for a read replica; routing to it is off
+    # unless a test sets DATABASE_REPLICAS = ['replica']
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
 }
+DATABASE_REPLICAS = []
 
 # Disable migrations for faster testing
 class DisableMigrations:
@@ -33,6 +40,13 @@ ALLOWED_HOSTS = ['localhost', '127.0.0.1']
 # Disable SSL for testing
 DB_SSLMODE = 'disable'
 
+# TestCase data is only visible on the test's own connection, so async
+# views must not read from pool threads with connections of their own
+ASYNC_CONCURRENT_QUERIES = False
+
+# The in-memory database is disposable, so benchmarks may write to it
+BENCHMARK_DATABASE = True
+
 # Speed up tests
 PASSWORD_HASHERS = [
     'django.contrib.auth.hashers.MD5PasswordHasher',
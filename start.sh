@@ -29,14 +29,46 @@ while retry_count < max_retries:
         time.sleep(2)
 "
 
+# Worker count, exported so manage.py check can tell whether the cache
+# has to be shared between workers
+export GUNICORN_WORKERS=${GUNICORN_WORKERS:-3}
+
 # Run database migrations
 echo "Running database migrations..."
-python manage.py migrate
+python manage.py migrate --fake-initial
+
+# Create the table of CACHE_BACKEND=database (a no-op for other backends)
+python manage.py createcachetable
 
 # Collect static files
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
 
-# Start the application
+# Drop the metrics snapshots of the previous run's workers, which would
+# otherwise be summed into every scrape and pile up across restarts
+METRICS_DIR=$(python manage.py shell -c "
+from django.conf import settings
+print(settings.METRICS_MULTIPROC_DIR)
+")
+if [ -n "$METRICS_DIR" ]; then
+    echo "Clearing metrics directory $METRICS_DIR..."
+    mkdir -p "$METRICS_DIR"
+    rm -f "$METRICS_DIR"/metrics_*.json
+fi
+
+# Start the application: SERVER_MODE=asgi runs uvicorn workers, which serve
+# the async read views when API_ASYNC_VIEWS=True. Persistent connections
+# aren't reused under ASGI, so DB_CONN_MAX_AGE defaults to 0 there; set
+# DB_POOL=True to reuse connections through a pool instead.
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+    echo "Starting Gunicorn server with Uvicorn (ASGI) workers..."
+    case "${DB_POOL,,}" in
+        true|yes|on|1) ;;
+        *) echo "DB_POOL is off: opening a database connection per request." ;;
+    esac
+    exec gunicorn --bind 0.0.0.0:8000 --workers "$GUNICORN_WORKERS" \
+        --timeout 120 --worker-class uvicorn.workers.UvicornWorker \
+        personal_info_api.asgi:application
+fi
 echo "Starting Gunicorn server..."
-exec gunicorn --bind 0.0.0.0:8000 --workers 3 --timeout 120 personal_info_api.wsgi:application
+exec gunicorn --bind 0.0.0.0:8000 --workers "$GUNICORN_WORKERS" --timeout 120 personal_info_api.wsgi:application